@@ -0,0 +1,33 @@
+"""
+Shared filter backends for the REST API
+"""
+from rest_framework import filters
+
+from apps.core.search import SearchService
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    ?search= answered from the full-text search index, ranked best match
+    first unless ?ordering= is given. Models outside the index fall back to
+    the regular search_fields lookup.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not SearchService.is_indexed(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return SearchService.search(queryset, query)
+
+
+class RankAwareOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that keeps search rank order when no ?ordering= is given
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
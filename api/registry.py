@@ -73,6 +73,7 @@ API_ENDPOINTS = {
         'contracts': '/api/reports/contracts/',
         'maintenance': '/api/reports/maintenance/',
         'financial': '/api/reports/financial/',
+        'property_pnl': '/api/financial/property-pnl/',
         'export': '/api/reports/export/{type}/',
     },
     
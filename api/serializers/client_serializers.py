@@ -7,24 +7,28 @@ from apps.clients.models import Client
 
 class ClientListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for client list"""
-    contracts_count = serializers.SerializerMethodField()
+    contracts_count = serializers.IntegerField(read_only=True)
+    active_contracts = serializers.IntegerField(source='active_contracts_count', read_only=True)
+    total_paid = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    outstanding = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
 
     class Meta:
         model = Client
         fields = [
             'id', 'name', 'email', 'phone', 'address',
-            'contracts_count', 'is_active', 'created_at'
+            'contracts_count', 'active_contracts', 'total_paid', 'outstanding',
+            'is_active', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
-    def get_contracts_count(self, obj):
-        return obj.contracts.count()
-
 
 class ClientSerializer(serializers.ModelSerializer):
     """Full serializer for Client model"""
-    contracts_count = serializers.SerializerMethodField()
-    active_contracts = serializers.SerializerMethodField()
+    contracts_count = serializers.IntegerField(read_only=True)
+    active_contracts = serializers.IntegerField(source='active_contracts_count', read_only=True)
+    monthly_rent = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    total_paid = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    outstanding = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
 
     class Meta:
         model = Client
@@ -32,12 +36,13 @@ class ClientSerializer(serializers.ModelSerializer):
             'id', 'name', 'email', 'phone', 'mobile', 'address',
             'city', 'country', 'national_id', 'date_of_birth',
             'occupation', 'notes', 'is_active', 'created_at',
-            'updated_at', 'contracts_count', 'active_contracts'
+            'updated_at', 'contracts_count', 'active_contracts',
+            'monthly_rent', 'total_paid', 'outstanding'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-    def get_contracts_count(self, obj):
-        return obj.contracts.count()
-
-    def get_active_contracts(self, obj):
-        return obj.contracts.filter(status='active').count()
+    def to_representation(self, instance):
+        if not hasattr(instance, 'outstanding'):
+            # Freshly created rows carry no ledger annotations
+            instance = Client.objects.with_metrics().get(pk=instance.pk)
+        return super().to_representation(instance)
@@ -3,28 +3,33 @@ Owner Serializers for REST API
 """
 from rest_framework import serializers
 from apps.owners.models import Owner
+from apps.owners.portfolio import OwnerPortfolioService
 
 
 class OwnerListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for owner list"""
-    properties_count = serializers.SerializerMethodField()
+    properties_count = serializers.IntegerField(read_only=True)
+    active_properties_count = serializers.IntegerField(read_only=True)
+    market_value = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    active_rent = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
 
     class Meta:
         model = Owner
         fields = [
             'id', 'name', 'email', 'phone', 'address',
-            'properties_count', 'is_active', 'created_at'
+            'properties_count', 'active_properties_count', 'market_value',
+            'active_rent', 'is_active', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
-    def get_properties_count(self, obj):
-        return obj.properties.count()
-
 
 class OwnerSerializer(serializers.ModelSerializer):
     """Full serializer for Owner model"""
-    properties_count = serializers.SerializerMethodField()
-    active_properties = serializers.SerializerMethodField()
+    properties_count = serializers.IntegerField(read_only=True)
+    active_properties = serializers.IntegerField(source='active_properties_count', read_only=True)
+    market_value = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    active_rent = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    revenue = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
 
     class Meta:
         model = Owner
@@ -32,12 +37,13 @@ class OwnerSerializer(serializers.ModelSerializer):
             'id', 'name', 'email', 'phone', 'mobile', 'address',
             'city', 'country', 'national_id', 'tax_id', 'notes',
             'is_active', 'created_at', 'updated_at',
-            'properties_count', 'active_properties'
+            'properties_count', 'active_properties', 'market_value',
+            'active_rent', 'revenue'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-    def get_properties_count(self, obj):
-        return obj.properties.count()
-
-    def get_active_properties(self, obj):
-        return obj.properties.filter(is_active=True).count()
+    def to_representation(self, instance):
+        if not hasattr(instance, 'market_value'):
+            # Freshly created rows carry no portfolio annotations
+            instance = OwnerPortfolioService.annotate(Owner.objects.filter(pk=instance.pk)).get()
+        return super().to_representation(instance)
@@ -31,23 +31,40 @@ class PropertyTypeSerializer(serializers.ModelSerializer):
 class PropertyImageSerializer(serializers.ModelSerializer):
     """Serializer for PropertyImage model"""
     image_url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = PropertyImage
         fields = [
-            'id', 'property', 'image', 'image_url', 'title', 'caption',
-            'description', 'is_primary', 'order', 'uploaded_at'
+            'id', 'property', 'image', 'image_url', 'width', 'height', 'renditions',
+            'title', 'caption', 'description', 'is_primary', 'order', 'uploaded_at'
         ]
-        read_only_fields = ['id', 'uploaded_at']
+        read_only_fields = ['id', 'width', 'height', 'uploaded_at']
+
+    def _absolute(self, url):
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(url)
+        return url
 
     def get_image_url(self, obj):
         if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
+            return self._absolute(obj.image.url)
         return None
 
+    def get_renditions(self, obj):
+        """{name: {width, height, jpeg, webp}} with URLs instead of paths"""
+        storage = obj.image.storage
+        return {
+            name: {
+                'width': rendition['width'],
+                'height': rendition['height'],
+                'jpeg': self._absolute(storage.url(rendition['jpeg'])),
+                'webp': self._absolute(storage.url(rendition['webp'])),
+            }
+            for name, rendition in (obj.renditions or {}).items()
+        }
+
 
 class PropertyDocumentSerializer(serializers.ModelSerializer):
     """Serializer for PropertyDocument model"""
@@ -187,12 +204,14 @@ class PropertyListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'code', 'created_at']
 
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        # Denormalized FK, select_related by the viewset: no per-row query
+        primary_image = obj.primary_image
         if primary_image:
             request = self.context.get('request')
+            # Medium rendition: grid cards never need the full upload
             if request:
-                return request.build_absolute_uri(primary_image.image.url)
-            return primary_image.image.url
+                return request.build_absolute_uri(primary_image.medium_url())
+            return primary_image.medium_url()
         return None
 
 
@@ -215,7 +234,7 @@ class PropertySerializer(serializers.ModelSerializer):
             'notes', 'last_renovation_date', 'occupancy_rate', 'average_roi',
             'status', 'is_active', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'code', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'code', 'occupancy_rate', 'created_at', 'updated_at']
 
 
 class PropertyDetailSerializer(serializers.ModelSerializer):
@@ -251,7 +270,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
             'expenses', 'revenues', 'total_expenses', 'total_revenues',
             'net_income'
         ]
-        read_only_fields = ['id', 'code', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'code', 'occupancy_rate', 'created_at', 'updated_at']
 
     def get_total_expenses(self, obj):
         total = obj.expenses.aggregate(total=serializers.Sum('amount'))['total']
@@ -31,6 +31,7 @@ from api.viewsets import (
     MaintenanceRequestViewSet,
     MaintenanceAttachmentViewSet,
     MaintenanceScheduleViewSet,
+    PropertyPnLViewSet,
 )
 
 router = DefaultRouter()
@@ -61,6 +62,9 @@ router.register(r'maintenance/requests', MaintenanceRequestViewSet, basename='ma
 router.register(r'maintenance/attachments', MaintenanceAttachmentViewSet, basename='maintenanceattachment')
 router.register(r'maintenance/schedules', MaintenanceScheduleViewSet, basename='maintenanceschedule')
 
+# Financial
+router.register(r'financial/property-pnl', PropertyPnLViewSet, basename='propertypnl')
+
 # Swagger Documentation
 schema_view = get_schema_view(
     openapi.Info(
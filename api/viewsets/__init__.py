@@ -19,6 +19,7 @@ from .contract_viewsets import (
     ContractPaymentViewSet,
     ContractRenewalViewSet,
 )
+from .financial_viewsets import PropertyPnLViewSet
 from .maintenance_viewsets import (
     MaintenanceCategoryViewSet,
     MaintenanceRequestViewSet,
@@ -45,4 +46,5 @@ __all__ = [
     'MaintenanceRequestViewSet',
     'MaintenanceAttachmentViewSet',
     'MaintenanceScheduleViewSet',
+    'PropertyPnLViewSet',
 ]
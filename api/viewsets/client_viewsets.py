@@ -1,20 +1,21 @@
 """
 Client ViewSets for REST API
 """
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.clients.models import Client
+from api.filters import IndexedSearchFilter, RankAwareOrderingFilter
 from api.serializers import ClientSerializer, ClientListSerializer
 
 
 class ClientViewSet(viewsets.ModelViewSet):
-    queryset = Client.objects.all()
+    queryset = Client.objects.with_metrics()
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, RankAwareOrderingFilter]
     search_fields = ['name', 'email', 'phone', 'national_id']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'contracts_count', 'total_paid', 'outstanding']
     ordering = ['name']
 
     def get_serializer_class(self):
@@ -1,11 +1,12 @@
 """
 Contract ViewSets for REST API
 """
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.contracts.models import Contract, ContractPayment, ContractRenewal
+from api.filters import IndexedSearchFilter, RankAwareOrderingFilter
 from api.serializers import (
     ContractSerializer,
     ContractListSerializer,
@@ -17,7 +18,7 @@ from api.serializers import (
 class ContractViewSet(viewsets.ModelViewSet):
     queryset = Contract.objects.select_related('property', 'client')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, RankAwareOrderingFilter]
     search_fields = ['contract_number', 'property__code', 'client__name']
     ordering_fields = ['start_date', 'created_at']
     ordering = ['-created_at']
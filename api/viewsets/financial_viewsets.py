@@ -0,0 +1,37 @@
+"""
+Financial ViewSets for REST API
+"""
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.financial.pnl import PropertyPnLService
+
+
+class PropertyPnLViewSet(viewsets.ViewSet):
+    """
+    Portfolio P&L from the monthly rollup.
+    ?group_by=property|owner|city|property_type|period|category,
+    filters: owner, city, property_type, from_date, to_date, source
+    """
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        filters = PropertyPnLService.parse_filters(request.query_params)
+        report = PropertyPnLService.slice(**filters)
+        fields, _ = PropertyPnLService.GROUPINGS[report['group_by']]
+        return Response({
+            'group_by': report['group_by'],
+            'filters': {key: value for key, value in filters.items() if key != 'group_by' and value is not None},
+            'results': [
+                {
+                    'key': {field: row[field] for field in fields},
+                    'label': row['label'],
+                    'revenue': float(row['revenue']),
+                    'expense': float(row['expense']),
+                    'net': float(row['net']),
+                }
+                for row in report['rows']
+            ],
+            'totals': {key: float(value) for key, value in report['totals'].items()},
+        })
@@ -1,7 +1,7 @@
 """
 Maintenance ViewSets for REST API
 """
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -11,6 +11,7 @@ from apps.maintenance.models import (
     MaintenanceAttachment,
     MaintenanceSchedule,
 )
+from api.filters import IndexedSearchFilter, RankAwareOrderingFilter
 from api.serializers import (
     MaintenanceCategorySerializer,
     MaintenanceRequestSerializer,
@@ -29,7 +30,7 @@ class MaintenanceCategoryViewSet(viewsets.ModelViewSet):
 class MaintenanceRequestViewSet(viewsets.ModelViewSet):
     queryset = MaintenanceRequest.objects.select_related('property', 'category')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, RankAwareOrderingFilter]
     search_fields = ['request_number', 'title', 'description']
     ordering_fields = ['request_date', 'created_at']
     ordering = ['-created_at']
@@ -8,15 +8,16 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.owners.models import Owner
+from apps.owners.portfolio import OwnerPortfolioService
 from api.serializers import OwnerSerializer, OwnerListSerializer
 
 
 class OwnerViewSet(viewsets.ModelViewSet):
-    queryset = Owner.objects.all()
+    queryset = OwnerPortfolioService.annotate(Owner.objects.all())
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'email', 'phone', 'national_id']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'properties_count', 'market_value', 'active_rent', 'revenue']
     ordering = ['name']
 
     def get_serializer_class(self):
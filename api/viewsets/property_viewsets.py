@@ -6,7 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Avg, Count, Q
+from django.db.models import Sum, Avg, Count
 
 from apps.properties.models import (
     PropertyType,
@@ -19,6 +19,10 @@ from apps.properties.models import (
     PropertyExpense,
     PropertyRevenue,
 )
+from apps.properties.financials import PropertyFinancialService
+from apps.properties.mapping import InvalidBoundingBox, PropertyMapService
+from apps.properties.occupancy import OccupancyService
+from api.filters import IndexedSearchFilter, RankAwareOrderingFilter
 from api.serializers import (
     PropertyTypeSerializer,
     PropertySerializer,
@@ -47,9 +51,9 @@ class PropertyTypeViewSet(viewsets.ModelViewSet):
 
 class PropertyViewSet(viewsets.ModelViewSet):
     """ViewSet for Property model with advanced features"""
-    queryset = Property.objects.select_related('property_type', 'owner').prefetch_related('images')
+    queryset = Property.objects.select_related('property_type', 'owner', 'primary_image').prefetch_related('images')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, RankAwareOrderingFilter]
     search_fields = ['code', 'title', 'address', 'city', 'district']
     ordering_fields = ['created_at', 'rental_price_monthly', 'area_sqm', 'code']
     ordering = ['-created_at']
@@ -65,6 +69,13 @@ class PropertyViewSet(viewsets.ModelViewSet):
         'area_sqm': ['gte', 'lte'],
     }
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # The list serializer only needs primary_image
+            return queryset.prefetch_related(None)
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'list':
             return PropertyListSerializer
@@ -102,47 +113,52 @@ class PropertyViewSet(viewsets.ModelViewSet):
     def financial_summary(self, request, pk=None):
         """Get financial summary for a property"""
         property_obj = self.get_object()
+        summary = PropertyFinancialService.summary(property_obj)
         
-        total_revenues = property_obj.revenues.aggregate(total=Sum('amount'))['total'] or 0
-        total_expenses = property_obj.expenses.aggregate(total=Sum('amount'))['total'] or 0
-        net_income = total_revenues - total_expenses
-        
-        summary = {
+        return Response(summary)
+
+    @action(detail=True, methods=['get'])
+    def occupancy(self, request, pk=None):
+        """Occupied and vacant intervals since the first contract"""
+        property_obj = self.get_object()
+        timeline = OccupancyService.history(property_obj)
+        return Response({
             'property_code': property_obj.code,
-            'total_revenues': float(total_revenues),
-            'total_expenses': float(total_expenses),
-            'net_income': float(net_income),
-            'rental_price_monthly': float(property_obj.rental_price_monthly or 0),
-            'market_value': float(property_obj.market_value or 0),
-            'purchase_price': float(property_obj.purchase_price or 0),
             'occupancy_rate': float(property_obj.occupancy_rate or 0),
-            'average_roi': float(property_obj.average_roi or 0),
-        }
-        
-        return Response(summary)
+            'lifetime_occupancy_rate': float(timeline.rate),
+            'occupied': [{'start': start, 'end': end} for start, end in timeline.occupied],
+            'vacant': [{'start': start, 'end': end} for start, end in timeline.vacancies],
+            'vacant_days': timeline.vacant_days,
+        })
+
+    @action(detail=False, methods=['get'])
+    def vacancy(self, request):
+        """Portfolio vacancy by ?group_by=city (default) or property_type"""
+        group_by = request.query_params.get('group_by', 'city')
+        if group_by not in ('city', 'property_type'):
+            return Response({'error': 'group_by must be city or property_type'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(OccupancyService.vacancy_by(group_by))
 
     @action(detail=False, methods=['get'])
     def map_data(self, request):
-        """Get properties with coordinates for map display"""
-        properties = self.get_queryset().exclude(
-            Q(latitude__isnull=True) | Q(longitude__isnull=True)
-        )
-        
-        map_data = [
-            {
-                'id': prop.id,
-                'code': prop.code,
-                'title': prop.title,
-                'latitude': float(prop.latitude),
-                'longitude': float(prop.longitude),
-                'status': prop.status,
-                'rent': float(prop.rental_price_monthly or 0),
-                'city': prop.city,
-            }
-            for prop in properties
-        ]
-        
-        return Response(map_data)
+        """
+        Markers or clusters visible in ?bbox=west,south,east,north at ?zoom=,
+        as compact rows (see "fields"); 304 when If-None-Match still matches
+        """
+        queryset = self.filter_queryset(Property.objects.all())
+        try:
+            etag, payload = PropertyMapService.cached_payload(queryset, request.query_params)
+        except InvalidBoundingBox:
+            return Response({'error': 'Invalid bbox'}, status=status.HTTP_400_BAD_REQUEST)
+
+        quoted = f'"{etag}"'
+        if quoted in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response['ETag'] = quoted
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 class PropertyImageViewSet(viewsets.ModelViewSet):
@@ -1,10 +1,97 @@
 """
 Client models for Origin App Real Estate Management System.
 """
+from datetime import timedelta
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, ExtractDay, ExtractMonth, ExtractYear
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 
+MONEY = models.DecimalField(max_digits=15, decimal_places=2)
+
+
+def _per_client(queryset, aggregate, output_field):
+    """Correlated subquery of one aggregate over queryset, per outer client"""
+    grouped = queryset.filter(client=OuterRef('pk')).order_by().values('client')
+    zero = Value(Decimal('0.00')) if output_field is MONEY else Value(0)
+    return Coalesce(
+        Subquery(grouped.annotate(total=aggregate).values('total'), output_field=output_field),
+        zero,
+        output_field=output_field,
+    )
+
+
+class ClientQuerySet(models.QuerySet):
+    """Client queries with ledger figures computed in SQL"""
+
+    def with_metrics(self):
+        """
+        Annotate contracts_count, active_contracts_count, monthly_rent,
+        total_paid and outstanding. Each comes from its own subquery, so a
+        page of clients stays one SELECT however many contracts and
+        payments they have.
+
+        outstanding is (rent + fees) x whole months of the term, less what
+        was paid, summed over active contracts. The months match
+        Contract.get_duration_months(), but unlike
+        Contract.get_outstanding_balance() pending, failed and refunded
+        payments are not counted as paid.
+        """
+        from apps.contracts.models import Contract, ContractPayment
+
+        active = Contract.objects.filter(status='active')
+        months = (
+            (ExtractYear('end_date') - ExtractYear('start_date')) * 12
+            + ExtractMonth('end_date') - ExtractMonth('start_date')
+        )
+        # relativedelta drops the last month when it is not complete; a term
+        # ending on the last day of a month is complete however short the month
+        active_terms = active.annotate(
+            start_day=ExtractDay('start_date'),
+            end_day=ExtractDay('end_date'),
+            day_after_end=ExtractDay(models.ExpressionWrapper(
+                F('end_date') + timedelta(days=1), output_field=models.DateField()
+            )),
+        ).annotate(
+            months=months - models.Case(
+                models.When(end_day__lt=F('start_day'), day_after_end__gt=1, then=Value(1)),
+                default=Value(0),
+            )
+        )
+        total_due = (F('rent_amount') + F('maintenance_fee') + F('utility_charges')) * F('months')
+        # Older rows use 'paid' rather than 'completed'
+        completed = ContractPayment.objects.exclude(status__in=['pending', 'failed', 'refunded'])
+
+        return self.annotate(
+            contracts_count=_per_client(Contract.objects.all(), Count('pk'), models.IntegerField()),
+            active_contracts_count=_per_client(active, Count('pk'), models.IntegerField()),
+            monthly_rent=_per_client(active, Sum('rent_amount'), MONEY),
+            total_paid=Coalesce(
+                Subquery(
+                    completed.filter(contract__client=OuterRef('pk')).order_by()
+                    .values('contract__client').annotate(total=Sum('amount')).values('total'),
+                    output_field=MONEY,
+                ),
+                Value(Decimal('0.00')),
+                output_field=MONEY,
+            ),
+            active_due=_per_client(active_terms, Sum(total_due, output_field=MONEY), MONEY),
+            active_paid=Coalesce(
+                Subquery(
+                    completed.filter(contract__client=OuterRef('pk'), contract__status='active').order_by()
+                    .values('contract__client').annotate(total=Sum('amount')).values('total'),
+                    output_field=MONEY,
+                ),
+                Value(Decimal('0.00')),
+                output_field=MONEY,
+            ),
+        ).annotate(
+            outstanding=models.ExpressionWrapper(F('active_due') - F('active_paid'), output_field=MONEY),
+        )
+
 
 class Client(models.Model):
     """
@@ -82,17 +169,24 @@ class Client(models.Model):
             models.Index(fields=['is_active']),
         ]
 
+    objects = ClientQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     def get_active_contracts_count(self):
         """Get number of active contracts."""
+        if hasattr(self, 'active_contracts_count'):
+            return self.active_contracts_count
         return self.contracts.filter(status='active').count()
 
     def get_total_rent_payments(self):
         """Get total rent amount for all active contracts."""
-        active_contracts = self.contracts.filter(status='active')
-        return sum(c.rent_amount for c in active_contracts)
+        if hasattr(self, 'monthly_rent'):
+            return self.monthly_rent
+        return self.contracts.filter(status='active').aggregate(
+            total=Sum('rent_amount')
+        )['total'] or 0
 
     def has_active_contract(self):
         """Check if client has any active contract."""
@@ -0,0 +1,85 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract, ContractPayment
+from apps.core.testing import create_client, create_property
+
+
+class ClientLedgerTests(TestCase):
+    """Client contract and payment figures are annotated in SQL"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = create_property('C-1', title='Flat')
+        cls.tenant = create_client('CLI-L')
+        # 10 whole months: the 15th to the 10th drops the last partial month
+        active = Contract.objects.create(
+            contract_number='CL-1', property=cls.property, client=cls.tenant,
+            start_date=date(2026, 1, 15), end_date=date(2026, 12, 10), rent_amount=Decimal('1000.00'),
+            maintenance_fee=Decimal('100.00'), status='active',
+        )
+        old = Contract.objects.create(
+            contract_number='CL-0', property=cls.property, client=cls.tenant,
+            start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), rent_amount=Decimal('900.00'),
+            status='expired',
+        )
+        for contract, amount, status in [(active, '1100.00', 'completed'), (active, '1100.00', 'paid'),
+                                         (active, '1100.00', 'failed'), (old, '900.00', 'completed')]:
+            ContractPayment.objects.create(
+                contract=contract, payment_date=date(2026, 2, 1), amount=Decimal(amount), status=status
+            )
+
+    def test_with_metrics(self):
+        tenant = Client.objects.with_metrics().get(pk=self.tenant.pk)
+        self.assertEqual((tenant.contracts_count, tenant.active_contracts_count), (2, 1))
+        self.assertEqual(tenant.total_paid, Decimal('3100.00'))
+        self.assertEqual(tenant.monthly_rent, Decimal('1000.00'))
+        active = self.tenant.contracts.get(status='active')
+        self.assertEqual(active.get_duration_months(), 10)
+        self.assertEqual(tenant.outstanding, Decimal('11000.00') - Decimal('2200.00'))
+
+    def test_month_end_terms_match_duration_months(self):
+        tenant = create_client('CLI-M')
+        terms = [
+            (date(2023, 3, 31), date(2023, 4, 30)),
+            (date(2023, 1, 31), date(2023, 2, 28)),
+            (date(2024, 1, 31), date(2024, 2, 28)),
+            (date(2023, 1, 30), date(2023, 2, 27)),
+            (date(2023, 1, 31), date(2023, 3, 30)),
+        ]
+        for index, (start, end) in enumerate(terms):
+            Contract.objects.filter(client=tenant).delete()
+            contract = Contract.objects.create(
+                contract_number=f'CL-M{index}', property=self.property, client=tenant,
+                start_date=start, end_date=end, rent_amount=Decimal('1000.00'), status='active',
+            )
+            with self.subTest(start=start, end=end):
+                annotated = Client.objects.with_metrics().get(pk=tenant.pk)
+                self.assertEqual(annotated.outstanding, contract.get_outstanding_balance())
+
+    def test_list_queries_do_not_grow_with_clients(self):
+        self.client.force_login(User.objects.create_user('tenants', password='pass', is_staff=True))
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/en/api/v1/clients/').status_code, 200)
+                self.assertEqual(self.client.get(reverse('clients:list')).status_code, 200)
+            return len(queries)
+
+        baseline = list_queries()
+        Client.objects.bulk_create([
+            Client(name=f'Tenant {index}', phone='+201000000002', national_id=f'CLI-B{index}', address='Street')
+            for index in range(30)
+        ])
+        self.assertEqual(list_queries(), baseline)
+
+        response = self.client.get(reverse('clients:detail', args=[self.tenant.pk]))
+        self.assertEqual(response.context['properties_count'], 1)
+        self.assertEqual(response.context['expired_contracts'], 1)
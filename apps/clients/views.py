@@ -7,14 +7,24 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum
 
+from apps.core.exports import ExportService
+
 from .models import Client
 from .forms import ClientForm, ClientSearchForm
 
 
+CLIENT_EXPORT_COLUMNS = [
+    ('Name', 'name'), ('National ID', 'national_id'), ('Phone', 'phone'), ('Email', 'email'),
+    ('City', 'city'), ('Country', 'country'), ('Active', 'is_active'),
+    ('Contracts', 'contracts_count'), ('Active Contracts', 'active_contracts_count'),
+    ('Monthly Rent', 'monthly_rent'), ('Total Paid', 'total_paid'), ('Outstanding', 'outstanding'),
+]
+
+
 @login_required
 def client_list(request):
     """List all clients with search and filter"""
-    queryset = Client.objects.annotate(contracts_count=Count('contracts'))
+    queryset = Client.objects.with_metrics()
     
     search_form = ClientSearchForm(request.GET)
     if search_form.is_valid():
@@ -47,20 +57,28 @@ def client_list(request):
         'newest': '-created_at',
         'oldest': 'created_at',
         'contracts': '-contracts_count',
+        'outstanding': '-outstanding',
     }
     queryset = queryset.order_by(sort_mapping.get(sort_option, 'name'))
     
+    if request.GET.get('export'):
+        return ExportService.response(request, queryset, CLIENT_EXPORT_COLUMNS, 'clients')
+    
     paginator = Paginator(queryset, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
     
     # Calculate statistics
     from apps.contracts.models import Contract
-    total_count = Client.objects.count()
-    active_count = Client.objects.filter(is_active=True).count()
-    active_contracts = Contract.objects.filter(status='active').count()
-    monthly_revenue = Contract.objects.filter(status='active').aggregate(
-        total=Sum('rent_amount')
-    )['total'] or 0
+    client_counts = Client.objects.aggregate(
+        total=Count('pk'), active=Count('pk', filter=Q(is_active=True))
+    )
+    total_count = client_counts['total']
+    active_count = client_counts['active']
+    contract_totals = Contract.objects.filter(status='active').aggregate(
+        count=Count('pk'), total=Sum('rent_amount')
+    )
+    active_contracts = contract_totals['count']
+    monthly_revenue = contract_totals['total'] or 0
     
     context = {
         'clients': page_obj,
@@ -115,25 +133,23 @@ def client_update(request, pk):
 @login_required
 def client_detail(request, pk):
     """Client detail view with contracts and properties"""
-    client = get_object_or_404(Client, pk=pk)
+    client = get_object_or_404(Client.objects.with_metrics(), pk=pk)
     
     # Get all rental contracts
-    contracts = client.contracts.select_related('property', 'property__property_type').all()
-    
-    # Get properties from contracts
-    properties = [contract.property for contract in contracts if contract.property]
+    contracts = list(client.contracts.select_related('property', 'property__property_type'))
     
-    # Statistics
-    active_contracts_count = contracts.filter(status='active').count()
-    expired_contracts_count = contracts.filter(status='expired').count()
+    # Distinct properties from contracts, most recent contract first
+    properties = list({
+        contract.property_id: contract.property for contract in contracts if contract.property
+    }.values())
     
     context = {
         'client': client,
         'contracts': contracts,
         'properties': properties,
-        'contracts_count': contracts.count(),
-        'active_contracts': active_contracts_count,
-        'expired_contracts': expired_contracts_count,
+        'contracts_count': client.contracts_count,
+        'active_contracts': client.active_contracts_count,
+        'expired_contracts': sum(1 for contract in contracts if contract.status == 'expired'),
         'properties_count': len(properties),
     }
     return render(request, 'clients/detail.html', context)
@@ -0,0 +1,56 @@
+"""
+PDF payload of rental contracts (rendered by apps.core.pdf)
+"""
+from django.utils.translation import gettext as _
+
+from apps.core.pdf import PdfService
+from .models import Contract
+
+
+class ContractDocumentService:
+    """Rental contract documents"""
+
+    @staticmethod
+    def contracts_for_month(year, month):
+        """Contracts starting in the month"""
+        return Contract.objects.filter(start_date__year=year, start_date__month=month).select_related(
+            'property__owner', 'client'
+        ).order_by('contract_number')
+
+    @staticmethod
+    def contract(contract):
+        """Payload of a rental contract with its financial terms"""
+        money = PdfService.money
+        prop = contract.property
+        owner = prop.owner if prop.owner_id else None
+        return PdfService.document(
+            'contract', _('Rental Contract'), contract.contract_number,
+            fields=[
+                (_('Contract Type'), contract.get_contract_type_display()),
+                (_('Status'), contract.get_status_display()),
+                (_('Property'), str(prop)),
+                (_('Address'), ', '.join(part for part in (prop.address, prop.city) if part)),
+                (_('Landlord'), owner.name if owner else None),
+                (_('Landlord National ID'), owner.national_id if owner else None),
+                (_('Tenant'), contract.client.name),
+                (_('Tenant National ID'), contract.client.national_id),
+                (_('Start Date'), PdfService.date(contract.start_date)),
+                (_('End Date'), PdfService.date(contract.end_date)),
+                (_('Signed Date'), PdfService.date(contract.signed_date) if contract.signed_date else None),
+                (_('Payment Frequency'), contract.get_payment_frequency_display()),
+                (_('Payment Day of Month'), contract.payment_day),
+                (_('Auto Renew'), _('Yes') if contract.auto_renew else _('No')),
+            ],
+            totals=[
+                (_('Rent Amount'), money(contract.rent_amount)),
+                (_('Maintenance Fee'), money(contract.maintenance_fee)),
+                (_('Utility Charges'), money(contract.utility_charges)),
+                (_('Security Deposit'), money(contract.security_deposit)),
+                (_('Total per Period'), money(contract.get_total_amount())),
+            ],
+            sections=[
+                (_('Terms and Conditions'), contract.terms_and_conditions),
+                (_('Special Conditions'), contract.special_conditions),
+            ],
+            signatures=[_('Landlord'), _('Tenant'), _('Witness')],
+        )
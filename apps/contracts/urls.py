@@ -10,6 +10,7 @@ urlpatterns = [
     path('', views.contract_list, name='list'),
     path('create/', views.contract_create, name='create'),
     path('<int:pk>/', views.contract_detail, name='detail'),
+    path('<int:pk>/pdf/', views.contract_pdf, name='pdf'),
     path('<int:pk>/edit/', views.contract_update, name='update'),
     path('<int:pk>/delete/', views.contract_delete, name='delete'),
     path('<int:contract_pk>/payments/add/', views.contract_payment_create, name='payment_create'),
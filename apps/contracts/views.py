@@ -8,6 +8,10 @@ from django.db.models import Q, Sum, Count
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
+from apps.core.exports import ExportService
+from apps.core.pdf import PdfService
+
+from .documents import ContractDocumentService
 from .forms import (
     ContractForm,
     ContractPaymentForm,
@@ -16,6 +20,14 @@ from .forms import (
 )
 from .models import Contract, ContractPayment, ContractRenewal
 
+CONTRACT_EXPORT_COLUMNS = [
+    ('Contract Number', 'contract_number'), ('Property Code', 'property__code'), ('Property', 'property__title'),
+    ('Client', 'client__name'), ('Type', 'contract_type'), ('Status', 'status'),
+    ('Start Date', 'start_date'), ('End Date', 'end_date'), ('Monthly Rent', 'rent_amount'),
+    ('Security Deposit', 'security_deposit'), ('Payment Frequency', 'payment_frequency'),
+    ('Payment Day', 'payment_day'), ('Auto Renew', 'auto_renew'),
+]
+
 @login_required
 def contract_list(request):
     """List all contracts with advanced filtering and insights."""
@@ -66,6 +78,9 @@ def contract_list(request):
     }
     queryset = queryset.order_by(sort_mapping.get(sort_option, '-start_date'))
 
+    if request.GET.get('export'):
+        return ExportService.response(request, queryset, CONTRACT_EXPORT_COLUMNS, 'contracts')
+
     filtered_rent_total = queryset.aggregate(total=Sum('rent_amount'))['total'] or 0
 
     paginator = Paginator(queryset, 20)
@@ -133,6 +148,14 @@ def contract_detail(request, pk):
     return render(request, 'contracts/detail.html', context)
 
 
+@login_required
+def contract_pdf(request, pk):
+    """Rental contract as PDF"""
+    contract = get_object_or_404(Contract.objects.select_related('property__owner', 'client'), pk=pk)
+    payload = ContractDocumentService.contract(contract)
+    return PdfService.response(request, payload, f'{contract.contract_number}.pdf')
+
+
 @login_required
 def contract_create(request):
     """Create new contract"""
@@ -6,8 +6,9 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from .models import (
     Permission, Role, UserProfile, AuditLog,
-    SystemSetting, Notification, NotificationPreference
+    SystemSetting, Notification, NotificationPreference, DashboardSnapshot
 )
+from .services import NotificationService
 
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -75,9 +76,12 @@ class SystemSettingAdmin(admin.ModelAdmin):
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['user', 'title', 'notification_type', 'priority', 'is_read', 'is_sent_email', 'created_at']
-    list_filter = ['notification_type', 'priority', 'is_read', 'is_sent_email', 'created_at']
+    list_filter = ['notification_type', 'priority', 'is_read', 'is_sent_email', 'email_pending', 'email_digest', 'is_archived', 'created_at']
     search_fields = ['user__username', 'user__email', 'title', 'message']
-    readonly_fields = ['created_at', 'read_at', 'email_sent_at']
+    readonly_fields = [
+        'created_at', 'read_at', 'email_sent_at', 'email_attempts',
+        'email_last_attempt_at', 'email_next_attempt_at', 'email_last_error', 'email_delivery_ms'
+    ]
     list_select_related = ['user']
     
     fieldsets = (
@@ -95,7 +99,17 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('link', 'action_label', 'action_url')
         }),
         ('Status', {
-            'fields': ('is_read', 'read_at', 'is_sent_email', 'email_sent_at')
+            'fields': (
+                'is_read', 'read_at', 'is_archived', 'archived_at',
+                'is_sent_email', 'email_sent_at', 'email_pending', 'email_digest'
+            )
+        }),
+        ('Email Delivery', {
+            'fields': (
+                'email_attempts', 'email_last_attempt_at', 'email_next_attempt_at',
+                'email_last_error', 'email_delivery_ms'
+            ),
+            'classes': ('collapse',)
         }),
         ('Scheduling', {
             'fields': ('scheduled_for',),
@@ -129,6 +143,16 @@ class NotificationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{count} email notifications sent.')
     send_email_notifications.short_description = 'Send email for selected'
 
+    # Deletes have no signal receiver, so invalidate the cached unread counts here
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        NotificationService.bump_unread_version([obj.user_id])
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        NotificationService.bump_unread_version(user_ids)
+
 
 @admin.register(NotificationPreference)
 class NotificationPreferenceAdmin(admin.ModelAdmin):
@@ -168,3 +192,11 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(DashboardSnapshot)
+class DashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['metric', 'is_dirty', 'refreshed_at', 'refresh_duration_ms']
+    list_filter = ['is_dirty']
+    search_fields = ['metric']
+    readonly_fields = ['metric', 'value', 'refreshed_at', 'refresh_duration_ms']
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Core'
+    
+    def ready(self):
+        """Connect dashboard snapshot, unread count, digest and search index signals when app is ready"""
+        from apps.core import digest, search, services, snapshots
+        snapshots.connect_signals()
+        services.connect_signals()
+        digest.connect_signals()
+        search.connect_signals()
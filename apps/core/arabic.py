@@ -0,0 +1,155 @@
+"""
+Arabic shaping and right-to-left ordering for PDF output
+ReportLab draws code points one after another, left to right: Arabic
+letters have to be replaced by their contextual presentation forms
+(isolated, final, initial, medial) and each line reversed into visual
+order, keeping embedded numbers and Latin text left to right.
+"""
+# letter: (isolated presentation form, joins to the following letter)
+# Final is isolated + 1; initial and medial (+2, +3) exist for joining letters
+LETTERS = {
+    'ء': ('ﺀ', False),
+    'آ': ('ﺁ', False), 'أ': ('ﺃ', False), 'ؤ': ('ﺅ', False),
+    'إ': ('ﺇ', False), 'ئ': ('ﺉ', True), 'ا': ('ﺍ', False),
+    'ب': ('ﺏ', True), 'ة': ('ﺓ', False), 'ت': ('ﺕ', True),
+    'ث': ('ﺙ', True), 'ج': ('ﺝ', True), 'ح': ('ﺡ', True),
+    'خ': ('ﺥ', True), 'د': ('ﺩ', False), 'ذ': ('ﺫ', False),
+    'ر': ('ﺭ', False), 'ز': ('ﺯ', False), 'س': ('ﺱ', True),
+    'ش': ('ﺵ', True), 'ص': ('ﺹ', True), 'ض': ('ﺽ', True),
+    'ط': ('ﻁ', True), 'ظ': ('ﻅ', True), 'ع': ('ﻉ', True),
+    'غ': ('ﻍ', True), 'ف': ('ﻑ', True), 'ق': ('ﻕ', True),
+    'ك': ('ﻙ', True), 'ل': ('ﻝ', True), 'م': ('ﻡ', True),
+    'ن': ('ﻥ', True), 'ه': ('ﻩ', True), 'و': ('ﻭ', False),
+    'ى': ('ﻯ', False), 'ي': ('ﻱ', True),
+}
+# Hamza has a single form
+SINGLE_FORM = {'ء'}
+TATWEEL = 'ـ'
+LAM = 'ل'
+# alef variant: isolated lam-alef ligature (final is + 1)
+LAM_ALEF = {'آ': 'ﻵ', 'أ': 'ﻷ', 'إ': 'ﻹ', 'ا': 'ﻻ'}
+# Brackets are mirrored inside right-to-left runs
+MIRRORED = dict(zip('()[]{}<>«»', ')(][}{><»«'))
+
+
+def is_arabic(char):
+    code = ord(char)
+    return (0x0600 <= code <= 0x06ff or 0x0750 <= code <= 0x077f
+            or 0xfb50 <= code <= 0xfdff or 0xfe70 <= code <= 0xfeff)
+
+
+def _is_mark(char):
+    """Harakat and other combining marks; transparent to joining"""
+    return 'ً' <= char <= 'ٟ' or char == 'ٰ'
+
+
+def has_arabic(text):
+    return any(is_arabic(char) for char in text)
+
+
+def _joins_forward(char):
+    return char == TATWEEL or (char in LETTERS and LETTERS[char][1])
+
+
+def shape(text):
+    """Replace Arabic letters with their contextual presentation forms"""
+    if not has_arabic(text):
+        return text
+    letters = list(text)
+    count = len(letters)
+
+    def neighbour(index, step):
+        index += step
+        while 0 <= index < count and _is_mark(letters[index]):
+            index += step
+        return letters[index] if 0 <= index < count else None
+
+    shaped = []
+    skip = False
+    for index, char in enumerate(letters):
+        if skip:
+            skip = False
+            continue
+        if char not in LETTERS:
+            shaped.append(char)
+            continue
+        joins_previous = _joins_forward(neighbour(index, -1) or '')
+        following = neighbour(index, 1)
+        if char == LAM and following in LAM_ALEF and letters[index + 1] == following:
+            shaped.append(chr(ord(LAM_ALEF[following]) + joins_previous))
+            skip = True
+            continue
+        isolated, dual = LETTERS[char]
+        if char in SINGLE_FORM:
+            shaped.append(isolated)
+            continue
+        joins_next = dual and following is not None and (following in LETTERS or following == TATWEEL)
+        if joins_previous and joins_next:
+            offset = 3
+        elif joins_next:
+            offset = 2
+        else:
+            offset = 1 if joins_previous else 0
+        shaped.append(chr(ord(isolated) + offset))
+    return ''.join(shaped)
+
+
+def _direction(char):
+    # Digits run left to right, Arabic-Indic ones (U+0660, U+06F0) included
+    if char.isdigit():
+        return 'L'
+    if is_arabic(char):
+        return 'R'
+    if char.isalnum():
+        return 'L'
+    return None
+
+
+def visual(text, rtl=None):
+    """
+    One line in display order. rtl is the base direction; None takes it
+    from the first strong character. Neutral characters between runs of
+    the same direction join that run, the others follow the base direction.
+    """
+    directions = [_direction(char) for char in text]
+    # Digits are laid out left to right but do not set the base direction
+    strong = [direction for char, direction in zip(text, directions) if direction and not char.isdigit()]
+    if rtl is None:
+        rtl = bool(strong) and strong[0] == 'R'
+    if 'R' not in strong:
+        return text
+    base = 'R' if rtl else 'L'
+
+    resolved = list(directions)
+    index = 0
+    while index < len(text):
+        if resolved[index]:
+            index += 1
+            continue
+        end = index
+        while end < len(text) and not directions[end]:
+            end += 1
+        before = resolved[index - 1] if index else base
+        after = directions[end] if end < len(text) else base
+        fill = before if before == after else base
+        resolved[index:end] = [fill] * (end - index)
+        index = end
+
+    runs = []
+    for char, direction in zip(text, resolved):
+        if runs and runs[-1][0] == direction:
+            runs[-1][1].append(char)
+        else:
+            runs.append((direction, [char]))
+    pieces = [
+        ''.join(MIRRORED.get(char, char) for char in reversed(chars)) if direction == 'R' else ''.join(chars)
+        for direction, chars in runs
+    ]
+    if rtl:
+        pieces.reverse()
+    return ''.join(pieces)
+
+
+def display(text, rtl=None):
+    """shape() then visual() for a single line of text"""
+    return visual(shape(text), rtl)
@@ -0,0 +1,160 @@
+"""
+Benchmark runner - cold and warm timings, query counts and response sizes
+of the key pages and API endpoints, emitted as JSON so runs on different
+commits (or datasets) can be compared
+"""
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+BENCHMARK_USERNAME = 'benchmark'
+
+
+def _first_property_pk():
+    from apps.properties.models import Property
+    return Property.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+# name: (url name, kwargs factory or None)
+TARGETS = {
+    'dashboard': ('core:dashboard', None),
+    'property_list': ('properties:list', None),
+    'property_dashboard': ('properties:dashboard', None),
+    'property_financial_report': ('properties:financial_report', lambda: {'pk': _first_property_pk()}),
+    'financial_dashboard': ('financial:dashboard', None),
+    'profit_loss': ('financial:report_profit_loss', None),
+    'property_pnl': ('financial:report_property_pnl', None),
+    'sales_dashboard': ('sales:dashboard', None),
+    'api_properties': ('property-list', None),
+    'api_owners': ('owner-list', None),
+    'api_clients': ('client-list', None),
+}
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BenchmarkRunner:
+    """Time TARGETS through the test client as a superuser"""
+
+    def __init__(self, repeat=5, only=None):
+        self.repeat = repeat
+        self.targets = {name: TARGETS[name] for name in (only or TARGETS)}
+        self.client = TestClient()
+        self.client.force_login(self._user())
+
+    @staticmethod
+    def _user():
+        User = get_user_model()
+        user = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if user is None:
+            user, _created = User.objects.get_or_create(
+                username=BENCHMARK_USERNAME,
+                defaults={'is_staff': True, 'is_superuser': True},
+            )
+        return user
+
+    def _request(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        return response.status_code, elapsed, len(queries), size
+
+    def run_target(self, name):
+        url_name, kwargs_factory = self.targets[name]
+        kwargs = kwargs_factory() if kwargs_factory else None
+        if kwargs and None in kwargs.values():
+            return {'url_name': url_name, 'skipped': 'no data'}
+        url = reverse(url_name, kwargs=kwargs)
+
+        cache.clear()
+        status, cold_ms, queries, size = self._request(url)
+        warm = []
+        warm_queries = queries
+        for _ in range(self.repeat):
+            _status, elapsed, warm_queries, _size = self._request(url)
+            warm.append(elapsed)
+        return {
+            'url_name': url_name,
+            'url': url,
+            'status': status,
+            'bytes': size,
+            'cold_ms': round(cold_ms, 1),
+            'cold_queries': queries,
+            'warm_queries': warm_queries,
+            'min_ms': round(min(warm), 1) if warm else None,
+            'median_ms': round(statistics.median(warm), 1) if warm else None,
+            'p95_ms': round(_percentile(warm, 0.95), 1) if warm else None,
+        }
+
+    @staticmethod
+    def metadata():
+        from apps.contracts.models import Contract
+        from apps.financial.models import JournalEntry
+        from apps.properties.models import Property
+        from apps.sales.models import SalesContract
+
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'rows': {
+                'properties': Property.objects.count(),
+                'contracts': Contract.objects.count(),
+                'journal_entries': JournalEntry.objects.count(),
+                'sales_contracts': SalesContract.objects.count(),
+            },
+        }
+
+    def run(self):
+        """{'meta': {...}, 'results': {name: {...}}}"""
+        return {
+            'meta': self.metadata(),
+            'repeat': self.repeat,
+            'results': {name: self.run_target(name) for name in self.targets},
+        }
+
+    @staticmethod
+    def compare(baseline, current):
+        """
+        [(name, metric, before, after, change %)] for median time and
+        query counts present in both runs
+        """
+        rows = []
+        for name, result in current['results'].items():
+            before = baseline.get('results', {}).get(name)
+            if not before:
+                continue
+            for metric in ('median_ms', 'cold_ms', 'cold_queries'):
+                old, new = before.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                change = round((new - old) * 100 / old, 1) if old else None
+                rows.append((name, metric, old, new, change))
+        return rows
@@ -0,0 +1,305 @@
+"""
+Dashboard statistics service for Origin App
+Computes the landing page counters with one conditional aggregate per model
+"""
+from dataclasses import dataclass, field, fields, asdict
+from datetime import timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import (
+    Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+)
+from django.utils import timezone
+
+
+@dataclass
+class DashboardStats:
+    """
+    Portfolio-wide counters shown on the main dashboard
+    """
+    # Properties
+    total_properties: int = 0
+    available_properties: int = 0
+    rented_properties: int = 0
+    under_maintenance: int = 0
+    sold_properties: int = 0
+    occupancy_rate: float = 0.0
+
+    # Contracts
+    total_contracts: int = 0
+    active_contracts: int = 0
+    expired_contracts: int = 0
+    terminated_contracts: int = 0
+    expiring_soon: int = 0
+    new_contracts_month: int = 0
+    avg_contract_duration: float = 0.0
+
+    # Maintenance
+    total_maintenance: int = 0
+    pending_maintenance: int = 0
+    in_progress_maintenance: int = 0
+    completed_maintenance: int = 0
+    urgent_maintenance: int = 0
+    maintenance_costs: Decimal = Decimal('0')
+
+    # Clients & Owners
+    total_clients: int = 0
+    total_owners: int = 0
+    new_clients_month: int = 0
+
+    # Sales
+    total_sales: int = 0
+    active_sales: int = 0
+    completed_sales: int = 0
+    pending_reservations: int = 0
+    approved_reservations: int = 0
+
+    # Financial
+    total_revenue: Decimal = Decimal('0')
+    payments_month: Decimal = Decimal('0')
+    pending_payments: Decimal = Decimal('0')
+    sales_revenue: Decimal = Decimal('0')
+
+    # Chart series
+    property_types_labels: list = field(default_factory=list)
+    property_types_data: list = field(default_factory=list)
+    cities_labels: list = field(default_factory=list)
+    cities_data: list = field(default_factory=list)
+    revenue_trend_labels: list = field(default_factory=list)
+    revenue_trend_data: list = field(default_factory=list)
+
+    @property
+    def contracts_labels(self):
+        return ['Active', 'Expired', 'Terminated']
+
+    @property
+    def contracts_data(self):
+        return [self.active_contracts, self.expired_contracts, self.terminated_contracts]
+
+    @classmethod
+    def from_dict(cls, values):
+        """Rebuild stats from a JSON round-tripped dict (Decimals stored as strings)"""
+        known = {}
+        for stat_field in fields(cls):
+            if stat_field.name not in values:
+                continue
+            value = values[stat_field.name]
+            if stat_field.type is Decimal and value is not None:
+                value = Decimal(str(value))
+            known[stat_field.name] = value
+        return cls(**known)
+
+    def as_dict(self):
+        """Plain dict of all counters (JSON endpoint payload)"""
+        data = asdict(self)
+        data['contracts_labels'] = self.contracts_labels
+        data['contracts_data'] = self.contracts_data
+        return data
+
+
+class DashboardStatsService:
+    """
+    Builds DashboardStats with a fixed number of queries,
+    independent of portfolio size
+    """
+
+    TREND_MONTHS = 6
+
+    # Section name -> method returning that section's DashboardStats fields
+    SECTIONS = {
+        'properties': 'property_stats',
+        'contracts': 'contract_stats',
+        'maintenance': 'maintenance_stats',
+        'people': 'people_stats',
+        'sales': 'sales_stats',
+        'financial': 'financial_stats',
+    }
+
+    @staticmethod
+    def compute(today=None):
+        """
+        Compute all dashboard counters
+        """
+        today = today or timezone.now().date()
+        values = {}
+        for section in DashboardStatsService.SECTIONS:
+            values.update(DashboardStatsService.compute_section(section, today))
+        return DashboardStats(**values)
+
+    @staticmethod
+    def compute_section(section, today=None):
+        """
+        Compute the counters of a single section as a dict
+        """
+        today = today or timezone.now().date()
+        method = getattr(DashboardStatsService, DashboardStatsService.SECTIONS[section])
+        return method(today)
+
+    @staticmethod
+    def property_stats(today):
+        from apps.properties.models import Property
+
+        counters = Property.objects.aggregate(
+            total=Count('id'),
+            available=Count('id', filter=Q(status='available')),
+            rented=Count('id', filter=Q(status='rented')),
+            maintenance=Count('id', filter=Q(status='maintenance')),
+            for_sale=Count('id', filter=Q(is_for_sale=True)),
+        )
+        occupancy_rate = 0.0
+        if counters['total']:
+            occupancy_rate = round(counters['rented'] / counters['total'] * 100, 1)
+
+        by_type = Property.objects.values('property_type__name').annotate(
+            count=Count('id')
+        ).order_by('-count')[:6]
+        by_city = Property.objects.values('city').annotate(
+            count=Count('id')
+        ).order_by('-count')[:5]
+
+        return {
+            'total_properties': counters['total'],
+            'available_properties': counters['available'],
+            'rented_properties': counters['rented'],
+            'under_maintenance': counters['maintenance'],
+            'sold_properties': counters['for_sale'],
+            'occupancy_rate': occupancy_rate,
+            'property_types_labels': [row['property_type__name'] or 'Other' for row in by_type],
+            'property_types_data': [row['count'] for row in by_type],
+            'cities_labels': [row['city'] or 'Unknown' for row in by_city],
+            'cities_data': [row['count'] for row in by_city],
+        }
+
+    @staticmethod
+    def contract_stats(today):
+        from apps.contracts.models import Contract
+
+        first_day_month = today.replace(day=1)
+        active = Q(status='active')
+        counters = Contract.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=active),
+            expired=Count('id', filter=Q(status='expired')),
+            terminated=Count('id', filter=Q(status='terminated')),
+            expiring_soon=Count('id', filter=active & Q(
+                end_date__gte=today,
+                end_date__lte=today + timedelta(days=30),
+            )),
+            new_month=Count('id', filter=Q(created_at__date__gte=first_day_month)),
+            avg_duration=Avg(
+                ExpressionWrapper(F('end_date') - F('start_date'), output_field=DurationField()),
+                filter=active,
+            ),
+        )
+        avg_contract_duration = 0.0
+        if counters['avg_duration'] is not None:
+            # Approximate months, as shown on the dashboard card
+            avg_contract_duration = round(counters['avg_duration'].days / 30.0, 1)
+
+        return {
+            'total_contracts': counters['total'],
+            'active_contracts': counters['active'],
+            'expired_contracts': counters['expired'],
+            'terminated_contracts': counters['terminated'],
+            'expiring_soon': counters['expiring_soon'],
+            'new_contracts_month': counters['new_month'],
+            'avg_contract_duration': avg_contract_duration,
+        }
+
+    @staticmethod
+    def maintenance_stats(today):
+        from apps.maintenance.models import MaintenanceRequest
+
+        counters = MaintenanceRequest.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            in_progress=Count('id', filter=Q(status='in_progress')),
+            completed=Count('id', filter=Q(status='completed')),
+            urgent=Count('id', filter=Q(priority='urgent', status__in=['pending', 'in_progress'])),
+            costs_month=Sum('estimated_cost', filter=Q(request_date__date__gte=today.replace(day=1))),
+        )
+        return {
+            'total_maintenance': counters['total'],
+            'pending_maintenance': counters['pending'],
+            'in_progress_maintenance': counters['in_progress'],
+            'completed_maintenance': counters['completed'],
+            'urgent_maintenance': counters['urgent'],
+            'maintenance_costs': counters['costs_month'] or Decimal('0'),
+        }
+
+    @staticmethod
+    def people_stats(today):
+        from apps.clients.models import Client
+        from apps.owners.models import Owner
+
+        clients = Client.objects.aggregate(
+            active=Count('id', filter=Q(is_active=True)),
+            new_month=Count('id', filter=Q(created_at__date__gte=today.replace(day=1))),
+        )
+        return {
+            'total_clients': clients['active'],
+            'new_clients_month': clients['new_month'],
+            'total_owners': Owner.objects.filter(is_active=True).count(),
+        }
+
+    @staticmethod
+    def sales_stats(today):
+        from apps.sales.models import SalesContract, PropertyReservation
+
+        sales = SalesContract.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            completed=Count('id', filter=Q(status='completed')),
+        )
+        reservations = PropertyReservation.objects.aggregate(
+            pending=Count('id', filter=Q(status='pending')),
+            approved=Count('id', filter=Q(status='approved')),
+        )
+        return {
+            'total_sales': sales['total'],
+            'active_sales': sales['active'],
+            'completed_sales': sales['completed'],
+            'pending_reservations': reservations['pending'],
+            'approved_reservations': reservations['approved'],
+        }
+
+    @staticmethod
+    def financial_stats(today):
+        from apps.financial.models import Payment, Invoice
+        from apps.sales.models import SalesPayment
+
+        first_day_month = today.replace(day=1)
+        months = [
+            first_day_month - relativedelta(months=offset)
+            for offset in range(DashboardStatsService.TREND_MONTHS - 1, -1, -1)
+        ]
+        trend = {
+            f'month_{index}': Sum('amount', filter=Q(
+                payment_date__gte=month_start,
+                payment_date__lt=month_start + relativedelta(months=1),
+            ))
+            for index, month_start in enumerate(months)
+        }
+        payments = Payment.objects.filter(invoice__isnull=False).aggregate(
+            total=Sum('amount'),
+            month=Sum('amount', filter=Q(payment_date__gte=first_day_month)),
+            **trend
+        )
+        pending_payments = Invoice.objects.filter(
+            status='issued'
+        ).aggregate(total=Sum('total_amount'))['total']
+        sales_revenue = SalesPayment.objects.filter(
+            status='completed'
+        ).aggregate(total=Sum('amount'))['total']
+
+        return {
+            'total_revenue': payments['total'] or Decimal('0'),
+            'payments_month': payments['month'] or Decimal('0'),
+            'pending_payments': pending_payments or Decimal('0'),
+            'sales_revenue': sales_revenue or Decimal('0'),
+            'revenue_trend_labels': [month_start.strftime('%b %Y') for month_start in months],
+            'revenue_trend_data': [
+                float(payments[f'month_{index}'] or 0) for index in range(len(months))
+            ],
+        }
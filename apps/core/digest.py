@@ -0,0 +1,187 @@
+"""
+Daily/weekly notification digests
+Notifications held for a digest (email_digest) are grouped per user by
+type and priority and sent as one email, rendered from
+templates/emails/notification.html. When a user leaves the digests their
+held notifications go back to the outbox.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models.signals import post_delete, post_save
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification, NotificationPreference
+
+PRIORITY_ORDER = ['urgent', 'high', 'medium', 'low']
+
+
+class NotificationDigestService:
+    """
+    Compile and send notification digests
+    """
+
+    WINDOWS = {
+        'daily': timedelta(days=1),
+        'weekly': timedelta(days=7),
+    }
+
+    @staticmethod
+    def recipients(frequency, now=None):
+        """
+        Preferences of users on the given digest who are outside quiet hours.
+        Users in quiet hours are picked up by a later run.
+        """
+        now = now or timezone.now()
+        preferences = NotificationPreference.objects.filter(
+            email_enabled=True, user__is_active=True
+        ).exclude(user__email='').select_related('user')
+        if frequency == 'daily':
+            preferences = preferences.filter(daily_digest=True)
+        else:
+            preferences = preferences.filter(daily_digest=False, weekly_digest=True)
+        return [prefs for prefs in preferences if not prefs.in_quiet_hours(now)]
+
+    @staticmethod
+    def release(user_id, prefs=None, now=None):
+        """
+        Hand the held notifications of a user no longer on a digest to the
+        outbox, not before their quiet hours end. With emails turned off the
+        hold is just dropped. Returns how many were held.
+        """
+        held = Notification.objects.filter(user_id=user_id, email_digest=True, is_sent_email=False)
+        if prefs is not None and not prefs.email_enabled:
+            return held.update(email_digest=False)
+        return held.update(
+            email_digest=False,
+            email_pending=True,
+            email_next_attempt_at=prefs.quiet_until(now) if prefs is not None else None,
+        )
+
+    @staticmethod
+    def compile(frequency, now=None):
+        """
+        Held notifications per recipient in one query.
+        Returns a list of (user, groups, notification ids), where groups is
+        [(priority, notification_type label, [notifications])] most urgent first.
+        """
+        recipients = NotificationDigestService.recipients(frequency, now)
+        users = {prefs.user_id: prefs.user for prefs in recipients}
+        if not users:
+            return []
+
+        held = Notification.objects.filter(
+            user_id__in=list(users), email_digest=True, is_sent_email=False
+        ).order_by('created_at')
+
+        grouped = defaultdict(lambda: defaultdict(list))
+        for notification in held:
+            key = (notification.priority, notification.get_notification_type_display())
+            grouped[notification.user_id][key].append(notification)
+
+        digests = []
+        for user_id, groups in grouped.items():
+            ordered = sorted(
+                groups.items(),
+                key=lambda item: (PRIORITY_ORDER.index(item[0][0]), str(item[0][1])),
+            )
+            ids = [notification.pk for _, notifications in ordered for notification in notifications]
+            digests.append((
+                users[user_id],
+                [(priority, label, notifications) for (priority, label), notifications in ordered],
+                ids,
+            ))
+        return digests
+
+    @staticmethod
+    def render(user, groups, frequency, now):
+        """
+        Subject, plain text and HTML body of one digest
+        """
+        count = sum(len(notifications) for _, _, notifications in groups)
+        subject = f"Your {frequency} summary: {count} notification{'s' if count != 1 else ''}"
+        html = render_to_string('emails/notification.html', {
+            'digest': groups,
+            'digest_title': subject,
+            'digest_since': now - NotificationDigestService.WINDOWS[frequency],
+            'recipient': user,
+            'site_url': getattr(settings, 'SITE_URL', ''),
+        })
+        lines = [subject, '']
+        for priority, label, notifications in groups:
+            lines.append(f"{label} ({priority})")
+            lines.extend(f"  - {notification.title}: {notification.message}" for notification in notifications)
+            lines.append('')
+        return subject, '\n'.join(lines), html
+
+    @staticmethod
+    def send(frequency, now=None, connection=None):
+        """
+        Send one digest email per user over one connection, then mark every
+        included notification sent in one update.
+        Returns (emails sent, notifications included, failed users).
+        """
+        now = now or timezone.now()
+        digests = NotificationDigestService.compile(frequency, now)
+        if not digests:
+            return 0, 0, 0
+
+        connection = connection or get_connection()
+        included = []
+        sent = failed = 0
+        connection.open()
+        try:
+            for user, groups, ids in digests:
+                subject, text, html = NotificationDigestService.render(user, groups, frequency, now)
+                message = EmailMultiAlternatives(
+                    subject=subject,
+                    body=text,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[user.email],
+                    connection=connection,
+                )
+                message.attach_alternative(html, 'text/html')
+                try:
+                    message.send(fail_silently=False)
+                except Exception:
+                    # Stays held for the next run
+                    failed += 1
+                    continue
+                sent += 1
+                included.extend(ids)
+        finally:
+            connection.close()
+
+        if included:
+            Notification.objects.filter(pk__in=included).update(
+                is_sent_email=True,
+                email_sent_at=now,
+                email_digest=False,
+            )
+        return sent, len(included), failed
+
+
+def _release_held(sender, instance, raw=False, **kwargs):
+    if raw or instance.digest_frequency is not None:
+        return
+    NotificationDigestService.release(instance.user_id, instance)
+
+
+def _release_held_on_delete(sender, instance, **kwargs):
+    # Without preferences emails go out one by one
+    NotificationDigestService.release(instance.user_id)
+
+
+def connect_signals():
+    """
+    Release held notifications when a user turns their digests off or
+    their preferences are deleted, so nothing waits for a digest that no
+    longer runs for them
+    """
+    post_save.connect(_release_held, sender=NotificationPreference, dispatch_uid='notification_digest_release')
+    post_delete.connect(
+        _release_held_on_delete, sender=NotificationPreference, dispatch_uid='notification_digest_release'
+    )
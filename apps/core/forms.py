@@ -0,0 +1,23 @@
+"""
+Forms for Core app
+"""
+from django import forms
+
+from .imports import IMPORTERS
+
+
+class DataImportForm(forms.Form):
+    """Upload an .xlsx or .csv file for bulk import"""
+
+    kind = forms.ChoiceField(
+        choices=[(kind, kind.title()) for kind in IMPORTERS],
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    file = forms.FileField(
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label='Validate only',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
@@ -0,0 +1,486 @@
+"""
+Bulk import of owners, tenants and properties from Excel or CSV
+Rows are streamed (openpyxl read-only mode or csv row by row), validated
+with the app's ModelForms, resolved against in-memory lookups for foreign
+keys and written with bulk_create one transaction per batch, so memory
+stays bounded by the batch size whatever the file length.
+"""
+import csv
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django import forms
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.forms.models import modelform_factory
+
+from apps.clients.forms import ClientForm
+from apps.clients.models import Client
+from apps.owners.forms import OwnerForm
+from apps.owners.models import Owner
+from apps.properties import geohash
+from apps.properties.forms import PropertyForm
+from apps.properties.models import Property, PropertyType
+
+from .models import SearchDocument
+from .search import SearchService
+from .snapshots import DashboardSnapshotService
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'نعم'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n', 'لا'}
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported (format, missing columns)"""
+
+
+def normalize_header(header):
+    """'Property Title ' -> 'property_title'"""
+    return '_'.join(str(header or '').strip().casefold().replace('-', ' ').split())
+
+
+def _cell(value):
+    """Spreadsheet cell to the text a bound form expects"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores phone numbers and IDs typed as numbers as floats
+        return str(int(value))
+    if isinstance(value, datetime) and not (value.hour or value.minute or value.second):
+        return value.date().isoformat()
+    return str(value).strip()
+
+
+def _xlsx_rows(source):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(header) for header in next(rows, ())]
+        yield headers
+        for number, values in enumerate(rows, start=2):
+            yield number, dict(zip(headers, (_cell(value) for value in values)))
+    finally:
+        workbook.close()
+
+
+def _csv_rows(source):
+    if isinstance(source, io.TextIOBase):
+        text = source
+    else:
+        text = io.TextIOWrapper(getattr(source, 'file', source), encoding='utf-8-sig', newline='')
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(text, dialect)
+        headers = [normalize_header(header) for header in next(reader, [])]
+        yield headers
+        for number, values in enumerate(reader, start=2):
+            yield number, dict(zip(headers, (_cell(value) for value in values)))
+    except UnicodeDecodeError:
+        raise ImportFileError('CSV files must be UTF-8 encoded.')
+    finally:
+        if text is not source:
+            text.detach()
+
+
+def read_rows(source, filename):
+    """
+    (headers, rows) of an .xlsx or .csv file; rows yields (row number,
+    {header: value}) lazily and skips blank lines
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        stream = _xlsx_rows(source)
+    elif extension in ('.csv', '.txt'):
+        stream = _csv_rows(source)
+    else:
+        raise ImportFileError(f'Unsupported file type "{extension}"; upload .xlsx or .csv.')
+    try:
+        headers = next(stream)
+    except ImportFileError:
+        raise
+    except Exception as exc:
+        raise ImportFileError(f'Cannot read {filename}: {exc}')
+    if not any(headers):
+        stream.close()
+        raise ImportFileError('The first row must contain column headers.')
+    return headers, _non_blank(stream)
+
+
+def _non_blank(stream):
+    try:
+        for number, row in stream:
+            if any(value not in ('', None) for value in row.values()):
+                yield number, row
+    finally:
+        stream.close()
+
+
+class LookupCache:
+    """
+    Cell value -> primary key for a foreign key column. Small reference
+    tables are loaded whole; larger ones are primed once per batch with
+    the values that batch uses. Hits and misses are both remembered.
+    """
+
+    def __init__(self, queryset, fields, preload=False):
+        self.queryset = queryset
+        self.fields = fields
+        self.preload = preload
+        self.keys = {}
+        if preload:
+            for row in queryset.values('pk', *fields):
+                for name in fields:
+                    self.keys.setdefault(self._key(row[name]), row['pk'])
+
+    @staticmethod
+    def _key(value):
+        return str(value).strip().casefold()
+
+    def prime(self, values):
+        """Load the keys of values not seen yet, one query per lookup field"""
+        missing = {str(value).strip() for value in values if value} - set(self.keys)
+        missing = {value for value in missing if self._key(value) not in self.keys}
+        if self.preload or not missing:
+            return
+        for name in self.fields:
+            found = {}
+            for value, pk in self.queryset.filter(**{f'{name}__in': missing}).values_list(name, 'pk'):
+                # A value matching several rows (two owners with one name) stays unresolved
+                found[self._key(value)] = None if self._key(value) in found else pk
+            for key, pk in found.items():
+                self.keys.setdefault(key, pk)
+        for value in missing:
+            self.keys.setdefault(self._key(value), None)
+
+    def resolve(self, value):
+        return self.keys.get(self._key(value)) if value else None
+
+
+@dataclass
+class ImportRowError:
+    row: int
+    column: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    """Outcome of one import; errors are per row and column"""
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    ignored_columns: list = field(default_factory=list)
+    dry_run: bool = False
+    duration: float = 0.0
+
+    @property
+    def processed(self):
+        return self.created + self.failed
+
+    def write_report(self, stream):
+        """Write the errors as CSV (row, column, message)"""
+        writer = csv.writer(stream)
+        writer.writerow(['row', 'column', 'message'])
+        for error in self.errors:
+            writer.writerow([error.row, error.column, error.message])
+
+
+class _SharedFields(dict):
+    """
+    base_fields of import forms: never rendered or altered per instance,
+    so every row's form can use them without BaseForm's deepcopy
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _ImportFormMixin:
+    def validate_unique(self):
+        """Unique fields are checked once per batch by the importer"""
+
+
+class BulkImporter:
+    """
+    Import rows into `model` through `form_class`. Foreign keys listed in
+    `lookups` are excluded from the form and resolved by LookupCache;
+    unique fields are checked against the file and the database once per
+    batch instead of once per row.
+    """
+
+    model = None
+    form_class = None
+    extra_fields = []
+    BATCH_SIZE = 1000
+
+    def __init__(self, batch_size=None, dry_run=False):
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.dry_run = dry_run
+        self.lookups = self.build_lookups()
+        self.seen = {}
+
+    def build_lookups(self):
+        """{form field: LookupCache}"""
+        return {}
+
+    # Columns
+
+    def allowed_fields(self):
+        return list(self.form_class._meta.fields) + list(self.extra_fields)
+
+    def aliases(self):
+        """Accepted header -> field; field names and verbose names both work"""
+        aliases = {}
+        for name in self.allowed_fields():
+            model_field = self.model._meta.get_field(name)
+            aliases[normalize_header(model_field.verbose_name)] = name
+            aliases[name] = name
+        return aliases
+
+    def prepare_columns(self, headers):
+        aliases = self.aliases()
+        self.columns = {header: aliases[header] for header in headers if header in aliases}
+        self.headers = {name: header for header, name in self.columns.items()}
+        present = set(self.columns.values())
+        required = [
+            name for name in self.allowed_fields()
+            if name not in self.extra_fields
+            and not self.model._meta.get_field(name).blank
+            and not self.model._meta.get_field(name).has_default()
+        ]
+        missing = [name for name in required if name not in present]
+        if missing:
+            raise ImportFileError(f"Missing required columns: {', '.join(missing)}")
+
+        form_fields = [name for name in self.allowed_fields() if name in present and name not in self.lookups]
+        base = type(f'{self.form_class.__name__}Import', (_ImportFormMixin, self.form_class), {})
+        self.import_form = modelform_factory(self.model, form=base, fields=form_fields)
+        self.import_form.base_fields = _SharedFields(self.import_form.base_fields)
+        self.unique_fields = [name for name in form_fields if self.model._meta.get_field(name).unique]
+        # Select columns accept the stored value or the label shown in the UI
+        self.choices = {}
+        for name, form_field in self.import_form.base_fields.items():
+            if isinstance(form_field, forms.ChoiceField):
+                options = {str(label).casefold(): key for key, label in form_field.choices}
+                options.update({str(key).casefold(): key for key, _label in form_field.choices})
+                self.choices[name] = options
+        return sorted(header for header in headers if header and header not in self.columns)
+
+    # Rows
+
+    def _data(self, row):
+        """Form data for one row, with booleans, numbers and choices coerced"""
+        data = {}
+        for header, name in self.columns.items():
+            value = row.get(header, '')
+            form_field = self.import_form.base_fields.get(name)
+            if isinstance(form_field, forms.BooleanField) and not isinstance(value, bool):
+                text = value.casefold()
+                if text in TRUE_VALUES:
+                    value = True
+                elif text in FALSE_VALUES:
+                    value = False
+                else:
+                    raise forms.ValidationError({name: f'Enter yes or no, not "{value}".'})
+            elif isinstance(form_field, (forms.DecimalField, forms.IntegerField)) and isinstance(value, str):
+                value = value.replace(',', '').replace(' ', '')
+            elif name in self.choices and value:
+                value = self.choices[name].get(value.casefold(), value)
+            data[name] = value
+        for name in self.extra_fields:
+            if name in data and not data[name]:
+                data[name] = self.default(name)
+        return data
+
+    def default(self, name):
+        """Value of an optional extra column left blank in a row"""
+        return ''
+
+    def build(self, number, row):
+        """(instance, None) for a valid row, (None, [ImportRowError]) otherwise"""
+        errors = []
+        try:
+            form = self.import_form(data=self._data(row))
+        except forms.ValidationError as exc:
+            return None, [ImportRowError(number, name, ' '.join(messages)) for name, messages in exc.message_dict.items()]
+        valid = form.is_valid()
+        if not valid:
+            for name, messages in form.errors.items():
+                errors.extend(ImportRowError(number, name, message) for message in messages)
+        instance = form.instance
+        for name, cache in self.lookups.items():
+            value = row.get(self.headers.get(name), '')
+            pk = cache.resolve(value)
+            if pk is None and (value or not self.model._meta.get_field(name).null):
+                message = f'No match for "{value}".' if value else 'This field is required.'
+                errors.append(ImportRowError(number, name, message))
+            setattr(instance, f'{name}_id', pk)
+        if errors:
+            return None, errors
+        self.prepare(instance)
+        return instance, None
+
+    def prepare(self, instance):
+        """Fill what save() would (codes, derived fields) before bulk_create"""
+
+    # Batches
+
+    def _check_unique(self, batch):
+        """
+        Rows of batch whose unique values are new, and errors for those
+        repeating a value earlier in the file or already in the database
+        """
+        errors = []
+        for name in self.unique_fields:
+            seen = self.seen.setdefault(name, set())
+            values = [getattr(instance, name) for _number, instance in batch]
+            existing = set(
+                self.model.objects.filter(**{f'{name}__in': values}).values_list(name, flat=True)
+            )
+            kept = []
+            for number, instance in batch:
+                value = getattr(instance, name)
+                if value in existing:
+                    errors.append(ImportRowError(number, name, f'"{value}" already exists.'))
+                elif value in seen:
+                    errors.append(ImportRowError(number, name, f'"{value}" is repeated earlier in the file.'))
+                else:
+                    seen.add(value)
+                    kept.append((number, instance))
+            batch = kept
+        return batch, errors
+
+    def flush(self, batch, result):
+        batch, errors = self._check_unique(batch)
+        result.errors.extend(errors)
+        result.failed += len(errors)
+        if not batch:
+            return
+        instances = [instance for _number, instance in batch]
+        if not self.dry_run:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(instances)
+                self.after_batch(created)
+        result.created += len(instances)
+
+    def after_batch(self, instances):
+        """What the post_save receivers would have done for these rows"""
+        if SearchService.is_indexed(self.model):
+            content_type = ContentType.objects.get_for_model(self.model)
+            SearchDocument.objects.bulk_create([
+                SearchDocument(content_type=content_type, object_id=instance.pk,
+                               body=SearchService.document_for(instance))
+                for instance in instances
+            ])
+        DashboardSnapshotService.mark_dirty(DashboardSnapshotService.metrics_for_model(self.model))
+
+    def finish(self, result):
+        """Called once after the last batch"""
+
+    def run(self, source, filename):
+        """Import the file; returns an ImportResult"""
+        started = time.perf_counter()
+        result = ImportResult(dry_run=self.dry_run)
+        headers, rows = read_rows(source, filename)
+        try:
+            result.ignored_columns = self.prepare_columns(headers)
+            chunk = []
+            for item in rows:
+                chunk.append(item)
+                if len(chunk) >= self.batch_size:
+                    self._process(chunk, result)
+                    chunk = []
+            if chunk:
+                self._process(chunk, result)
+        finally:
+            rows.close()
+        if result.created and not self.dry_run:
+            self.finish(result)
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _process(self, chunk, result):
+        for name, cache in self.lookups.items():
+            cache.prime(row.get(self.headers.get(name)) for _number, row in chunk)
+        batch = []
+        for number, row in chunk:
+            instance, errors = self.build(number, row)
+            if errors:
+                result.errors.extend(errors)
+                result.failed += 1
+            else:
+                batch.append((number, instance))
+        self.flush(batch, result)
+
+
+class OwnerImporter(BulkImporter):
+    model = Owner
+    form_class = OwnerForm
+
+
+class ClientImporter(BulkImporter):
+    model = Client
+    form_class = ClientForm
+
+
+class PropertyImporter(BulkImporter):
+    """
+    property_type matches a type name; owner matches an owner's national
+    ID or, when unambiguous, their name. Rows without a code get the next
+    PROP-<year>-NNNN codes.
+    """
+    model = Property
+    form_class = PropertyForm
+    extra_fields = ['code']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._code_prefix = self._code_number = None
+
+    def build_lookups(self):
+        return {
+            'property_type': LookupCache(PropertyType.objects.all(), ['name'], preload=True),
+            'owner': LookupCache(Owner.objects.all(), ['national_id', 'name']),
+        }
+
+    def default(self, name):
+        return self._next_code() if name == 'code' else ''
+
+    def prepare(self, instance):
+        if not instance.code:
+            instance.code = self._next_code()
+        if instance.latitude is not None and instance.longitude is not None:
+            instance.geohash = geohash.encode(instance.latitude, instance.longitude)
+
+    def _next_code(self):
+        if self._code_number is None:
+            prefix, number = PropertyForm._generate_unique_code().rsplit('-', 1)
+            self._code_prefix, self._code_number = prefix, int(number) - 1
+        self._code_number += 1
+        return f'{self._code_prefix}-{self._code_number:04d}'
+
+    def finish(self, result):
+        from apps.properties.listing import PropertyListingService
+        from apps.properties.mapping import PropertyMapService
+
+        PropertyListingService.invalidate_summary()
+        PropertyMapService.invalidate()
+
+
+IMPORTERS = {
+    'owners': OwnerImporter,
+    'clients': ClientImporter,
+    'properties': PropertyImporter,
+}
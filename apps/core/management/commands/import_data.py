@@ -0,0 +1,45 @@
+"""
+Management command to bulk import owners, clients or properties
+Usage: python manage.py import_data properties portfolio.xlsx [--dry-run] [--errors report.csv]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.imports import IMPORTERS, ImportFileError
+
+
+class Command(BaseCommand):
+    help = 'Import owners, clients or properties from an .xlsx or .csv file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(IMPORTERS))
+        parser.add_argument('path', help='.xlsx or .csv file; the first row holds column headers')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per bulk_create transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row without saving')
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file')
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options['kind']](batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as source:
+                result = importer.run(source, options['path'])
+        except OSError as exc:
+            raise CommandError(f"Cannot open {options['path']}: {exc}")
+        except ImportFileError as exc:
+            raise CommandError(str(exc))
+
+        if result.ignored_columns:
+            self.stdout.write(self.style.WARNING(f"Ignored columns: {', '.join(result.ignored_columns)}"))
+        verb = 'Valid' if result.dry_run else 'Imported'
+        self.stdout.write(f'✓ {verb}: {result.created} rows in {result.duration:.1f} s')
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f'✗ Rejected: {result.failed} rows'))
+            for error in result.errors[:20]:
+                self.stdout.write(f'  row {error.row}, {error.column}: {error.message}')
+            if len(result.errors) > 20:
+                self.stdout.write(f'  ... {len(result.errors) - 20} more')
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as report:
+                result.write_report(report)
+            self.stdout.write(f"✓ Error report written to {options['errors']}")
+
+        self.stdout.write(self.style.SUCCESS('Dry run complete.' if result.dry_run else 'Import complete.'))
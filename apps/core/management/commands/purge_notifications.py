@@ -0,0 +1,44 @@
+"""
+Management command to apply the notification retention policy
+Usage: python manage.py purge_notifications [--days 90] [--archive] [--chunk-size 1000]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Delete or archive read notifications older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Keep read notifications for this many days',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Archive instead of deleting',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows per DELETE/UPDATE statement',
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options['days'])
+        count = NotificationService.purge_read(
+            older_than,
+            archive=options['archive'],
+            chunk_size=options['chunk_size'],
+        )
+        action = 'archived' if options['archive'] else 'deleted'
+        self.stdout.write(f'✓ {count} read notifications older than {options["days"]} days {action}')
+        self.stdout.write(self.style.SUCCESS('Notification retention applied.'))
@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the full-text search index
+Usage: python manage.py rebuild_search_index [--model properties.Property] [--batch-size 500]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.search import INDEXED_MODELS, SearchService
+
+
+class Command(BaseCommand):
+    help = 'Recreate search documents for indexed models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            help='Model label to rebuild (repeatable); all indexed models by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Documents per INSERT',
+        )
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(INDEXED_MODELS)
+        unknown = [label for label in labels if label not in INDEXED_MODELS]
+        if unknown:
+            raise CommandError(
+                f'Not indexed: {", ".join(unknown)}. Choose from {", ".join(INDEXED_MODELS)}'
+            )
+
+        written = SearchService.rebuild(labels, batch_size=options['batch_size'])
+        for label, count in written.items():
+            self.stdout.write(f'✓ {label}: {count} documents')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,55 @@
+"""
+Management command to refresh materialized dashboard metrics
+Usage: python manage.py refresh_dashboard_snapshots [--all] [--interval SECONDS]
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.core.snapshots import DashboardSnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Recompute dirty or outdated dashboard snapshot metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Refresh every metric, not only dirty ones',
+        )
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            default=None,
+            help='Also refresh metrics older than this many minutes',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (periodic job mode)',
+        )
+
+    def handle(self, *args, **options):
+        max_age = timedelta(minutes=options['max_age']) if options['max_age'] else None
+
+        while True:
+            if options['all']:
+                metrics = None
+            else:
+                metrics = DashboardSnapshotService.stale_metrics(max_age=max_age)
+
+            if metrics == []:
+                self.stdout.write('All dashboard metrics are up to date.')
+            else:
+                for snapshot in DashboardSnapshotService.refresh(metrics):
+                    self.stdout.write(
+                        f'✓ {snapshot.metric} ({snapshot.refresh_duration_ms} ms)'
+                    )
+                self.stdout.write(self.style.SUCCESS('Dashboard snapshots refreshed.'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,73 @@
+"""
+Management command to render the PDF documents of a month into the PDF cache
+Usage: python manage.py render_documents [--kind invoices] [--month 2026-09] [--workers 4]
+       [--language ar] [--output DIR] [--prune DAYS]
+"""
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone, translation
+
+from apps.contracts.documents import ContractDocumentService
+from apps.core.pdf import PdfService
+from apps.financial.documents import FinancialDocumentService
+from apps.sales.documents import SalesDocumentService
+
+# kind: (queryset of a month, payload builder, number field)
+KINDS = {
+    'invoices': (FinancialDocumentService.invoices_for_month, FinancialDocumentService.invoice, 'invoice_number'),
+    'vouchers': (FinancialDocumentService.payments_for_month, FinancialDocumentService.voucher, 'payment_number'),
+    'receipts': (SalesDocumentService.payments_for_month, SalesDocumentService.receipt, 'receipt_number'),
+    'contracts': (ContractDocumentService.contracts_for_month, ContractDocumentService.contract, 'contract_number'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Render the invoices, vouchers, receipts or contracts of a month to PDF in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(KINDS), default='invoices')
+        parser.add_argument('--month', help='YYYY-MM (default: current month)')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+        parser.add_argument('--language', choices=[code for code, _name in settings.LANGUAGES],
+                            default=settings.LANGUAGE_CODE)
+        parser.add_argument('--output', help='Also copy the PDFs to this directory as <number>.pdf')
+        parser.add_argument('--prune', type=int, metavar='DAYS',
+                            help='First delete cached PDFs unused for this many days')
+
+    def handle(self, *args, **options):
+        try:
+            year, month = map(int, (options['month'] or timezone.localdate().strftime('%Y-%m')).split('-'))
+            if not 1 <= month <= 12:
+                raise ValueError
+        except ValueError:
+            raise CommandError('--month must look like 2026-09')
+
+        if options['prune'] is not None:
+            removed = PdfService.prune(options['prune'])
+            self.stdout.write(f'✓ Pruned {removed} cached PDFs')
+
+        month_queryset, build, number_field = KINDS[options['kind']]
+        started = time.perf_counter()
+        with translation.override(options['language']):
+            documents = [(getattr(obj, number_field), build(obj)) for obj in month_queryset(year, month)]
+        self.stdout.write(f"✓ Built {len(documents)} {options['kind']} for {year}-{month:02d}")
+
+        results = PdfService.render_many([payload for _number, payload in documents], workers=options['workers'])
+        rendered = sum(1 for _path, created in results if created)
+        self.stdout.write(
+            f'✓ Rendered {rendered}, served {len(results) - rendered} from the cache '
+            f'in {time.perf_counter() - started:.1f}s'
+        )
+
+        if options['output']:
+            output = Path(options['output'])
+            output.mkdir(parents=True, exist_ok=True)
+            for (number, _payload), (path, _created) in zip(documents, results):
+                shutil.copyfile(path, output / f"{str(number).replace('/', '-')}.pdf")
+            self.stdout.write(f'✓ Copied {len(results)} PDFs to {output}')
+
+        self.stdout.write(self.style.SUCCESS('Documents rendered.'))
@@ -0,0 +1,59 @@
+"""
+Management command to benchmark the key pages and API endpoints
+Usage: python manage.py run_benchmarks [--repeat 5] [--output run.json] [--compare baseline.json]
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.benchmarks import TARGETS, BenchmarkRunner
+
+
+class Command(BaseCommand):
+    help = 'Time dashboards, lists, reports and API endpoints and emit JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Warm requests per target')
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=list(TARGETS),
+            help='Benchmark only this target (repeatable)',
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare', help='Earlier JSON results to compare against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        results = BenchmarkRunner(repeat=options['repeat'], only=options['only']).run()
+        for name, result in results['results'].items():
+            if 'skipped' in result:
+                self.stdout.write(f"- {name}: skipped ({result['skipped']})")
+                continue
+            self.stdout.write(
+                f"✓ {name}: {result['status']} cold {result['cold_ms']} ms, "
+                f"median {result['median_ms']} ms, p95 {result['p95_ms']} ms, "
+                f"{result['cold_queries']}/{result['warm_queries']} queries, {result['bytes']} bytes"
+            )
+
+        if baseline:
+            self.stdout.write(f"\nCompared with {baseline.get('meta', {}).get('commit') or options['compare']}:")
+            for name, metric, before, after, change in BenchmarkRunner.compare(baseline, results):
+                change = f'{change:+.1f}%' if change is not None else 'n/a'
+                self.stdout.write(f'  {name} {metric}: {before} -> {after} ({change})')
+
+        payload = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+        else:
+            self.stdout.write(payload)
+            self.stdout.write(self.style.SUCCESS('Benchmarks complete.'))
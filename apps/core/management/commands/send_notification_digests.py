@@ -0,0 +1,27 @@
+"""
+Management command to send daily/weekly notification digests
+Usage: python manage.py send_notification_digests --frequency daily|weekly
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.digest import NotificationDigestService
+
+
+class Command(BaseCommand):
+    help = 'Send one digest email per user for notifications held for their digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency',
+            choices=list(NotificationDigestService.WINDOWS),
+            default='daily',
+            help='Which digest subscribers to send to',
+        )
+
+    def handle(self, *args, **options):
+        frequency = options['frequency']
+        sent, included, failed = NotificationDigestService.send(frequency)
+        self.stdout.write(f'✓ {sent} {frequency} digests sent ({included} notifications)')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} digests failed and will be retried next run'))
+        self.stdout.write(self.style.SUCCESS('Notification digests processed.'))
@@ -0,0 +1,49 @@
+"""
+Management command to deliver queued notification emails
+Usage: python manage.py send_pending_notifications [--limit N] [--batch-size N] [--interval SECONDS]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.outbox import EmailOutboxService
+
+
+class Command(BaseCommand):
+    help = 'Send notification emails queued by NotificationService'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Send at most this many emails per run',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EmailOutboxService.BATCH_SIZE,
+            help='Emails sent over one SMTP connection',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and drain the queue every N seconds (worker mode)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = EmailOutboxService.send_pending(
+                limit=options['limit'],
+                batch_size=options['batch_size'],
+            )
+            if sent or failed:
+                self.stdout.write(f'✓ {sent} sent, {failed} failed')
+                self.stdout.write(self.style.SUCCESS('Pending notification emails processed.'))
+            else:
+                self.stdout.write('No notification emails due.')
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,128 @@
+"""
+Per-request SQL instrumentation - query count, SQL time and repeated
+statement fingerprints, reported as Server-Timing and to a rolling log,
+with an opt-in strict mode enforcing per-URL-name query budgets
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('apps.core.queries')
+
+# Most recent request summaries, newest last (see QUERY_LOG_SIZE)
+recent_requests = deque(maxlen=getattr(settings, 'QUERY_LOG_SIZE', 200))
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a view runs more queries than its budget"""
+
+
+def fingerprint(sql):
+    """
+    Statement shape with literals and IN-list lengths folded, so the same
+    query issued per row of a loop maps to one fingerprint
+    """
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper collecting statement shapes and durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """[(shape, times)] issued at least threshold times, most first"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Count the queries of each request. Enabled by QUERY_INSTRUMENTATION;
+    QUERY_BUDGETS maps URL names ("properties:list", "property-list") to
+    their maximum query count and QUERY_BUDGET_STRICT turns an overrun
+    into QueryBudgetExceeded instead of a log warning.
+    """
+
+    def __init__(self, get_response):
+        # Leave the stack when disabled, so async views (the notification
+        # stream) are not adapted to this sync-only middleware
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else ''
+        threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        repeated = recorder.repeated(threshold)
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        over_budget = budget is not None and recorder.count > budget
+
+        timings = [
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+            f'app;dur={(total - recorder.duration) * 1000:.1f}',
+        ]
+        if repeated:
+            timings.append(f'repeat;desc="{len(repeated)} statements x{threshold}+"')
+        response['Server-Timing'] = ', '.join(timings)
+
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'sql_ms': round(recorder.duration * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'budget': budget,
+            'repeated': [
+                {'fingerprint': hashlib.md5(shape.encode()).hexdigest()[:8], 'times': times, 'sql': shape[:300]}
+                for shape, times in repeated
+            ],
+        }
+        recent_requests.append(summary)
+        level = logging.WARNING if over_budget or repeated else logging.INFO
+        logger.log(level, json.dumps(summary, ensure_ascii=False))
+
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{view_name} ran {recorder.count} queries, budget is {budget}: '
+                + '; '.join(f'{times}x {shape[:120]}' for shape, times in repeated)
+            )
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 11:56
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_notificationpreference_notification_action_label_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100, unique=True, verbose_name='Metric')),
+                ('value', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Value')),
+                ('is_dirty', models.BooleanField(default=True, verbose_name='Dirty')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='Refreshed At')),
+                ('refresh_duration_ms', models.PositiveIntegerField(default=0, verbose_name='Refresh Duration (ms)')),
+            ],
+            options={
+                'verbose_name': 'Dashboard Snapshot',
+                'verbose_name_plural': 'Dashboard Snapshots',
+                'ordering': ['metric'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_dashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='email_pending',
+            field=models.BooleanField(db_index=True, default=False, help_text='Queued for delivery by send_pending_notifications', verbose_name='Email Pending'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_notification_email_pending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='email_attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Email Attempts'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_delivery_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Email Delivery Time (ms)'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_last_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Email Attempt'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_last_error',
+            field=models.TextField(blank=True, verbose_name='Last Email Error'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='email_next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Next Email Attempt'),
+        ),
+    ]
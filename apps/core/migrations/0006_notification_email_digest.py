@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notification_email_delivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='email_digest',
+            field=models.BooleanField(db_index=True, default=False, help_text='Emailed in the next daily/weekly digest instead of on its own', verbose_name='Held for Digest'),
+        ),
+    ]
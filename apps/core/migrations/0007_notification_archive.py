@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_notification_email_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Archived At'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='is_archived',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Archived'),
+        ),
+    ]
@@ -0,0 +1,154 @@
+# Generated by Django 5.0 on 2026-10-18 12:13
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_search_fts USING fts5("
+    "body, content='core_searchdocument', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS core_search_fts_ai AFTER INSERT ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS core_search_fts_ad AFTER DELETE ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(core_search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS core_search_fts_au AFTER UPDATE ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(core_search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO core_search_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS core_search_fts_au",
+    "DROP TRIGGER IF EXISTS core_search_fts_ad",
+    "DROP TRIGGER IF EXISTS core_search_fts_ai",
+    "DROP TABLE IF EXISTS core_search_fts",
+]
+POSTGRES_INDEX = [
+    "CREATE INDEX IF NOT EXISTS core_searchdocument_body_tsv "
+    "ON core_searchdocument USING GIN (to_tsvector('simple', body))",
+]
+POSTGRES_INDEX_DROP = [
+    "DROP INDEX IF EXISTS core_searchdocument_body_tsv",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                # No FTS5 in this build: searches fall back to LIKE
+                return
+        _run(schema_editor, SQLITE_FTS)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_INDEX)
+
+
+# Model label -> document fields, as registered when this migration was written
+INDEXED_FIELDS = {
+    'properties.Property': ['code', 'title', 'address', 'city', 'district', 'description'],
+    'clients.Client': ['name', 'phone', 'email', 'national_id', 'address', 'city'],
+    'sales.Buyer': ['name', 'phone', 'email', 'national_id', 'city', 'company_name'],
+    'contracts.Contract': ['contract_number', 'property__code', 'client__name'],
+    'maintenance.MaintenanceRequest': ['request_number', 'title', 'description', 'property__code'],
+}
+
+
+# Frozen copy of apps.core.search.tokenize as written with this migration,
+# so later changes to the live normalizer leave this migration unchanged
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},
+})
+NON_WORD = re.compile(r'[^\w]+')
+ARABIC_ARTICLE = re.compile('^[وبكف]?ال(?=..)')
+BATCH_SIZE = 500
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKC', str(text or ''))
+    text = ARABIC_DIACRITICS.sub('', text).translate(ARABIC_LETTERS).casefold()
+    return [ARABIC_ARTICLE.sub('', word) for word in NON_WORD.sub(' ', text).strip().split()]
+
+
+def index_existing_rows(apps, schema_editor):
+    """Write the documents of rows created before the index existed, a batch at a time"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    for label, paths in INDEXED_FIELDS.items():
+        app_label, model_name = label.split('.')
+        related = sorted({path.split('__')[0] for path in paths if '__' in path})
+        queryset = apps.get_model(app_label, model_name).objects.select_related(*related)
+        if not queryset.exists():
+            continue
+        content_type, _ = ContentType.objects.get_or_create(app_label=app_label, model=model_name.lower())
+        documents = []
+        for instance in queryset.iterator(chunk_size=BATCH_SIZE):
+            values = []
+            for path in paths:
+                value = instance
+                for attribute in path.split('__'):
+                    value = getattr(value, attribute, None) if value is not None else None
+                if value:
+                    values.append(str(value))
+            documents.append(SearchDocument(
+                content_type=content_type, object_id=instance.pk, body=' '.join(tokenize(' '.join(values))),
+            ))
+            if len(documents) == BATCH_SIZE:
+                SearchDocument.objects.bulk_create(documents)
+                documents = []
+        SearchDocument.objects.bulk_create(documents)
+
+
+def drop_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FTS_DROP)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_INDEX_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0007_notification_archive'),
+        ('clients', '0001_initial'),
+        ('contracts', '0001_initial'),
+        ('maintenance', '0001_initial'),
+        ('properties', '0004_property_created_at_id_index'),
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Content Type')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext, drop_fulltext),
+        # After the triggers, so the FTS table picks the documents up
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
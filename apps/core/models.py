@@ -6,8 +6,10 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from datetime import timedelta
 
 
 class Permission(models.Model):
@@ -272,8 +274,27 @@ class Notification(models.Model):
     # Status
     is_read = models.BooleanField(_('Read'), default=False)
     read_at = models.DateTimeField(_('Read At'), null=True, blank=True)
+    is_archived = models.BooleanField(_('Archived'), default=False, db_index=True)
+    archived_at = models.DateTimeField(_('Archived At'), null=True, blank=True)
     is_sent_email = models.BooleanField(_('Email Sent'), default=False)
     email_sent_at = models.DateTimeField(_('Email Sent At'), null=True, blank=True)
+    email_pending = models.BooleanField(
+        _('Email Pending'),
+        default=False,
+        db_index=True,
+        help_text=_('Queued for delivery by send_pending_notifications')
+    )
+    email_digest = models.BooleanField(
+        _('Held for Digest'),
+        default=False,
+        db_index=True,
+        help_text=_('Emailed in the next daily/weekly digest instead of on its own')
+    )
+    email_attempts = models.PositiveSmallIntegerField(_('Email Attempts'), default=0)
+    email_last_attempt_at = models.DateTimeField(_('Last Email Attempt'), null=True, blank=True)
+    email_next_attempt_at = models.DateTimeField(_('Next Email Attempt'), null=True, blank=True)
+    email_last_error = models.TextField(_('Last Email Error'), blank=True)
+    email_delivery_ms = models.PositiveIntegerField(_('Email Delivery Time (ms)'), null=True, blank=True)
     
     # Scheduling
     scheduled_for = models.DateTimeField(
@@ -314,27 +335,44 @@ class Notification(models.Model):
             self.save()
     
     def send_email(self):
-        """Send notification via email"""
-        if not self.is_sent_email and self.user.email:
-            from django.core.mail import send_mail
-            from django.conf import settings
-            
-            try:
-                send_mail(
-                    subject=self.title,
-                    message=self.message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[self.user.email],
-                    fail_silently=False,
-                )
-                self.is_sent_email = True
-                self.email_sent_at = timezone.now()
-                self.save()
-                return True
-            except Exception as e:
-                print(f"Failed to send email: {e}")
-                return False
-        return False
+        """Queue notification email for send_pending_notifications"""
+        if self.is_sent_email or not self.user.email:
+            return False
+        self.email_pending = True
+        self.email_next_attempt_at = None
+        self.save(update_fields=['email_pending', 'email_next_attempt_at'])
+        return True
+    
+    def deliver_email(self, connection=None):
+        """
+        Send the email now over the given connection and record the attempt.
+        Does not save; the outbox writes a whole batch at once.
+        """
+        from django.core.mail import EmailMessage
+        from django.conf import settings
+        
+        started = timezone.now()
+        self.email_attempts += 1
+        self.email_last_attempt_at = started
+        try:
+            EmailMessage(
+                subject=self.title,
+                body=self.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[self.user.email],
+                connection=connection,
+            ).send(fail_silently=False)
+        except Exception as e:
+            self.email_last_error = str(e)[:1000]
+            return False
+        
+        self.is_sent_email = True
+        self.email_sent_at = timezone.now()
+        self.email_delivery_ms = int((self.email_sent_at - started).total_seconds() * 1000)
+        self.email_pending = False
+        self.email_next_attempt_at = None
+        self.email_last_error = ''
+        return True
 
 
 class NotificationPreference(models.Model):
@@ -396,6 +434,41 @@ class NotificationPreference(models.Model):
         
         return type_mapping.get(notification_type, True)
     
+    @property
+    def digest_frequency(self):
+        """'daily', 'weekly' or None when emails go out one by one"""
+        if self.daily_digest:
+            return 'daily'
+        if self.weekly_digest:
+            return 'weekly'
+        return None
+    
+    def in_quiet_hours(self, moment=None):
+        """Check if the given time (now by default) falls in quiet hours"""
+        if self.quiet_hours_start is None or self.quiet_hours_end is None:
+            return False
+        current = timezone.localtime(moment or timezone.now()).time()
+        if self.quiet_hours_start <= self.quiet_hours_end:
+            return self.quiet_hours_start <= current < self.quiet_hours_end
+        # Spans midnight, e.g. 22:00 - 07:00
+        return current >= self.quiet_hours_start or current < self.quiet_hours_end
+    
+    def quiet_until(self, moment=None):
+        """End of the current quiet hours, or None outside them"""
+        moment = moment or timezone.now()
+        if not self.in_quiet_hours(moment):
+            return None
+        local = timezone.localtime(moment)
+        end = local.replace(
+            hour=self.quiet_hours_end.hour,
+            minute=self.quiet_hours_end.minute,
+            second=0,
+            microsecond=0,
+        )
+        if end <= local:
+            end += timedelta(days=1)
+        return end
+    
     def should_show_inapp(self, notification_type):
         """Check if in-app notification should be shown"""
         if not self.inapp_enabled:
@@ -410,3 +483,40 @@ class NotificationPreference(models.Model):
         }
         
         return type_mapping.get(notification_type, True)
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Materialized dashboard metric, refreshed in the background.
+    """
+    metric = models.CharField(_('Metric'), max_length=100, unique=True)
+    value = models.JSONField(_('Value'), default=dict, encoder=DjangoJSONEncoder)
+    is_dirty = models.BooleanField(_('Dirty'), default=True)
+    refreshed_at = models.DateTimeField(_('Refreshed At'), null=True, blank=True)
+    refresh_duration_ms = models.PositiveIntegerField(_('Refresh Duration (ms)'), default=0)
+
+    class Meta:
+        verbose_name = _('Dashboard Snapshot')
+        verbose_name_plural = _('Dashboard Snapshots')
+        ordering = ['metric']
+
+    def __str__(self):
+        return self.metric
+
+
+class SearchDocument(models.Model):
+    """
+    Normalized search text of one indexed object (see apps.core.search).
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name=_('Content Type'))
+    object_id = models.PositiveBigIntegerField(_('Object ID'))
+    body = models.TextField(_('Body'), blank=True)
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Search Document')
+        verbose_name_plural = _('Search Documents')
+        unique_together = [['content_type', 'object_id']]
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}"
@@ -0,0 +1,133 @@
+"""
+Notification email outbox
+Notifications flagged email_pending are the queue. send_pending_notifications
+drains it in batches over one SMTP connection per batch, retrying failed
+messages with exponential backoff. Each batch is claimed before it is sent,
+so concurrent workers never deliver the same notification twice.
+"""
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification
+
+# Fields written back after each batch
+DELIVERY_FIELDS = [
+    'is_sent_email', 'email_sent_at', 'email_pending', 'email_attempts',
+    'email_last_attempt_at', 'email_next_attempt_at', 'email_last_error',
+    'email_delivery_ms',
+]
+
+
+class EmailOutboxService:
+    """
+    Deliver queued notification emails
+    """
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 5
+    RETRY_BASE_SECONDS = 60
+    # How long a claimed batch is hidden from other workers; a worker that
+    # dies mid-batch leaves its rows due again after this
+    CLAIM_SECONDS = 10 * 60
+
+    @staticmethod
+    def due(now=None):
+        """
+        Pending notifications whose next attempt is due, oldest first
+        """
+        now = now or timezone.now()
+        return Notification.objects.filter(email_pending=True).filter(
+            Q(email_next_attempt_at__isnull=True) | Q(email_next_attempt_at__lte=now)
+        ).select_related('user').order_by('created_at')
+
+    @staticmethod
+    def claim(size, now=None):
+        """
+        Take up to size due notifications for this worker. One UPDATE moves
+        their next attempt CLAIM_SECONDS ahead, only on rows still due when
+        it runs, so rows another worker claimed first are skipped; the rows
+        carrying this claim's time are the ones won.
+        """
+        now = now or timezone.now()
+        claimed_until = now + timedelta(seconds=EmailOutboxService.CLAIM_SECONDS)
+        candidates = EmailOutboxService.due(now).values('pk')[:size]
+        EmailOutboxService.due(now).filter(pk__in=candidates).update(email_next_attempt_at=claimed_until)
+        return list(Notification.objects.filter(
+            email_pending=True, email_next_attempt_at=claimed_until
+        ).select_related('user').order_by('created_at'))
+
+    @staticmethod
+    def retry_delay(attempts):
+        """
+        Backoff after the given number of failed attempts: 1, 2, 4, 8... minutes
+        """
+        return timedelta(seconds=EmailOutboxService.RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+    @staticmethod
+    def _record_failure(notification, now):
+        if notification.email_attempts >= EmailOutboxService.MAX_ATTEMPTS:
+            # Give up; the error stays on the row
+            notification.email_pending = False
+            notification.email_next_attempt_at = None
+        else:
+            notification.email_next_attempt_at = now + EmailOutboxService.retry_delay(
+                notification.email_attempts
+            )
+
+    @staticmethod
+    def send_batch(notifications, connection=None):
+        """
+        Send a batch over one connection and save the outcome in one query.
+        Returns (sent, failed) counts.
+        """
+        connection = connection or get_connection()
+        now = timezone.now()
+        sent = failed = 0
+        try:
+            connection.open()
+        except Exception as e:
+            for notification in notifications:
+                notification.email_attempts += 1
+                notification.email_last_attempt_at = now
+                notification.email_last_error = str(e)[:1000]
+                EmailOutboxService._record_failure(notification, now)
+            failed = len(notifications)
+        else:
+            try:
+                for notification in notifications:
+                    if not notification.user.email:
+                        notification.email_pending = False
+                        continue
+                    if notification.deliver_email(connection=connection):
+                        sent += 1
+                    else:
+                        failed += 1
+                        EmailOutboxService._record_failure(notification, now)
+            finally:
+                connection.close()
+
+        Notification.objects.bulk_update(notifications, DELIVERY_FIELDS)
+        return sent, failed
+
+    @staticmethod
+    def send_pending(limit=None, batch_size=None):
+        """
+        Drain the due part of the queue.
+        Returns (sent, failed) counts.
+        """
+        batch_size = batch_size or EmailOutboxService.BATCH_SIZE
+        sent = failed = 0
+        while limit is None or sent + failed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - sent - failed)
+            batch = EmailOutboxService.claim(size)
+            if not batch:
+                break
+            batch_sent, batch_failed = EmailOutboxService.send_batch(batch)
+            sent += batch_sent
+            failed += batch_failed
+            if len(batch) < size:
+                break
+        return sent, failed
@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination
+Pages are selected with WHERE (sort_value, id) > (last_value, last_id)
+instead of OFFSET, so every page costs the same and no COUNT(*) is run.
+"""
+import base64
+import json
+from decimal import Decimal
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _cursor_value(value):
+    # Full precision: DjangoJSONEncoder would cut datetimes to milliseconds
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPage:
+    """
+    One page of results with cursors to its neighbours
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset on one sort field plus the primary key.
+
+    ordering is a field name, prefixed with '-' for descending. Nullable
+    fields need null_value so NULLs sort the same way on every database.
+    """
+
+    def __init__(self, queryset, ordering, per_page, null_value=None):
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.per_page = per_page
+        self.null_value = null_value
+        self.field = queryset.model._meta.get_field(self.field_name)
+
+    def _sort_expression(self):
+        if self.null_value is None:
+            return F(self.field_name)
+        return Coalesce(F(self.field_name), Value(self.null_value), output_field=self.field)
+
+    def encode_cursor(self, obj, direction):
+        value = getattr(obj, self.field_name)
+        if value is None:
+            value = self.null_value
+        payload = json.dumps([direction, _cursor_value(value), obj.pk])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('next', 'previous'):
+                raise ValueError(direction)
+            return direction, self.field.to_python(value), int(pk)
+        except (TypeError, ValueError, json.JSONDecodeError) as e:
+            raise InvalidCursor(str(e))
+
+    def page(self, cursor=None):
+        """
+        The page after/before the cursor, or the first page.
+        Invalid cursors fall back to the first page.
+        """
+        direction, value, pk = 'next', None, None
+        if cursor:
+            try:
+                direction, value, pk = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, value, pk = 'next', None, None
+
+        queryset = self.queryset.annotate(_keyset_value=self._sort_expression())
+        # Walking backwards means reading the ordering in reverse
+        forward = direction == 'next'
+        descending = self.descending if forward else not self.descending
+        if pk is not None:
+            if descending:
+                queryset = queryset.filter(
+                    Q(_keyset_value__lt=value) | Q(_keyset_value=value, pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(_keyset_value__gt=value) | Q(_keyset_value=value, pk__gt=pk)
+                )
+        order = ['-_keyset_value', '-pk'] if descending else ['_keyset_value', 'pk']
+        rows = list(queryset.order_by(*order)[:self.per_page + 1])
+
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if pk is not None and (forward or has_more):
+                previous_cursor = self.encode_cursor(rows[0], 'previous')
+        return KeysetPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,360 @@
+"""
+PDF documents - invoices, payment vouchers, sales receipts and rental
+contracts drawn with ReportLab platypus. Each app turns its model into a
+payload of plain strings (see PdfService.document); the PDF of a payload
+is rendered once and kept under its SHA-256 in PDF_CACHE_DIR, so an
+unchanged document is served from disk and any edit gets a new file.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils import formats, translation
+
+from .arabic import display, has_arabic, shape, visual
+
+CONTENT_TYPE = 'application/pdf'
+# Part of every cache key: bump it when the layout changes
+LAYOUT_VERSION = 1
+REGULAR_FONT = 'DocumentSans'
+BOLD_FONT = 'DocumentSans-Bold'
+
+logger = logging.getLogger(__name__)
+
+_fonts_registered = None
+
+
+def _font_files():
+    """{weight: first configured font file that exists, or None}"""
+    return {
+        weight: next((str(path) for path in candidates if os.path.exists(path)), None)
+        for weight, candidates in settings.PDF_FONTS.items()
+    }
+
+
+def _fonts():
+    """(regular, bold) font names; the TTF files are registered once per process"""
+    global _fonts_registered
+    if _fonts_registered is None:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        files = _font_files()
+        if files.get('regular'):
+            pdfmetrics.registerFont(TTFont(REGULAR_FONT, files['regular']))
+            bold = REGULAR_FONT
+            if files.get('bold'):
+                pdfmetrics.registerFont(TTFont(BOLD_FONT, files['bold']))
+                bold = BOLD_FONT
+            _fonts_registered = (REGULAR_FONT, bold)
+        else:
+            logger.error('No PDF_FONTS file found; PDF documents fall back to Helvetica, which has no Arabic')
+            _fonts_registered = ('Helvetica', 'Helvetica-Bold')
+    return _fonts_registered
+
+
+def _paragraph(text, style, width, rtl):
+    """
+    Paragraph of text. Arabic text is shaped and wrapped here, each line
+    then put in visual order: ReportLab would wrap the reordered string
+    from the wrong end.
+    """
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.platypus import Paragraph
+
+    text = str(text)
+    if not rtl and not has_arabic(text):
+        return Paragraph(escape(text).replace('\n', '<br/>'), style)
+    lines = []
+    for line in text.splitlines() or ['']:
+        # A point less than the cell so Paragraph never wraps a line again
+        parts = simpleSplit(shape(line), style.fontName, style.fontSize, width - 1) or ['']
+        lines.extend(visual(part, rtl or None) for part in parts)
+    return Paragraph('<br/>'.join(escape(line) for line in lines), style)
+
+
+def _store(payload, cache_dir):
+    """Worker entry point of PdfService.render_many"""
+    return PdfService.store(payload, cache_dir)
+
+
+class PdfService:
+    """Build, render and cache PDF documents"""
+
+    CURRENCY = 'EGP'
+
+    @staticmethod
+    def money(value):
+        if value is None:
+            return '-'
+        return f'{PdfService.CURRENCY} {value:,.2f}'
+
+    @staticmethod
+    def date(value):
+        return formats.date_format(value, 'DATE_FORMAT') if value else '-'
+
+    @staticmethod
+    def table(headers, rows, widths, numeric=()):
+        """
+        Item table of a payload; widths are shares of the page width and
+        numeric the indexes of right-aligned columns
+        """
+        return {
+            'headers': [str(header) for header in headers],
+            'rows': [[str(value) for value in row] for row in rows],
+            'widths': list(widths),
+            'numeric': list(numeric),
+        }
+
+    @staticmethod
+    def document(kind, title, number, fields=(), table=None, totals=(), sections=(), signatures=()):
+        """
+        Payload of one document in the active language. fields and totals
+        are (label, value) pairs, sections (heading, text); empty fields
+        and sections are left out.
+        """
+        return {
+            'kind': kind,
+            'language': translation.get_language(),
+            'rtl': translation.get_language_bidi(),
+            'company': settings.PDF_COMPANY_NAME,
+            'title': str(title),
+            'number': str(number),
+            'fields': [[str(label), str(value)] for label, value in fields if value not in (None, '')],
+            'table': table,
+            'totals': [[str(label), str(value)] for label, value in totals],
+            'sections': [[str(heading), str(text)] for heading, text in sections if text],
+            'signatures': [str(label) for label in signatures],
+        }
+
+    @staticmethod
+    def digest(payload):
+        """Content address of a payload: layout version, fonts and data"""
+        source = json.dumps([LAYOUT_VERSION, _font_files(), payload], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def path_for(digest, cache_dir=None):
+        return Path(cache_dir or settings.PDF_CACHE_DIR) / digest[:2] / f'{digest}.pdf'
+
+    @staticmethod
+    def render(payload):
+        """PDF bytes of a payload"""
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle
+
+        regular, bold = _fonts()
+        if regular == 'Helvetica' and has_arabic(json.dumps(payload, ensure_ascii=False)):
+            raise ImproperlyConfigured('Arabic PDF documents need an Arabic font in PDF_FONTS')
+        rtl = payload['rtl']
+        start, end = (TA_RIGHT, TA_LEFT) if rtl else (TA_LEFT, TA_RIGHT)
+        body = ParagraphStyle('body', fontName=regular, fontSize=10, leading=14, alignment=start)
+        label = ParagraphStyle('label', parent=body, fontName=bold, textColor=colors.HexColor('#555555'))
+        amount = ParagraphStyle('amount', parent=body, alignment=end)
+        header = ParagraphStyle('header', parent=body, fontName=bold, textColor=colors.white)
+        heading = ParagraphStyle('heading', parent=body, fontName=bold, fontSize=12, leading=16)
+        company = ParagraphStyle('company', parent=body, fontName=bold, fontSize=16, leading=22, alignment=TA_CENTER)
+        title = ParagraphStyle('title', parent=company, fontSize=14, leading=20)
+        number = ParagraphStyle('number', parent=body, alignment=TA_CENTER, textColor=colors.HexColor('#666666'))
+        signature = ParagraphStyle('signature', parent=body, alignment=TA_CENTER)
+        padding = 12  # default left + right cell padding
+
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, pagesize=A4, leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm,
+            title=payload['number'], author=payload['company'], invariant=True,
+        )
+        width = doc.width
+
+        def ordered(cells):
+            return cells[::-1] if rtl else cells
+
+        story = [
+            _paragraph(payload['company'], company, width, rtl),
+            _paragraph(payload['title'], title, width, rtl),
+            _paragraph(payload['number'], number, width, rtl),
+            Spacer(1, 8 * mm),
+        ]
+
+        if payload['fields']:
+            widths = [width * 0.32, width * 0.68]
+            rows = [
+                ordered([_paragraph(name, label, widths[0] - padding, rtl),
+                         _paragraph(value, body, widths[1] - padding, rtl)])
+                for name, value in payload['fields']
+            ]
+            story.append(Table(rows, colWidths=ordered(widths), style=TableStyle([
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.HexColor('#dddddd')),
+            ])))
+            story.append(Spacer(1, 6 * mm))
+
+        items = payload['table']
+        if items:
+            widths = [width * share for share in items['widths']]
+            numeric = set(items['numeric'])
+            rows = [[_paragraph(name, header, widths[index] - padding, rtl)
+                     for index, name in enumerate(items['headers'])]]
+            rows += [
+                [_paragraph(value, amount if index in numeric else body, widths[index] - padding, rtl)
+                 for index, value in enumerate(row)]
+                for row in items['rows']
+            ]
+            story.append(Table([ordered(row) for row in rows], colWidths=ordered(widths), repeatRows=1,
+                               style=TableStyle([
+                                   ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                                   ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+                                   ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f6f7')]),
+                                   ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#cccccc')),
+                               ])))
+            story.append(Spacer(1, 4 * mm))
+
+        if payload['totals']:
+            widths = [width * 0.3, width * 0.25]
+            rows = [
+                ordered([_paragraph(name, label, widths[0] - padding, rtl),
+                         _paragraph(value, amount, widths[1] - padding, rtl)])
+                for name, value in payload['totals']
+            ]
+            story.append(Table(rows, colWidths=ordered(widths), hAlign='LEFT' if rtl else 'RIGHT',
+                               style=TableStyle([
+                                   ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+                                   ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f5f6f7')),
+                               ])))
+            story.append(Spacer(1, 6 * mm))
+
+        for name, text in payload['sections']:
+            story.append(_paragraph(name, heading, width, rtl))
+            story.append(Spacer(1, 2 * mm))
+            story.append(_paragraph(text, body, width, rtl))
+            story.append(Spacer(1, 4 * mm))
+
+        if payload['signatures']:
+            gap = 10 * mm
+            count = len(payload['signatures'])
+            column = (width - gap * (count - 1)) / count
+            cells, widths = [], []
+            for index, name in enumerate(ordered(payload['signatures'])):
+                if index:
+                    cells.append('')
+                    widths.append(gap)
+                cells.append(_paragraph(name, signature, column - padding, rtl))
+                widths.append(column)
+            story.append(Spacer(1, 15 * mm))
+            story.append(Table([cells], colWidths=widths, style=TableStyle([
+                ('LINEABOVE', (index, 0), (index, 0), 0.75, colors.black)
+                for index in range(0, len(cells), 2)
+            ])))
+
+        footer = display(payload['number'], rtl or None)
+
+        def decorate(canvas, document):
+            canvas.saveState()
+            canvas.setFont(regular, 8)
+            canvas.setFillColor(colors.HexColor('#888888'))
+            canvas.drawCentredString(A4[0] / 2, 10 * mm, f'{footer}  ·  {document.page}')
+            canvas.restoreState()
+
+        doc.build(story, onFirstPage=decorate, onLaterPages=decorate)
+        return buffer.getvalue()
+
+    @staticmethod
+    def store(payload, cache_dir=None):
+        """
+        (path, created): the cached PDF of payload, rendered first when
+        missing. Files are written under a temporary name and renamed, so
+        concurrent readers never see a partial file.
+        """
+        path = PdfService.path_for(PdfService.digest(payload), cache_dir)
+        if path.exists():
+            # Last use, for prune()
+            os.utime(path)
+            return path, False
+        content = PdfService.render(payload)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as output:
+            output.write(content)
+        os.replace(temporary, path)
+        return path, True
+
+    @staticmethod
+    def response(request, payload, filename):
+        """
+        Inline PDF (?download=1 for an attachment) with the content hash as
+        ETag, so browsers revalidate and get a 304 while it is unchanged
+        """
+        path, _created = PdfService.store(payload)
+        etag = f'"{path.stem}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                open(path, 'rb'), content_type=CONTENT_TYPE,
+                as_attachment=request.GET.get('download') == '1', filename=filename,
+            )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def render_many(payloads, workers=None, cache_dir=None):
+        """
+        Store every payload, rendering the missing ones in `workers`
+        processes (one per CPU by default). Workers only render, the
+        payloads are built beforehand. Returns [(path, created)] in
+        payload order.
+        """
+        cache_dir = str(cache_dir or settings.PDF_CACHE_DIR)
+        results = [None] * len(payloads)
+        pending = []
+        for index, payload in enumerate(payloads):
+            path = PdfService.path_for(PdfService.digest(payload), cache_dir)
+            if path.exists():
+                os.utime(path)
+                results[index] = (path, False)
+            else:
+                pending.append(index)
+
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        if workers <= 1:
+            for index in pending:
+                results[index] = PdfService.store(payloads[index], cache_dir)
+            return results
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            stored = pool.map(_store, [payloads[index] for index in pending],
+                              [cache_dir] * len(pending), chunksize=chunksize)
+            for index, result in zip(pending, stored):
+                results[index] = result
+        return results
+
+    @staticmethod
+    def prune(max_age_days, cache_dir=None):
+        """Delete cached files unused for max_age_days; returns how many"""
+        root = Path(cache_dir or settings.PDF_CACHE_DIR)
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for path in list(root.glob('*/*.pdf')) + list(root.glob('*/*.tmp')):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
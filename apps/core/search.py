@@ -0,0 +1,366 @@
+"""
+Full-text search index
+Registered models keep one normalized SearchDocument per row, updated on
+save. Queries are ranked by the database's full-text engine: SQLite FTS5
+locally, PostgreSQL tsvector in production, and a plain LIKE match on
+anything else. Arabic text is normalized on both sides so alef forms, taa
+marbuta, alef maqsura and diacritics all match.
+"""
+import re
+import unicodedata
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.utils.module_loading import import_string
+
+from .models import SearchDocument
+
+# Model label -> fields that make up its search document
+INDEXED_MODELS = {
+    'properties.Property': ['code', 'title', 'address', 'city', 'district', 'description'],
+    'clients.Client': ['name', 'phone', 'email', 'national_id', 'address', 'city'],
+    'sales.Buyer': ['name', 'phone', 'email', 'national_id', 'city', 'company_name'],
+    'contracts.Contract': ['contract_number', 'property__code', 'client__name'],
+    'maintenance.MaintenanceRequest': ['request_number', 'title', 'description', 'property__code'],
+}
+
+# Harakat, Quranic marks, superscript alef and tatweel
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},  # Persian digits
+})
+NON_WORD = re.compile(r'[^\w]+')
+# Definite article (with optional wa-/bi-/ka-/fa- prefix), kept off so
+# "الاسكندرية" and "اسكندرية" index the same
+ARABIC_ARTICLE = re.compile('^[وبكف]?ال(?=..)')
+
+
+def normalize_text(text):
+    """
+    Lowercase, unify Arabic letter variants and strip diacritics and punctuation
+    """
+    text = unicodedata.normalize('NFKC', str(text or ''))
+    text = ARABIC_DIACRITICS.sub('', text).translate(ARABIC_LETTERS).casefold()
+    return NON_WORD.sub(' ', text).strip()
+
+
+def tokenize(text):
+    """
+    Index/query terms: normalized words without the Arabic definite article
+    """
+    return [ARABIC_ARTICLE.sub('', word) for word in normalize_text(text).split()]
+
+
+def _among(sql, params, column, within):
+    """
+    Restrict a ranking query to the rows of a queryset (the caller's filters)
+    """
+    if within is None:
+        return sql, params
+    within_sql, within_params = within.order_by().values('pk').query.sql_with_params()
+    return f'{sql} AND {column} IN ({within_sql})', [*params, *within_params]
+
+
+class LikeSearchBackend:
+    """
+    Fallback: every token must appear in the document, no ranking
+    """
+
+    def matches(self, content_type, tokens):
+        """
+        Object ids of every matching document, as a subquery for pk__in
+        """
+        documents = SearchDocument.objects.filter(content_type=content_type)
+        for token in tokens:
+            documents = documents.filter(body__contains=token)
+        return documents.values('object_id')
+
+    def search(self, content_type, tokens, limit, within=None):
+        """
+        [(object_id, rank)] of the best limit matches among the rows of
+        within, best first
+        """
+        return []
+
+
+class SQLiteFTS5Backend(LikeSearchBackend):
+    """
+    SQLite FTS5 table kept in step with SearchDocument by triggers
+    (see migration 0008); ranked with bm25
+    """
+
+    @staticmethod
+    def match(tokens):
+        # Quoted prefix terms, implicitly ANDed
+        return ' '.join('"{}"*'.format(token.replace('"', '')) for token in tokens)
+
+    def matches(self, content_type, tokens):
+        if not self.available():
+            return super().matches(content_type, tokens)
+        # A nested IN keeps SQLite on the FTS index; a join here is planned as a scan
+        return RawSQL(
+            'SELECT object_id FROM core_searchdocument WHERE content_type_id = %s '
+            'AND id IN (SELECT rowid FROM core_search_fts WHERE core_search_fts MATCH %s)',
+            [content_type.pk, self.match(tokens)],
+        )
+
+    def search(self, content_type, tokens, limit, within=None):
+        if not self.available():
+            return super().search(content_type, tokens, limit, within)
+        sql, params = _among(
+            'SELECT d.object_id, bm25(core_search_fts) AS rank '
+            'FROM core_search_fts JOIN core_searchdocument d ON d.id = core_search_fts.rowid '
+            'WHERE core_search_fts MATCH %s AND d.content_type_id = %s',
+            [self.match(tokens), content_type.pk],
+            'd.object_id',
+            within,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} ORDER BY rank LIMIT %s', [*params, limit])
+            # bm25 is lower-is-better
+            return [(object_id, -rank) for object_id, rank in cursor.fetchall()]
+
+    @staticmethod
+    def available():
+        return 'core_search_fts' in connection.introspection.table_names()
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    """
+    PostgreSQL full-text search over a GIN-indexed tsvector expression
+    (see migration 0008); ranked with ts_rank
+    """
+
+    @staticmethod
+    def tsquery(tokens):
+        return ' & '.join('{}:*'.format(re.sub(r"[&|!():*'\\]", '', token)) for token in tokens)
+
+    def matches(self, content_type, tokens):
+        return RawSQL(
+            "SELECT object_id FROM core_searchdocument "
+            "WHERE content_type_id = %s AND to_tsvector('simple', body) @@ to_tsquery('simple', %s)",
+            [content_type.pk, self.tsquery(tokens)],
+        )
+
+    def search(self, content_type, tokens, limit, within=None):
+        query = self.tsquery(tokens)
+        sql, params = _among(
+            "SELECT object_id, ts_rank(to_tsvector('simple', body), to_tsquery('simple', %s)) AS rank "
+            "FROM core_searchdocument "
+            "WHERE content_type_id = %s AND to_tsvector('simple', body) @@ to_tsquery('simple', %s)",
+            [query, content_type.pk, query],
+            'object_id',
+            within,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} ORDER BY rank DESC LIMIT %s', [*params, limit])
+            return list(cursor.fetchall())
+
+
+BACKENDS = {
+    'sqlite': 'apps.core.search.SQLiteFTS5Backend',
+    'postgresql': 'apps.core.search.PostgresSearchBackend',
+}
+
+
+def get_backend():
+    """
+    Backend from settings.SEARCH_BACKEND, or the one matching the database
+    """
+    path = getattr(settings, 'SEARCH_BACKEND', None) or BACKENDS.get(
+        connection.vendor, 'apps.core.search.LikeSearchBackend'
+    )
+    return import_string(path)()
+
+
+class SearchService:
+    """
+    Maintain and query the search index
+    """
+
+    # Matches ranked per search; the result set itself is never capped
+    RANK_LIMIT = 200
+
+    @staticmethod
+    def is_indexed(model):
+        return model._meta.label in INDEXED_MODELS
+
+    @staticmethod
+    def document_for(instance):
+        """
+        Normalized search text of one instance
+        """
+        values = []
+        for path in INDEXED_MODELS[instance._meta.label]:
+            value = instance
+            for attribute in path.split('__'):
+                value = getattr(value, attribute, None) if value is not None else None
+            if value:
+                values.append(str(value))
+        return ' '.join(tokenize(' '.join(values)))
+
+    @staticmethod
+    def index(instance):
+        SearchDocument.objects.update_or_create(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            defaults={'body': SearchService.document_for(instance)},
+        )
+
+    @staticmethod
+    def remove(instance):
+        SearchDocument.objects.filter(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+        ).delete()
+
+    @staticmethod
+    def _write(queryset, batch_size, upsert=False):
+        """
+        Bulk write the documents of every row of a queryset of one indexed
+        model, following its related fields. Returns the number written.
+        """
+        label = queryset.model._meta.label
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        related = sorted({path.split('__')[0] for path in INDEXED_MODELS[label] if '__' in path})
+        if related:
+            queryset = queryset.select_related(*related)
+        options = {
+            'update_conflicts': True,
+            'unique_fields': ['content_type', 'object_id'],
+            'update_fields': ['body', 'updated_at'],
+        } if upsert else {}
+
+        batch = []
+        count = 0
+        for instance in queryset.iterator(chunk_size=batch_size):
+            batch.append(SearchDocument(
+                content_type=content_type,
+                object_id=instance.pk,
+                body=SearchService.document_for(instance),
+            ))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch, **options)
+                count += len(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch, **options)
+            count += len(batch)
+        return count
+
+    @staticmethod
+    def reindex(queryset, batch_size=500):
+        """
+        Rewrite the documents of the rows of a queryset in place.
+        Returns the number of documents written.
+        """
+        return SearchService._write(queryset, batch_size, upsert=True)
+
+    @staticmethod
+    def rebuild(labels=None, batch_size=500):
+        """
+        Recreate the documents of the given models (all by default).
+        Returns {label: documents written}.
+        """
+        written = {}
+        for label in labels or INDEXED_MODELS:
+            model = apps.get_model(label)
+            SearchDocument.objects.filter(content_type=ContentType.objects.get_for_model(model)).delete()
+            written[label] = SearchService._write(model.objects.all(), batch_size)
+        return written
+
+    @staticmethod
+    def ranked_ids(model, query, limit=None, within=None):
+        """
+        [(object_id, rank)] of the best matches, best first, optionally
+        only among the rows of the queryset within
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        return get_backend().search(
+            ContentType.objects.get_for_model(model),
+            tokens,
+            limit or SearchService.RANK_LIMIT,
+            within,
+        )
+
+    @staticmethod
+    def search(queryset, query, rank_limit=None):
+        """
+        Narrow a queryset to every match of query, annotated with
+        search_rank and ordered best match first. Only the best rank_limit
+        matches get a rank; the rest follow them, newest first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        matched = queryset.filter(
+            pk__in=get_backend().matches(ContentType.objects.get_for_model(queryset.model), tokens)
+        )
+        hits = SearchService.ranked_ids(queryset.model, query, rank_limit, within=queryset)
+        rank = Case(
+            *[When(pk=object_id, then=Value(float(rank))) for object_id, rank in hits],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ) if hits else Value(0.0, output_field=FloatField())
+        return matched.annotate(search_rank=rank).order_by('-search_rank', '-pk')
+
+
+# Related model -> [(indexed model, relation, field)] for documents that
+# include another model's fields, e.g. a contract's property__code
+DEPENDENTS = {}
+
+
+def _index_instance(sender, instance, raw=False, **kwargs):
+    if not raw:
+        SearchService.index(instance)
+
+
+def _remove_instance(sender, instance, **kwargs):
+    SearchService.remove(instance)
+
+
+def _reindex_dependents(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Rewrite the documents that include fields of a saved related row
+    """
+    if raw:
+        return
+    for model, relation, field in DEPENDENTS.get(sender, []):
+        if update_fields is None or field in update_fields:
+            SearchService.reindex(model.objects.filter(**{relation: instance}))
+
+
+def connect_signals():
+    """
+    Keep documents of every indexed model up to date, including when a
+    related row their document reads from is saved
+    """
+    DEPENDENTS.clear()
+    for label, paths in INDEXED_MODELS.items():
+        model = apps.get_model(label)
+        uid = f'search_index_{label}'
+        post_save.connect(_index_instance, sender=model, dispatch_uid=uid)
+        post_delete.connect(_remove_instance, sender=model, dispatch_uid=uid)
+        for path in paths:
+            if '__' in path:
+                relation, field = path.split('__', 1)
+                related = model._meta.get_field(relation).related_model
+                DEPENDENTS.setdefault(related, []).append((model, relation, field))
+
+    for related in DEPENDENTS:
+        post_save.connect(
+            _reindex_dependents, sender=related, dispatch_uid=f'search_dependents_{related._meta.label}'
+        )
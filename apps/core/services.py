@@ -2,8 +2,15 @@
 Notification Service for Origin App
 Centralized notification management and delivery
 """
+import time
+
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
 from django.utils import timezone
 from .models import Notification, NotificationPreference
 
@@ -13,6 +20,18 @@ class NotificationService:
     Service class for managing notifications
     """
     
+    BULK_BATCH_SIZE = 500
+    UNREAD_CACHE_TIMEOUT = 60 * 60
+    # A process-local cache misses other processes' bumps: stay no staler than the old 30 s poll
+    UNREAD_LOCAL_CACHE_TIMEOUT = 30
+    
+    @staticmethod
+    def staff_users():
+        """
+        Active staff users, the audience of most operational alerts
+        """
+        return User.objects.filter(is_staff=True, is_active=True)
+    
     @staticmethod
     def create_notification(
         user,
@@ -30,53 +49,95 @@ class NotificationService:
         """
         Create a notification with optional email sending
         """
-        notification_data = {
-            'user': user,
-            'title': title,
-            'message': message,
-            'notification_type': notification_type,
-            'priority': priority,
-            'link': link,
-            'action_label': action_label,
-            'action_url': action_url,
-            'metadata': metadata,
-        }
+        return NotificationService.create_bulk_notification(
+            [user],
+            title,
+            message,
+            notification_type=notification_type,
+            priority=priority,
+            related_object=related_object,
+            link=link,
+            action_label=action_label,
+            action_url=action_url,
+            send_email=send_email,
+            metadata=metadata,
+        )[0]
+    
+    @staticmethod
+    def create_bulk_notification(
+        users,
+        title,
+        message,
+        notification_type='info',
+        priority='medium',
+        related_object=None,
+        link='',
+        action_label='',
+        action_url='',
+        send_email=False,
+        metadata=None
+    ):
+        """
+        Create the same notification for many users with batched inserts.
+        Emails are not sent here: recipients whose preferences allow it are
+        queued (email_pending) and delivered by send_pending_notifications,
+        after their quiet hours, or held for their daily/weekly digest.
+        Urgent notifications skip both.
+        """
+        users = list(users)
+        if not users:
+            return []
         
-        # Add related object if provided
+        # Resolved once for the whole fan-out
+        content_type = None
+        object_id = None
         if related_object:
-            notification_data['content_type'] = ContentType.objects.get_for_model(related_object)
-            notification_data['object_id'] = related_object.pk
+            content_type = ContentType.objects.get_for_model(related_object)
+            object_id = related_object.pk
         
-        # Create notification
-        notification = Notification.objects.create(**notification_data)
-        
-        # Check user preferences and send email if needed
+        preferences = {}
         if send_email:
-            try:
-                prefs = user.notification_preferences
-                if prefs.should_send_email(notification_type):
-                    notification.send_email()
-            except NotificationPreference.DoesNotExist:
-                # No preferences set, send by default
-                notification.send_email()
+            preferences = {
+                prefs.user_id: prefs
+                for prefs in NotificationPreference.objects.filter(user__in=[user.pk for user in users])
+            }
         
-        return notification
-    
-    @staticmethod
-    def create_bulk_notification(users, title, message, **kwargs):
-        """
-        Create notifications for multiple users
-        """
+        now = timezone.now()
         notifications = []
         for user in users:
-            notification = NotificationService.create_notification(
+            prefs = preferences.get(user.pk)
+            # No preferences set, send by default
+            wants_email = send_email and bool(user.email) and (
+                prefs is None or prefs.should_send_email(notification_type)
+            )
+            hold_for_digest = False
+            next_attempt_at = None
+            if wants_email and prefs is not None and priority != 'urgent':
+                hold_for_digest = prefs.digest_frequency is not None
+                next_attempt_at = prefs.quiet_until(now)
+            notifications.append(Notification(
                 user=user,
                 title=title,
                 message=message,
-                **kwargs
-            )
-            notifications.append(notification)
-        return notifications
+                notification_type=notification_type,
+                priority=priority,
+                content_type=content_type,
+                object_id=object_id,
+                link=link,
+                action_label=action_label,
+                action_url=action_url,
+                metadata=metadata,
+                email_pending=wants_email and not hold_for_digest,
+                email_digest=hold_for_digest,
+                email_next_attempt_at=None if hold_for_digest else next_attempt_at,
+            ))
+        
+        created = Notification.objects.bulk_create(
+            notifications, batch_size=NotificationService.BULK_BATCH_SIZE
+        )
+        # bulk_create sends no post_save
+        NotificationService.bump_unread_version([user.pk for user in users])
+        return created
     
     # ===================================================================
     # CONTRACT NOTIFICATIONS
@@ -104,36 +165,32 @@ class NotificationService:
             )
         
         # Notify assigned staff (superusers)
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title=f"Contract Expiring Soon",
-                message=f"Contract {contract.contract_number} expires in {days_until_expiry} days",
-                notification_type='contract_expiry',
-                priority='medium',
-                related_object=contract,
-                link=f'/contracts/{contract.pk}/',
-                send_email=False  # Only in-app for staff
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title=f"Contract Expiring Soon",
+            message=f"Contract {contract.contract_number} expires in {days_until_expiry} days",
+            notification_type='contract_expiry',
+            priority='medium',
+            related_object=contract,
+            link=f'/contracts/{contract.pk}/',
+            send_email=False  # Only in-app for staff
+        )
     
     @staticmethod
     def notify_contract_created(contract):
         """
         Send notification when new contract is created
         """
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title="New Contract Created",
-                message=f"Contract {contract.contract_number} has been created for {contract.property.code}",
-                notification_type='info',
-                priority='low',
-                related_object=contract,
-                link=f'/contracts/{contract.pk}/',
-                send_email=False
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title="New Contract Created",
+            message=f"Contract {contract.contract_number} has been created for {contract.property.code}",
+            notification_type='info',
+            priority='low',
+            related_object=contract,
+            link=f'/contracts/{contract.pk}/',
+            send_email=False
+        )
     
     # ===================================================================
     # PAYMENT NOTIFICATIONS
@@ -239,18 +296,16 @@ class NotificationService:
         """
         Send notification when document is expiring soon
         """
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title=f"Document Expiring in {days_until_expiry} Days",
-                message=f"Document '{document.title}' for property {document.property.code} expires on {document.expiry_date}",
-                notification_type='document_expiry',
-                priority='high' if days_until_expiry <= 7 else 'medium',
-                related_object=document,
-                link=f'/properties/{document.property.pk}/',
-                send_email=True
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title=f"Document Expiring in {days_until_expiry} Days",
+            message=f"Document '{document.title}' for property {document.property.code} expires on {document.expiry_date}",
+            notification_type='document_expiry',
+            priority='high' if days_until_expiry <= 7 else 'medium',
+            related_object=document,
+            link=f'/properties/{document.property.pk}/',
+            send_email=True
+        )
     
     # ===================================================================
     # BUDGET NOTIFICATIONS
@@ -261,36 +316,32 @@ class NotificationService:
         """
         Send notification when budget is exceeded
         """
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title="⚠️ Budget Exceeded",
-                message=f"Budget '{budget.name}' has been exceeded. Spent: {budget.spent_amount}, Budget: {budget.total_amount}",
-                notification_type='budget_alert',
-                priority='urgent',
-                related_object=budget,
-                link=f'/financial/budgets/{budget.pk}/',
-                send_email=True
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title="⚠️ Budget Exceeded",
+            message=f"Budget '{budget.name}' has been exceeded. Spent: {budget.spent_amount}, Budget: {budget.total_amount}",
+            notification_type='budget_alert',
+            priority='urgent',
+            related_object=budget,
+            link=f'/financial/budgets/{budget.pk}/',
+            send_email=True
+        )
     
     @staticmethod
     def notify_budget_threshold(budget, percentage):
         """
         Send notification when budget reaches threshold (e.g., 80%)
         """
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title=f"Budget Alert - {percentage}% Used",
-                message=f"Budget '{budget.name}' is at {percentage}% utilization",
-                notification_type='budget_alert',
-                priority='medium',
-                related_object=budget,
-                link=f'/financial/budgets/{budget.pk}/',
-                send_email=False
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title=f"Budget Alert - {percentage}% Used",
+            message=f"Budget '{budget.name}' is at {percentage}% utilization",
+            notification_type='budget_alert',
+            priority='medium',
+            related_object=budget,
+            link=f'/financial/budgets/{budget.pk}/',
+            send_email=False
+        )
     
     # ===================================================================
     # SALES NOTIFICATIONS
@@ -301,42 +352,154 @@ class NotificationService:
         """
         Send notification when sales reservation is expiring
         """
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title=f"Reservation Expiring in {days_until_expiry} Days",
-                message=f"Reservation {reservation.reservation_number} expires on {reservation.expiry_date}",
-                notification_type='warning',
-                priority='high',
-                related_object=reservation,
-                link=f'/sales/reservations/{reservation.pk}/',
-                action_label='Approve Now',
-                action_url=f'/sales/reservations/{reservation.pk}/approve/',
-                send_email=True
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title=f"Reservation Expiring in {days_until_expiry} Days",
+            message=f"Reservation {reservation.reservation_number} expires on {reservation.expiry_date}",
+            notification_type='warning',
+            priority='high',
+            related_object=reservation,
+            link=f'/sales/reservations/{reservation.pk}/',
+            action_label='Approve Now',
+            action_url=f'/sales/reservations/{reservation.pk}/approve/',
+            send_email=True
+        )
     
     # ===================================================================
     # UTILITY METHODS
     # ===================================================================
     
     @staticmethod
-    def mark_all_as_read(user):
+    def filter_notifications(user, ids=None, notification_type=None, status=None):
+        """
+        A user's notifications narrowed by ids, type and status
+        (unread, read, archived or all)
+        """
+        notifications = Notification.objects.filter(user=user)
+        if ids is not None:
+            notifications = notifications.filter(pk__in=ids)
+        if notification_type and notification_type != 'all':
+            notifications = notifications.filter(notification_type=notification_type)
+        if status == 'unread':
+            notifications = notifications.filter(is_read=False)
+        elif status == 'read':
+            notifications = notifications.filter(is_read=True, is_archived=False)
+        elif status == 'archived':
+            notifications = notifications.filter(is_archived=True)
+        return notifications
+    
+    @staticmethod
+    def mark_all_as_read(user, **filters):
         """
-        Mark all notifications as read for a user
+        Mark a user's notifications as read in one UPDATE
         """
-        notifications = Notification.objects.filter(user=user, is_read=False)
-        count = notifications.count()
-        for notification in notifications:
-            notification.mark_as_read()
+        count = NotificationService.filter_notifications(user, **filters).filter(
+            is_read=False
+        ).update(is_read=True, read_at=timezone.now())
+        if count:
+            NotificationService.bump_unread_version([user.pk])
         return count
     
+    @staticmethod
+    def archive_notifications(user, **filters):
+        """
+        Archive a user's notifications in one UPDATE (archiving also marks them read)
+        """
+        now = timezone.now()
+        count = NotificationService.filter_notifications(user, **filters).filter(
+            is_archived=False
+        ).update(
+            is_archived=True,
+            archived_at=now,
+            is_read=True,
+            read_at=Coalesce('read_at', Value(now)),
+        )
+        if count:
+            NotificationService.bump_unread_version([user.pk])
+        return count
+    
+    @staticmethod
+    def delete_notifications(user, **filters):
+        """
+        Delete a user's notifications in one DELETE
+        """
+        count, _ = NotificationService.filter_notifications(user, **filters).delete()
+        if count:
+            NotificationService.bump_unread_version([user.pk])
+        return count
+    
+    @staticmethod
+    def purge_read(older_than, archive=False, chunk_size=1000):
+        """
+        Delete (or archive) read notifications created before older_than,
+        chunk by chunk to keep transactions and locks short.
+        Returns the number of notifications processed.
+        """
+        old_read = Notification.objects.filter(is_read=True, created_at__lt=older_than)
+        if archive:
+            old_read = old_read.filter(is_archived=False)
+        
+        processed = 0
+        while True:
+            chunk = list(old_read.order_by('pk').values_list('pk', 'user_id')[:chunk_size])
+            if not chunk:
+                break
+            ids = [pk for pk, _ in chunk]
+            if archive:
+                Notification.objects.filter(pk__in=ids).update(is_archived=True, archived_at=timezone.now())
+            else:
+                Notification.objects.filter(pk__in=ids).delete()
+            NotificationService.bump_unread_version({user_id for _, user_id in chunk})
+            processed += len(chunk)
+            if len(chunk) < chunk_size:
+                break
+        return processed
+    
+    @staticmethod
+    def unread_version_key(user_id):
+        return f'notifications:unread_version:{user_id}'
+    
+    @staticmethod
+    def get_unread_version(user_id):
+        """
+        Version of a user's unread count; changes whenever it may have changed
+        """
+        key = NotificationService.unread_version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            # Never reuse an old version after the key was evicted
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+    
+    @staticmethod
+    def bump_unread_version(user_ids):
+        """
+        Invalidate the cached unread count of the given users
+        """
+        keys = {NotificationService.unread_version_key(user_id) for user_id in user_ids}
+        if not keys:
+            return
+        current = cache.get_many(keys)
+        fresh = time.time_ns()
+        cache.set_many({key: max(current.get(key, 0) + 1, fresh) for key in keys}, timeout=None)
+    
     @staticmethod
     def get_unread_count(user):
         """
-        Get count of unread notifications for a user
+        Get count of unread notifications for a user, cached per version
         """
-        return Notification.objects.filter(user=user, is_read=False).count()
+        version = NotificationService.get_unread_version(user.pk)
+        key = f'notifications:unread:{user.pk}:{version}'
+        count = cache.get(key)
+        if count is None:
+            count = Notification.objects.filter(user=user, is_read=False).count()
+            timeout = (
+                NotificationService.UNREAD_CACHE_TIMEOUT if settings.CACHE_SHARED
+                else NotificationService.UNREAD_LOCAL_CACHE_TIMEOUT
+            )
+            cache.set(key, count, timeout)
+        return count
     
     @staticmethod
     def get_recent_notifications(user, limit=10):
@@ -344,3 +507,17 @@ class NotificationService:
         Get recent notifications for a user
         """
         return Notification.objects.filter(user=user).order_by('-created_at')[:limit]
+
+
+def _bump_unread_version(sender, instance, **kwargs):
+    NotificationService.bump_unread_version([instance.user_id])
+
+
+def connect_signals():
+    """
+    Invalidate cached unread counts when a single notification is saved.
+    Bulk operations and the admin's deletes bump the version themselves;
+    there is deliberately no post_delete receiver so queryset deletes stay
+    a single DELETE.
+    """
+    post_save.connect(_bump_unread_version, sender=Notification, dispatch_uid='notification_unread_count')
@@ -75,21 +75,18 @@ def sales_payment_received_notification(sender, instance, created, **kwargs):
     """
     if created and instance.status == 'completed':
         from .services import NotificationService
-        from django.contrib.auth.models import User
         
         # Notify staff about new payment
-        staff_users = User.objects.filter(is_staff=True, is_active=True)
-        for staff in staff_users:
-            NotificationService.create_notification(
-                user=staff,
-                title="Sales Payment Received",
-                message=f"Payment of EGP {instance.amount} received for contract {instance.sales_contract.contract_number}",
-                notification_type='success',
-                priority='low',
-                related_object=instance,
-                link=f'/sales/contracts/{instance.sales_contract.pk}/',
-                send_email=False
-            )
+        NotificationService.create_bulk_notification(
+            NotificationService.staff_users(),
+            title="Sales Payment Received",
+            message=f"Payment of EGP {instance.amount} received for contract {instance.sales_contract.contract_number}",
+            notification_type='success',
+            priority='low',
+            related_object=instance,
+            link=f'/sales/contracts/{instance.sales_contract.pk}/',
+            send_email=False
+        )
 
 
 # ===================================================================
@@ -0,0 +1,165 @@
+"""
+Materialized dashboard snapshots
+Dashboards read pre-computed metrics; model signals only mark the
+affected metrics dirty and refresh_dashboard_snapshots recomputes them.
+"""
+import time
+
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from .models import DashboardSnapshot
+
+
+def _core_section(section):
+    def compute(today):
+        from .dashboard import DashboardStatsService
+        return DashboardStatsService.compute_section(section, today)
+    return compute
+
+
+def _sales_section(section):
+    def compute(today):
+        from apps.sales.dashboard import SalesDashboardService
+        return SalesDashboardService.compute_section(section, today)
+    return compute
+
+
+# Metric name -> (compute callable, models whose changes make it dirty)
+METRICS = {
+    'dashboard.properties': (_core_section('properties'), ['properties.Property']),
+    'dashboard.contracts': (_core_section('contracts'), ['contracts.Contract']),
+    'dashboard.maintenance': (_core_section('maintenance'), ['maintenance.MaintenanceRequest']),
+    'dashboard.people': (_core_section('people'), ['clients.Client', 'owners.Owner']),
+    'dashboard.sales': (_core_section('sales'), ['sales.SalesContract', 'sales.PropertyReservation']),
+    'dashboard.financial': (
+        _core_section('financial'),
+        ['financial.Payment', 'financial.Invoice', 'sales.SalesPayment'],
+    ),
+    'sales.buyers': (_sales_section('buyers'), ['sales.Buyer']),
+    'sales.reservations': (_sales_section('reservations'), ['sales.PropertyReservation']),
+    'sales.contracts': (
+        _sales_section('contracts'),
+        ['sales.SalesContract', 'sales.SalesPaymentPlan'],
+    ),
+    'sales.payments': (_sales_section('payments'), ['sales.SalesPayment']),
+}
+
+# Dashboard -> metric name prefix
+DASHBOARDS = {
+    'dashboard': 'dashboard.',
+    'sales': 'sales.',
+}
+
+
+class DashboardSnapshotService:
+    """
+    Read, invalidate and refresh DashboardSnapshot rows
+    """
+
+    @staticmethod
+    def metrics_for_model(model):
+        """
+        Metric names that depend on the given model class
+        """
+        label = model._meta.label
+        return [name for name, (_, labels) in METRICS.items() if label in labels]
+
+    @staticmethod
+    def mark_dirty(metrics):
+        """
+        Flag metrics for the next background refresh
+        """
+        if metrics:
+            DashboardSnapshot.objects.filter(metric__in=metrics).update(is_dirty=True)
+
+    @staticmethod
+    def refresh(metrics=None, today=None):
+        """
+        Recompute metrics (all by default) and store them.
+        Returns the list of refreshed snapshots.
+        """
+        today = today or timezone.now().date()
+        refreshed = []
+        for name in metrics or METRICS:
+            compute, _ = METRICS[name]
+            started = time.monotonic()
+            value = compute(today)
+            snapshot, _ = DashboardSnapshot.objects.update_or_create(
+                metric=name,
+                defaults={
+                    'value': value,
+                    'is_dirty': False,
+                    'refreshed_at': timezone.now(),
+                    'refresh_duration_ms': int((time.monotonic() - started) * 1000),
+                },
+            )
+            refreshed.append(snapshot)
+        return refreshed
+
+    @staticmethod
+    def stale_metrics(max_age=None):
+        """
+        Metrics that are dirty, missing, or older than max_age (timedelta)
+        """
+        snapshots = {
+            snapshot.metric: snapshot
+            for snapshot in DashboardSnapshot.objects.filter(metric__in=list(METRICS))
+        }
+        today = timezone.localdate()
+        stale = []
+        for name in METRICS:
+            snapshot = snapshots.get(name)
+            if (
+                snapshot is None
+                or snapshot.is_dirty
+                or snapshot.refreshed_at is None
+                # Date-relative counters ("this month", "expiring soon") roll over daily
+                or timezone.localdate(snapshot.refreshed_at) != today
+                or (max_age is not None and timezone.now() - snapshot.refreshed_at > max_age)
+            ):
+                stale.append(name)
+        return stale
+
+    @staticmethod
+    def read(dashboard):
+        """
+        Read all metrics of a dashboard in one query.
+        Returns (values dict, oldest refreshed_at). Metrics that were never
+        computed are refreshed inline so a fresh install still renders.
+        """
+        prefix = DASHBOARDS[dashboard]
+        names = [name for name in METRICS if name.startswith(prefix)]
+        snapshots = {
+            snapshot.metric: snapshot
+            for snapshot in DashboardSnapshot.objects.filter(metric__in=names)
+        }
+        missing = [name for name in names if name not in snapshots]
+        if missing:
+            for snapshot in DashboardSnapshotService.refresh(missing):
+                snapshots[snapshot.metric] = snapshot
+
+        values = {}
+        for name in names:
+            values.update(snapshots[name].value)
+        refreshed_at = min(snapshot.refreshed_at for snapshot in snapshots.values())
+        return values, refreshed_at
+
+
+def _mark_metrics_dirty(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+    DashboardSnapshotService.mark_dirty(DashboardSnapshotService.metrics_for_model(sender))
+
+
+def connect_signals():
+    """
+    Connect post_save/post_delete of every model a metric depends on
+    """
+    labels = {label for _, model_labels in METRICS.values() for label in model_labels}
+    for label in labels:
+        model = apps.get_model(label)
+        uid = f'dashboard_snapshot_{label}'
+        post_save.connect(_mark_metrics_dirty, sender=model, dispatch_uid=uid)
+        post_delete.connect(_mark_metrics_dirty, sender=model, dispatch_uid=uid)
@@ -0,0 +1,365 @@
+"""
+Seeded synthetic portfolio for benchmarking - owners, tenants, properties,
+rental contracts and payments, posted journal entries, sales contracts with
+installment plans and maintenance requests, written with bulk_create in
+batches so 10k/100k/1M-property databases can be built in minutes.
+
+bulk_create skips save() and signals, so derived tables (search index,
+occupancy, account balances, P&L rollup, dashboard snapshots) are rebuilt
+once at the end.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract, ContractPayment
+from apps.financial.models import Account, AccountType, JournalEntry, JournalEntryLine
+from apps.maintenance.models import MaintenanceCategory, MaintenanceRequest
+from apps.owners.models import Owner
+from apps.properties import geohash
+from apps.properties.models import Property, PropertyType
+from apps.sales.models import Buyer, SalesContract, SalesPaymentPlan
+
+# Number of properties per named scale
+SCALES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+CITIES = [
+    # name, latitude, longitude, districts
+    ('Cairo', 30.0444, 31.2357, ['Nasr City', 'Maadi', 'Heliopolis', 'Zamalek', 'New Cairo']),
+    ('Giza', 30.0131, 31.2089, ['Dokki', 'Mohandessin', 'Haram', '6th of October', 'Sheikh Zayed']),
+    ('Alexandria', 31.2001, 29.9187, ['Smouha', 'Sidi Gaber', 'Miami', 'Stanley', 'Agami']),
+    ('Mansoura', 31.0409, 31.3785, ['Talkha', 'El Gomhoria', 'Toriel']),
+    ('Hurghada', 27.2579, 33.8116, ['El Dahar', 'Sakkala', 'El Gouna']),
+    ('Aswan', 24.0889, 32.8998, ['Corniche', 'El Sail']),
+]
+PROPERTY_TYPES = ['Apartment', 'Villa', 'Duplex', 'Studio', 'Office', 'Shop', 'Chalet']
+MAINTENANCE_CATEGORIES = ['Plumbing', 'Electrical', 'HVAC', 'Painting', 'Carpentry']
+ACCOUNTS = {
+    'bank': ('1120', 'Bank Account', AccountType.ASSET),
+    'rent': ('4100', 'Rental Revenue', AccountType.REVENUE),
+    'sales': ('4010', 'Property Sales Revenue', AccountType.REVENUE),
+    'maintenance': ('5100', 'Maintenance Expense', AccountType.EXPENSE),
+}
+TWO_PLACES = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(value).quantize(TWO_PLACES)
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(day.day, 28))
+
+
+class SyntheticPortfolioGenerator:
+    """
+    Build a portfolio of `properties` properties (plus proportional owners,
+    tenants, buyers and history) from `seed`. Rows are tagged with
+    `prefix` in their unique codes so clear() can remove them again.
+    """
+
+    PROPERTIES_PER_OWNER = 8
+    TENANTS_PER_PROPERTY = 0.8
+    BUYERS_PER_PROPERTY = 0.1
+    OCCUPIED_SHARE = 0.8
+    PREVIOUS_CONTRACT_SHARE = 0.5
+    SALE_SHARE = 0.05
+    MAINTENANCE_SHARE = 0.5
+    PAID_MONTHS = 6
+    INSTALLMENTS = 24
+
+    def __init__(self, properties, seed=42, batch_size=2000, prefix='SYN', today=None, log=None):
+        self.total_properties = properties
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.today = today or date.today()
+        self.log = log or (lambda message: None)
+        self.counts = {}
+
+    # Bookkeeping
+
+    def _code(self, kind, number):
+        return f'{self.prefix}-{kind}{number:07d}'
+
+    def _insert(self, model, objects):
+        """bulk_create in batches; returns the objects with primary keys"""
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(created)
+        return created
+
+    def exists(self):
+        tag = f'{self.prefix}-'
+        return (
+            Owner.objects.filter(national_id__startswith=tag).exists()
+            or Property.objects.filter(code__startswith=tag).exists()
+        )
+
+    @staticmethod
+    def clear(prefix='SYN'):
+        """Delete every row generated with prefix, dependents first"""
+        tag = f'{prefix}-'
+        deleted = {}
+        for model, lookup in [
+            (JournalEntry, 'entry_number__startswith'),
+            (SalesContract, 'contract_number__startswith'),
+            (Contract, 'contract_number__startswith'),
+            (MaintenanceRequest, 'request_number__startswith'),
+            (Property, 'code__startswith'),
+            (Owner, 'national_id__startswith'),
+            (Client, 'national_id__startswith'),
+            (Buyer, 'national_id__startswith'),
+        ]:
+            _total, per_model = model.objects.filter(**{lookup: tag}).delete()
+            for label, count in per_model.items():
+                deleted[label] = deleted.get(label, 0) + count
+        return deleted
+
+    # Reference data
+
+    def _reference_data(self):
+        self.property_types = [
+            PropertyType.objects.get_or_create(name=name)[0] for name in PROPERTY_TYPES
+        ]
+        self.categories = [
+            MaintenanceCategory.objects.get_or_create(name=name)[0] for name in MAINTENANCE_CATEGORIES
+        ]
+        self.accounts = {
+            key: Account.objects.get_or_create(
+                code=code, defaults={'name': name, 'account_type': account_type}
+            )[0]
+            for key, (code, name, account_type) in ACCOUNTS.items()
+        }
+
+    def _people(self):
+        rnd = self.random
+        owners = self.total_properties // self.PROPERTIES_PER_OWNER + 1
+        tenants = int(self.total_properties * self.TENANTS_PER_PROPERTY) + 1
+        buyers = int(self.total_properties * self.BUYERS_PER_PROPERTY) + 1
+
+        self.owner_ids = []
+        for start in range(0, owners, self.batch_size):
+            created = self._insert(Owner, [
+                Owner(
+                    name=f'Owner {number}', phone=f'+2010{number:08d}',
+                    national_id=self._code('O', number), city=rnd.choice(CITIES)[0],
+                )
+                for number in range(start, min(start + self.batch_size, owners))
+            ])
+            self.owner_ids.extend(owner.pk for owner in created)
+
+        self.tenant_ids = []
+        for start in range(0, tenants, self.batch_size):
+            created = self._insert(Client, [
+                Client(
+                    name=f'Tenant {number}', phone=f'+2011{number:08d}',
+                    national_id=self._code('C', number), address=f'{number} Tahrir Street',
+                    city=rnd.choice(CITIES)[0],
+                )
+                for number in range(start, min(start + self.batch_size, tenants))
+            ])
+            self.tenant_ids.extend(tenant.pk for tenant in created)
+
+        self.buyer_ids = []
+        for start in range(0, buyers, self.batch_size):
+            created = self._insert(Buyer, [
+                Buyer(
+                    buyer_type=rnd.choice(['individual', 'company', 'investor']),
+                    name=f'Buyer {number}', phone=f'+2012{number:08d}',
+                    email=f'buyer{number}@example.com', national_id=self._code('B', number),
+                    address=f'{number} Corniche Road', city=rnd.choice(CITIES)[0],
+                )
+                for number in range(start, min(start + self.batch_size, buyers))
+            ])
+            self.buyer_ids.extend(buyer.pk for buyer in created)
+        self.log(f'{owners} owners, {tenants} tenants, {buyers} buyers')
+
+    # Per-block history
+
+    def _properties(self, start, stop):
+        rnd = self.random
+        objects = []
+        for number in range(start, stop):
+            city, latitude, longitude, districts = rnd.choice(CITIES)
+            latitude = Decimal(str(round(latitude + rnd.uniform(-0.08, 0.08), 6)))
+            longitude = Decimal(str(round(longitude + rnd.uniform(-0.08, 0.08), 6)))
+            area = rnd.randint(45, 450)
+            rent = _money(area * rnd.uniform(60, 140))
+            objects.append(Property(
+                title=f'{rnd.choice(PROPERTY_TYPES)} {number} in {city}',
+                code=self._code('P', number),
+                property_type=rnd.choice(self.property_types),
+                owner_id=rnd.choice(self.owner_ids),
+                address=f'{number} Nile Street', city=city, district=rnd.choice(districts),
+                latitude=latitude, longitude=longitude, geohash=geohash.encode(latitude, longitude),
+                area_sqm=Decimal(area), bedrooms=rnd.randint(0, 5), bathrooms=rnd.randint(1, 4),
+                rental_price_monthly=rent, market_value=_money(rent * rnd.randint(150, 250)),
+                purchase_price=_money(rent * rnd.randint(100, 180)),
+            ))
+        return self._insert(Property, objects)
+
+    def _rentals(self, properties):
+        rnd = self.random
+        contracts = []
+        for prop in properties:
+            occupied = rnd.random() < self.OCCUPIED_SHARE
+            if occupied or rnd.random() < self.PREVIOUS_CONTRACT_SHARE:
+                start = self.today - timedelta(days=rnd.randint(400, 900))
+                contracts.append(Contract(
+                    contract_number=f'{prop.code}-R1', property=prop, client_id=rnd.choice(self.tenant_ids),
+                    start_date=start, end_date=start + timedelta(days=365),
+                    rent_amount=_money(prop.rental_price_monthly * Decimal('0.9')), status='expired',
+                ))
+            if occupied:
+                start = self.today - timedelta(days=rnd.randint(self.PAID_MONTHS * 31, 330))
+                contracts.append(Contract(
+                    contract_number=f'{prop.code}-R2', property=prop, client_id=rnd.choice(self.tenant_ids),
+                    start_date=start, end_date=start + timedelta(days=365),
+                    rent_amount=prop.rental_price_monthly, status='active',
+                ))
+                prop.status = 'rented'
+        contracts = self._insert(Contract, contracts)
+        Property.objects.bulk_update(
+            [prop for prop in properties if prop.status == 'rented'], ['status'], batch_size=self.batch_size
+        )
+
+        payments, entries, lines = [], [], []
+        for contract in contracts:
+            if contract.status != 'active':
+                continue
+            for month in range(self.PAID_MONTHS):
+                paid_on = _add_months(contract.start_date, month)
+                payments.append(ContractPayment(
+                    contract=contract, payment_date=paid_on, amount=contract.rent_amount,
+                    payment_method='bank_transfer', status='completed',
+                ))
+                entry = JournalEntry(
+                    entry_number=f'{contract.contract_number}-{month:02d}', entry_date=paid_on,
+                    entry_type='automated', description='Rent received', property_id=contract.property_id,
+                    contract=contract, is_posted=True,
+                )
+                entries.append(entry)
+                lines.append((entry, 'bank', 'rent', contract.rent_amount))
+        self._insert(ContractPayment, payments)
+        return entries, lines
+
+    def _sales(self, properties):
+        rnd = self.random
+        contracts = []
+        for prop in properties:
+            if rnd.random() >= self.SALE_SHARE:
+                continue
+            price = prop.market_value
+            signed = self.today - timedelta(days=rnd.randint(30, 600))
+            contracts.append(SalesContract(
+                contract_number=f'{prop.code}-S', property=prop, buyer_id=rnd.choice(self.buyer_ids),
+                seller_id=prop.owner_id, sale_price=price, down_payment=_money(price * Decimal('0.2')),
+                contract_date=signed, signing_date=signed, expected_handover_date=signed + timedelta(days=365),
+                has_installments=True, number_of_installments=self.INSTALLMENTS, status='in_progress',
+            ))
+        contracts = self._insert(SalesContract, contracts)
+
+        plans, entries, lines = [], [], []
+        for contract in contracts:
+            installment = _money((contract.sale_price - contract.down_payment) / self.INSTALLMENTS)
+            entry = JournalEntry(
+                entry_number=f'{contract.contract_number}-DP', entry_date=contract.contract_date,
+                entry_type='automated', description='Down payment received',
+                property_id=contract.property_id, is_posted=True,
+            )
+            entries.append(entry)
+            lines.append((entry, 'bank', 'sales', contract.down_payment))
+            for number in range(1, self.INSTALLMENTS + 1):
+                due = _add_months(contract.contract_date, number)
+                paid = due <= self.today and rnd.random() < 0.9
+                plans.append(SalesPaymentPlan(
+                    sales_contract=contract, installment_number=number, due_date=due, amount=installment,
+                    is_paid=paid, payment_date=due if paid else None,
+                    is_overdue=due < self.today and not paid,
+                ))
+        self._insert(SalesPaymentPlan, plans)
+        return entries, lines
+
+    def _maintenance(self, properties):
+        rnd = self.random
+        requests, entries, lines = [], [], []
+        for prop in properties:
+            if rnd.random() >= self.MAINTENANCE_SHARE:
+                continue
+            status = rnd.choice(['pending', 'in_progress', 'completed', 'completed'])
+            cost = _money(rnd.uniform(200, 8000))
+            requests.append(MaintenanceRequest(
+                request_number=f'{prop.code}-M', property=prop, category=rnd.choice(self.categories),
+                title=f'{rnd.choice(MAINTENANCE_CATEGORIES)} issue', description='Generated request',
+                priority=rnd.choice(['low', 'medium', 'high', 'urgent']), status=status,
+                estimated_cost=cost, actual_cost=cost if status == 'completed' else None,
+            ))
+            if status == 'completed':
+                entry = JournalEntry(
+                    entry_number=f'{prop.code}-MX', entry_date=self.today - timedelta(days=rnd.randint(1, 365)),
+                    entry_type='automated', description='Maintenance paid', property=prop, is_posted=True,
+                )
+                entries.append(entry)
+                lines.append((entry, 'maintenance', 'bank', cost))
+        self._insert(MaintenanceRequest, requests)
+        return entries, lines
+
+    def _journal(self, entries, lines):
+        self._insert(JournalEntry, entries)
+        self._insert(JournalEntryLine, [
+            JournalEntryLine(journal_entry=entry, account=self.accounts[side], **{amount_field: amount})
+            for entry, debit, credit, amount in lines
+            for side, amount_field in ((debit, 'debit_amount'), (credit, 'credit_amount'))
+        ])
+
+    # Entry point
+
+    def generate(self):
+        """Insert everything; returns {model label: rows created}"""
+        with transaction.atomic():
+            self._reference_data()
+            self._people()
+        for start in range(0, self.total_properties, self.batch_size):
+            stop = min(start + self.batch_size, self.total_properties)
+            with transaction.atomic():
+                properties = self._properties(start, stop)
+                entries, lines = self._rentals(properties)
+                for more_entries, more_lines in (self._sales(properties), self._maintenance(properties)):
+                    entries += more_entries
+                    lines += more_lines
+                self._journal(entries, lines)
+            self.log(f'{stop}/{self.total_properties} properties')
+        return self.counts
+
+    @staticmethod
+    def rebuild_derived():
+        """Recompute what save() and signals would have maintained"""
+        from apps.core.search import SearchService
+        from apps.core.snapshots import DashboardSnapshotService
+        from apps.financial.ledger import LedgerService
+        from apps.financial.pnl import PropertyPnLService
+        from apps.properties.listing import PropertyListingService
+        from apps.properties.mapping import PropertyMapService
+        from apps.properties.occupancy import OccupancyService
+
+        derived = {
+            'search documents': sum(SearchService.rebuild().values()),
+            'occupancy rates': OccupancyService.refresh(),
+            'account balances': LedgerService.rebuild(),
+            'P&L rows': PropertyPnLService.rebuild(),
+        }
+        DashboardSnapshotService.refresh()
+        PropertyListingService.invalidate_summary()
+        PropertyMapService.invalidate()
+        return derived
@@ -0,0 +1,31 @@
+"""
+Fixture helpers shared by the apps' test modules
+"""
+from decimal import Decimal
+
+from apps.clients.models import Client
+from apps.owners.models import Owner
+from apps.properties.models import Property, PropertyType
+
+
+def create_owner(national_id, **fields):
+    """Owner with a valid phone number"""
+    fields = {'name': 'Owner', 'phone': '+201000000000', **fields}
+    return Owner.objects.create(national_id=national_id, **fields)
+
+
+def create_client(national_id, **fields):
+    """Tenant with the required contact fields filled in"""
+    fields = {'name': 'Tenant', 'phone': '+201000000001', 'address': 'Street', **fields}
+    return Client.objects.create(national_id=national_id, **fields)
+
+
+def create_property(code, owner=None, property_type=None, **fields):
+    """Property with the required fields filled in; owner and type are created when not given"""
+    fields = {'title': code, 'address': 'Street', 'city': 'Cairo', 'area_sqm': Decimal('100.00'), **fields}
+    return Property.objects.create(
+        code=code,
+        owner=owner or create_owner(f'OWN-{code}'),
+        property_type=property_type or PropertyType.objects.get_or_create(name='Apartment')[0],
+        **fields,
+    )
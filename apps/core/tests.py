@@ -0,0 +1,791 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from apps.clients.models import Client
+from apps.contracts.documents import ContractDocumentService
+from apps.contracts.models import Contract
+from apps.core import arabic, pdf
+from apps.core.benchmarks import BenchmarkRunner
+from apps.core.dashboard import DashboardStatsService
+from apps.core.digest import NotificationDigestService
+from apps.core.exports import XLSX_CONTENT_TYPE
+from apps.core.imports import ClientImporter, ImportFileError, OwnerImporter, PropertyImporter
+from apps.core.middleware import QueryBudgetExceeded, QueryInstrumentationMiddleware, fingerprint, recent_requests
+from apps.core.models import AuditLog, DashboardSnapshot, Notification, NotificationPreference, SearchDocument
+from apps.core.outbox import EmailOutboxService
+from apps.core.pagination import KeysetPaginator
+from apps.core.pdf import PdfService
+from apps.core.search import SearchService, normalize_text
+from apps.core.services import NotificationService
+from apps.core.snapshots import DashboardSnapshotService
+from apps.core.synthetic import SyntheticPortfolioGenerator
+from apps.core.testing import create_client, create_owner, create_property
+from apps.financial.documents import FinancialDocumentService
+from apps.financial.models import Invoice, InvoiceItem, JournalEntry, JournalEntryLine, PropertyPnL
+from apps.maintenance.models import MaintenanceRequest
+from apps.owners.models import Owner
+from apps.properties import geohash
+from apps.properties.forms import PropertyForm
+from apps.properties.models import Property, PropertyType
+from apps.sales.models import Buyer, SalesContract, SalesPayment
+
+
+class DashboardStatsServiceTests(TestCase):
+    """Dashboard counters are computed with a fixed query budget"""
+
+    QUERY_BUDGET = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_owner('OWN-1')
+        cls.today = date(2025, 6, 15)
+        for index in range(4):
+            prop = create_property(f'P-{index}', owner, status='rented' if index < 3 else 'available')
+            client = create_client(f'CLI-{index}', name=f'Tenant {index}')
+            Contract.objects.create(
+                contract_number=f'C-{index}',
+                property=prop,
+                client=client,
+                start_date=cls.today - timedelta(days=60),
+                end_date=cls.today + timedelta(days=300),
+                rent_amount=Decimal('1000.00'),
+                status='active' if index < 3 else 'expired',
+            )
+
+    def test_query_budget_is_fixed(self):
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            DashboardStatsService.compute(self.today)
+
+    def test_counters(self):
+        stats = DashboardStatsService.compute(self.today)
+        self.assertEqual(stats.total_properties, 4)
+        self.assertEqual(stats.rented_properties, 3)
+        self.assertEqual(stats.occupancy_rate, 75.0)
+        self.assertEqual(stats.active_contracts, 3)
+        self.assertEqual(stats.expired_contracts, 1)
+        self.assertEqual(stats.avg_contract_duration, 12.0)
+        self.assertEqual(stats.cities_labels, ['Cairo'])
+        self.assertEqual(len(stats.revenue_trend_labels), DashboardStatsService.TREND_MONTHS)
+
+
+class DashboardSnapshotTests(TestCase):
+    """Snapshots are read in one query and invalidated per metric"""
+
+    def test_read_uses_stored_snapshot(self):
+        DashboardSnapshotService.refresh()
+        with self.assertNumQueries(1):
+            values, refreshed_at = DashboardSnapshotService.read('dashboard')
+        self.assertEqual(values['total_properties'], 0)
+        self.assertIsNotNone(refreshed_at)
+
+    def test_save_marks_only_affected_metrics_dirty(self):
+        DashboardSnapshotService.refresh()
+        create_owner('OWN-2')
+        dirty = set(DashboardSnapshot.objects.filter(is_dirty=True).values_list('metric', flat=True))
+        self.assertEqual(dirty, {'dashboard.people'})
+        self.assertEqual(DashboardSnapshotService.stale_metrics(), ['dashboard.people'])
+
+
+class NotificationFanOutTests(TestCase):
+    """Bulk notifications are inserted in batches and emails are queued"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = [
+            User.objects.create_user(f'staff{index}', f'staff{index}@example.com', is_staff=True)
+            for index in range(5)
+        ]
+        NotificationPreference.objects.create(user=cls.staff[0], email_enabled=False)
+
+    def test_fan_out_query_count_is_fixed(self):
+        # staff users, preferences, insert
+        with self.assertNumQueries(3):
+            notifications = NotificationService.create_bulk_notification(
+                NotificationService.staff_users(), 'Title', 'Message', send_email=True
+            )
+        self.assertEqual(len(notifications), 5)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.filter(email_pending=True).count(), 4)
+
+    def test_pending_emails_are_sent_later(self):
+        NotificationService.create_bulk_notification(self.staff, 'Title', 'Message', send_email=True)
+        # claim, claimed batch, bulk update
+        with self.assertNumQueries(3):
+            self.assertEqual(EmailOutboxService.send_pending(), (4, 0))
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertFalse(Notification.objects.filter(email_pending=True).exists())
+        self.assertEqual(set(Notification.objects.values_list('email_attempts', flat=True)), {0, 1})
+
+    def test_claimed_rows_are_skipped_by_other_workers(self):
+        NotificationService.create_bulk_notification(self.staff, 'Title', 'Message', send_email=True)
+        first = EmailOutboxService.claim(3)
+        second = EmailOutboxService.claim(3)
+        self.assertEqual((len(first), len(second)), (3, 1))
+        self.assertFalse({notification.pk for notification in first} & {notification.pk for notification in second})
+        self.assertEqual(EmailOutboxService.claim(3), [])
+        # A claim left behind by a dead worker lapses
+        later = timezone.now() + timedelta(seconds=EmailOutboxService.CLAIM_SECONDS + 1)
+        self.assertEqual(len(EmailOutboxService.claim(10, now=later)), 4)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        NotificationService.create_notification(self.staff[1], 'Title', 'Message', send_email=True)
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            self.assertEqual(EmailOutboxService.send_pending(), (0, 1))
+        notification = Notification.objects.get()
+        self.assertTrue(notification.email_pending)
+        self.assertEqual(notification.email_attempts, 1)
+        self.assertEqual(notification.email_last_error, 'SMTP down')
+        self.assertGreater(notification.email_next_attempt_at, notification.email_last_attempt_at)
+        # Not due again until the backoff has passed
+        self.assertEqual(EmailOutboxService.send_pending(), (0, 0))
+
+
+class NotificationDigestTests(TestCase):
+    """Digest subscribers get one grouped email instead of one per alert"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('digest', 'digest@example.com')
+        NotificationPreference.objects.create(user=cls.user, daily_digest=True)
+
+    def notify(self, notification_type, priority='medium'):
+        return NotificationService.create_notification(
+            self.user, f'{notification_type} alert', 'Message',
+            notification_type=notification_type, priority=priority, send_email=True,
+        )
+
+    def test_held_notifications_are_sent_as_one_digest(self):
+        self.notify('payment_due')
+        self.notify('payment_due')
+        self.notify('contract_expiry', priority='high')
+        self.assertFalse(Notification.objects.filter(email_pending=True).exists())
+
+        # recipients, held notifications, bulk mark as sent
+        with self.assertNumQueries(3):
+            self.assertEqual(NotificationDigestService.send('daily'), (1, 3, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Contract Expiry', mail.outbox[0].alternatives[0][0])
+        self.assertEqual(Notification.objects.filter(is_sent_email=True, email_digest=False).count(), 3)
+
+    def test_urgent_notifications_skip_the_digest(self):
+        notification = self.notify('budget_alert', priority='urgent')
+        self.assertTrue(notification.email_pending)
+        self.assertFalse(notification.email_digest)
+
+    def test_quiet_hours_defer_the_digest(self):
+        self.notify('payment_due')
+        prefs = self.user.notification_preferences
+        now = timezone.localtime()
+        prefs.quiet_hours_start = (now - timedelta(hours=1)).time()
+        prefs.quiet_hours_end = (now + timedelta(hours=1)).time()
+        prefs.save()
+        self.assertEqual(NotificationDigestService.send('daily'), (0, 0, 0))
+        self.assertTrue(Notification.objects.filter(email_digest=True).exists())
+
+    def test_turning_digests_off_releases_held_notifications(self):
+        self.notify('payment_due')
+        prefs = self.user.notification_preferences
+        prefs.weekly_digest = False
+        prefs.save()
+        self.assertEqual(prefs.digest_frequency, 'daily')
+        self.assertTrue(Notification.objects.get().email_digest)
+
+        prefs.daily_digest = False
+        prefs.save()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.email_digest, notification.email_pending), (False, True))
+        self.assertEqual(EmailOutboxService.send_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class UnreadCountCacheTests(TestCase):
+    """Unread counts are cached and invalidated by a version bump"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', 'reader@example.com')
+
+    def test_count_is_cached_until_notifications_change(self):
+        NotificationService.create_notification(self.user, 'Title', 'Message')
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+
+        notification = Notification.objects.get()
+        version = NotificationService.get_unread_version(self.user.pk)
+        notification.mark_as_read()
+        self.assertNotEqual(NotificationService.get_unread_version(self.user.pk), version)
+        self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+
+        NotificationService.create_notification(self.user, 'Title', 'Message')
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        NotificationService.delete_notifications(self.user, status='unread')
+        self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+
+    def test_admin_deletes_invalidate_the_count(self):
+        first = NotificationService.create_notification(self.user, 'Title', 'Message')
+        NotificationService.create_notification(self.user, 'Title', 'Message')
+        self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+
+        self.client.post(reverse('admin:core_notification_delete', args=[first.pk]), {'post': 'yes'})
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        self.client.post(reverse('admin:core_notification_changelist'), {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': list(Notification.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+
+
+class NotificationBulkOperationTests(TestCase):
+    """Bulk notification operations are single set-based statements"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('bulk', 'bulk@example.com')
+        cls.other = User.objects.create_user('other', 'other@example.com')
+        NotificationService.create_bulk_notification([cls.user, cls.other], 'Title', 'Message')
+        for index in range(20):
+            NotificationService.create_notification(
+                cls.user, f'Alert {index}', 'Message',
+                notification_type='payment_due' if index % 2 else 'info',
+            )
+
+    def test_mark_all_as_read_is_one_update(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationService.mark_all_as_read(self.user), 21)
+        self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+        self.assertEqual(NotificationService.get_unread_count(self.other), 1)
+
+    def test_archive_and_delete_by_filter(self):
+        with self.assertNumQueries(1):
+            archived = NotificationService.archive_notifications(self.user, notification_type='payment_due')
+        self.assertEqual(archived, 10)
+        self.assertFalse(Notification.objects.filter(is_archived=True, is_read=False).exists())
+        with self.assertNumQueries(1):
+            deleted = NotificationService.delete_notifications(self.user, status='archived')
+        self.assertEqual(deleted, 10)
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 11)
+
+    def test_bulk_endpoint(self):
+        self.client.force_login(self.user)
+        ids = list(Notification.objects.filter(user=self.user).values_list('pk', flat=True)[:3])
+        response = self.client.post(
+            reverse('core:notification_bulk_action', args=['mark-read']),
+            {'ids': ids},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(response.json()['unread_count'], 18)
+
+    def test_purge_read_in_chunks(self):
+        NotificationService.mark_all_as_read(self.user)
+        cutoff = timezone.now() + timedelta(seconds=1)
+        self.assertEqual(NotificationService.purge_read(cutoff, chunk_size=8), 21)
+        self.assertEqual(list(Notification.objects.values_list('user', flat=True)), [self.other.pk])
+
+
+class KeysetPaginatorTests(TestCase):
+    """Keyset pages walk the whole result set in both directions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_owner('OWN-K')
+        for index in range(25):
+            create_property(
+                f'K-{index:02d}', owner,
+                # Repeated and missing values exercise the id tiebreaker and NULL handling
+                rental_price_monthly=None if index % 5 == 0 else Decimal(index % 3),
+            )
+
+    def walk(self, ordering, null_value=None):
+        paginator = KeysetPaginator(Property.objects.all(), ordering, 10, null_value=null_value)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            with self.assertNumQueries(1):
+                pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_walk_matches_offset_order(self):
+        paginator, pages = self.walk('-rental_price_monthly', null_value=Decimal('0'))
+        seen = [obj.pk for page in pages for obj in page]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertFalse(pages[0].has_previous())
+
+    def test_previous_cursor_returns_same_page(self):
+        paginator, pages = self.walk('-created_at')
+        back = paginator.page(pages[2].previous_cursor)
+        self.assertEqual([obj.pk for obj in back], [obj.pk for obj in pages[1]])
+        self.assertTrue(back.has_next())
+        self.assertTrue(back.has_previous())
+
+
+class SearchIndexTests(TestCase):
+    """Indexed search normalizes Arabic and ranks matches"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_owner('OWN-S')
+        cls.villa = create_property('S-1', cls.owner, title='فيلا الإسكندرية', city='الإسكندرية')
+        cls.flat = create_property('S-2', cls.owner, title='شقة مطلة على البحر', city='القاهرة')
+        cls.garden = create_property('S-3', cls.owner, title='Garden villa', city='Giza')
+
+    def search(self, query):
+        return list(SearchService.search(Property.objects.all(), query))
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text('الإسْكَنْدَرِيَّة'), 'الاسكندريه')
+        self.assertEqual(normalize_text('مَبْنى ١٢'), 'مبني 12')
+
+    def test_arabic_variants_match(self):
+        self.assertEqual(self.search('الاسكندريه'), [self.villa])
+        self.assertEqual(self.search('شقّة'), [self.flat])
+
+    def test_prefix_and_every_term_must_match(self):
+        self.assertEqual(self.search('gard vil'), [self.garden])
+        self.assertEqual(self.search('garden cairo'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.garden.title = 'Palm house'
+        self.garden.save()
+        self.assertEqual(self.search('garden'), [])
+        self.assertEqual(self.search('palm'), [self.garden])
+        self.garden.delete()
+        self.assertEqual(self.search('palm'), [])
+
+    def test_filtered_matches_beyond_the_rank_limit(self):
+        for index in range(6):
+            create_property(f'S-G{index}', self.owner, title=f'Garden flat {index}',
+                            city='Giza' if index % 2 else 'Cairo')
+        expected = {'S-3', 'S-G1', 'S-G3', 'S-G5'}
+        for backend in ['apps.core.search.SQLiteFTS5Backend', 'apps.core.search.LikeSearchBackend']:
+            with self.subTest(backend=backend), override_settings(SEARCH_BACKEND=backend):
+                with mock.patch.object(SearchService, 'RANK_LIMIT', 2):
+                    results = SearchService.search(Property.objects.filter(city='Giza'), 'garden')
+                    self.assertEqual(results.count(), 4)
+                    ranks = [(obj.code, obj.search_rank) for obj in results]
+                self.assertEqual({code for code, _rank in ranks}, expected)
+                ranked = [rank for _code, rank in ranks if rank]
+                self.assertEqual(len(ranked), 2 if 'FTS5' in backend else 0)
+                self.assertEqual(ranked, sorted(ranked, reverse=True))
+
+    def test_related_saves_reindex_dependent_documents(self):
+        tenant = create_client('CL-R', name='Hala Nabil')
+        contract = Contract.objects.create(
+            contract_number='RC-9', property=self.villa, client=tenant, start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), rent_amount=Decimal('1000.00'),
+        )
+        request = MaintenanceRequest.objects.create(
+            request_number='MR-9', property=self.villa, title='Leak', description='Kitchen sink',
+        )
+        self.villa.code = 'VILLA-7'
+        self.villa.save()
+        self.assertEqual(list(SearchService.search(Contract.objects.all(), 'villa 7')), [contract])
+        self.assertEqual(list(SearchService.search(MaintenanceRequest.objects.all(), 'villa 7')), [request])
+
+        tenant.name = 'Hala Samir'
+        tenant.save(update_fields=['phone'])
+        self.assertFalse(SearchService.search(Contract.objects.all(), 'samir').exists())
+        tenant.save()
+        self.assertEqual(list(SearchService.search(Contract.objects.all(), 'samir')), [contract])
+        self.assertEqual(SearchService.rebuild(['contracts.Contract']), {'contracts.Contract': 1})
+        self.assertEqual(list(SearchService.search(Contract.objects.all(), 'samir')), [contract])
+
+    def test_rebuild_registered_models(self):
+        create_client('CL-S', name='أحمد علي', city='Cairo')
+        written = SearchService.rebuild(['properties.Property', 'clients.Client'])
+        self.assertEqual(written, {'properties.Property': 3, 'clients.Client': 1})
+        self.assertEqual(SearchService.search(Client.objects.all(), 'احمد').count(), 1)
+
+    def test_property_list_and_api_use_the_index(self):
+        user = User.objects.create_user('searcher', password='pass', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('properties:list'), {'search': 'اسكندرية'})
+        self.assertEqual([obj.pk for obj in response.context['properties']], [self.villa.pk])
+        response = self.client.get('/en/api/v1/properties/', {'search': 'اسكندرية'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.villa.pk])
+
+
+@override_settings(QUERY_INSTRUMENTATION=True, QUERY_BUDGET_STRICT=True)
+class QueryInstrumentationTests(TestCase):
+    """Requests report their queries and strict mode enforces budgets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('budget', password='pass', is_staff=True)
+        for index in range(25):
+            prop = create_property(f'Q-{index}', create_owner(f'OWN-Q{index}', name=f'Owner {index}'))
+            tenant = create_client(f'CLI-Q{index}', name=f'Tenant {index}')
+            Contract.objects.create(
+                contract_number=f'Q-{index}', property=prop, client=tenant, start_date=date(2026, 1, 1),
+                end_date=date(2026, 12, 31), rent_amount=Decimal('1000.00'), status='active',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_fingerprint_folds_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'  AND n > 10"),
+            fingerprint('SELECT * FROM t WHERE id IN (%s) AND name = \'yy\' AND n > 2'),
+        )
+
+    def test_server_timing_and_log(self):
+        # Captured, so the run never writes to queries.log
+        with self.assertLogs('apps.core.queries', 'INFO') as logs:
+            response = self.client.get(reverse('properties:list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=')
+        summary = recent_requests[-1]
+        self.assertEqual((summary['view'], summary['budget']), ('properties:list', 12))
+        self.assertLessEqual(summary['queries'], 12)
+        self.assertEqual(json.loads(logs.records[-1].getMessage()), summary)
+
+    def test_listing_budgets_hold_at_volume(self):
+        with self.assertLogs('apps.core.queries', 'INFO'):
+            for url in [reverse('properties:list'), reverse('owners:list'), reverse('clients:list'),
+                        '/en/api/v1/properties/', '/en/api/v1/owners/', '/en/api/v1/clients/']:
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_strict_mode_raises_over_budget(self):
+        with override_settings(QUERY_BUDGETS={'owners:list': 2}, QUERY_REPEAT_THRESHOLD=2):
+            with self.assertLogs('apps.core.queries', 'WARNING'):
+                with self.assertRaisesMessage(QueryBudgetExceeded, 'owners:list ran'):
+                    self.client.get(reverse('owners:list'))
+
+    def test_disabled_middleware_leaves_the_stack(self):
+        with override_settings(QUERY_INSTRUMENTATION=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                QueryInstrumentationMiddleware(lambda request: None)
+
+
+class SyntheticPortfolioBenchmarkTests(TestCase):
+    """Seeded bulk generator and the JSON benchmark runner"""
+
+    def generate(self, seed=7):
+        generator = SyntheticPortfolioGenerator(60, seed=seed, batch_size=25, today=date(2026, 6, 15))
+        return generator.generate()
+
+    def test_generation_is_seeded_and_balanced(self):
+        counts = self.generate()
+        self.assertEqual(counts['properties.Property'], 60)
+        self.assertGreater(counts['contracts.ContractPayment'], 0)
+        codes = list(Property.objects.order_by('code').values_list('code', 'city', 'rental_price_monthly'))
+        contracts = SalesContract.objects.count()
+
+        SyntheticPortfolioGenerator.clear()
+        self.assertFalse(Property.objects.filter(code__startswith='SYN-').exists())
+        self.generate()
+        self.assertEqual(list(Property.objects.order_by('code').values_list('code', 'city', 'rental_price_monthly')), codes)
+        self.assertEqual(SalesContract.objects.count(), contracts)
+
+        lines = JournalEntryLine.objects.filter(journal_entry__entry_number__startswith='SYN-')
+        totals = lines.aggregate(debit=Sum('debit_amount'), credit=Sum('credit_amount'))
+        self.assertEqual(totals['debit'], totals['credit'])
+        self.assertEqual(lines.count(), 2 * JournalEntry.objects.filter(entry_number__startswith='SYN-').count())
+
+    def test_derived_data_rebuilt(self):
+        self.generate()
+        SyntheticPortfolioGenerator.rebuild_derived()
+        self.assertTrue(Property.objects.filter(code__startswith='SYN-', occupancy_rate__gt=0).exists())
+        self.assertTrue(PropertyPnL.objects.exists())
+
+    def test_benchmark_results_compare(self):
+        self.generate()
+        User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        results = BenchmarkRunner(repeat=1, only=['property_list', 'api_properties']).run()
+        self.assertEqual(results['meta']['rows']['properties'], 60)
+        for result in results['results'].values():
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['cold_queries'], 0)
+            self.assertIsNotNone(result['median_ms'])
+        rows = BenchmarkRunner.compare(results, results)
+        self.assertIn(('property_list', 'cold_queries', results['results']['property_list']['cold_queries'],
+                       results['results']['property_list']['cold_queries'], 0.0), rows)
+
+
+class BulkImportTests(TestCase):
+    """Streaming Excel/CSV import validated by the ModelForms"""
+
+    @staticmethod
+    def csv_file(rows):
+        return BytesIO('\n'.join(','.join(row) for row in rows).encode('utf-8-sig'))
+
+    @staticmethod
+    def xlsx_file(rows):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for row in rows:
+            sheet.append(row)
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def test_owner_csv_reports_row_errors(self):
+        create_owner('N-1', name='Existing')
+        source = self.csv_file([
+            ['Full Name', 'Phone Number', 'national_id', 'is_active', 'favourite_colour'],
+            ['Amr', '+201000000001', 'N-2', 'yes', 'blue'],
+            ['Mona', 'not a phone', 'N-3', 'no', ''],
+            ['Dup', '+201000000002', 'N-1', '', ''],
+            ['Twice', '+201000000003', 'N-2', '', ''],
+            ['', '', '', '', ''],
+            ['Laila', '+201000000004', 'N-4', 'no', ''],
+        ])
+        result = OwnerImporter(batch_size=2).run(source, 'owners.csv')
+
+        self.assertEqual((result.created, result.failed), (2, 3))
+        self.assertEqual(result.ignored_columns, ['favourite_colour'])
+        self.assertEqual([(error.row, error.column) for error in result.errors],
+                         [(3, 'phone'), (4, 'national_id'), (5, 'national_id')])
+        self.assertEqual(dict(Owner.objects.filter(national_id__in=['N-2', 'N-4']).values_list('name', 'is_active')),
+                         {'Amr': True, 'Laila': False})
+
+    def test_property_xlsx_resolves_lookups_and_fills_derived_fields(self):
+        PropertyType.objects.create(name='Apartment')
+        owner = create_owner('OWN-1', name='Sameh')
+        rows = [['Property Title', 'property_type', 'owner', 'address', 'city', 'area_sqm',
+                 'rental_price_monthly', 'status', 'latitude', 'longitude']]
+        for index in range(30):
+            rows.append([f'Flat {index}', 'apartment', 'OWN-1' if index % 2 else 'Sameh', 'Nile St', 'Cairo',
+                         120, '12,500', 'Rented', 30.05, 31.23])
+        rows.append(['Flat X', 'Castle', 'Nobody', 'Nile St', 'Cairo', 90, '', 'available', '', ''])
+
+        with CaptureQueriesContext(connection) as queries:
+            result = PropertyImporter(batch_size=10).run(self.xlsx_file(rows), 'portfolio.xlsx')
+        self.assertEqual((result.created, result.failed), (30, 1))
+        self.assertEqual({error.column for error in result.errors}, {'property_type', 'owner'})
+        # Lookups, uniqueness and inserts per batch of 10, never per row
+        self.assertLess(len(queries), 40)
+
+        imported = Property.objects.filter(owner=owner).order_by('code')
+        self.assertEqual(imported.count(), 30)
+        first = imported.first()
+        self.assertRegex(first.code, r'^PROP-\d{4}-0001$')
+        self.assertEqual((first.status, first.rental_price_monthly), ('rented', Decimal('12500.00')))
+        self.assertEqual(first.geohash, geohash.encode(first.latitude, first.longitude))
+        self.assertEqual(SearchDocument.objects.count(), 30)
+
+    def test_generated_codes_continue_past_9999(self):
+        owner = create_owner('OWN-1')
+        prefix = PropertyForm._generate_unique_code().rsplit('-', 1)[0]
+        for number in ['9998', '9999', '10000']:
+            create_property(f'{prefix}-{number}', owner=owner)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(PropertyForm._generate_unique_code(), f'{prefix}-10001')
+        self.assertEqual(len(queries), 2)
+
+    def test_dry_run_and_missing_columns(self):
+        source = self.csv_file([['name', 'phone', 'national_id', 'address'], ['Hala', '+201000000000', 'C-1', 'Giza']])
+        result = ClientImporter(dry_run=True).run(source, 'clients.csv')
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Client.objects.exists())
+
+        with self.assertRaisesMessage(ImportFileError, 'Missing required columns: address'):
+            ClientImporter().run(self.csv_file([['name', 'phone', 'national_id']]), 'clients.csv')
+        with self.assertRaises(ImportFileError):
+            ClientImporter().run(BytesIO(b''), 'clients.pdf')
+
+    def test_upload_view(self):
+        user = User.objects.create_user('importer', password='pass')
+        self.client.force_login(user)
+        template = self.client.get(reverse('core:data_import'), {'template': 'clients'})
+        self.assertIn(b'national_id', template.content)
+
+        upload = SimpleUploadedFile('clients.csv', self.csv_file([
+            ['name', 'phone', 'national_id', 'address'],
+            ['Hala', '+201000000000', 'C-1', 'Giza'],
+            ['Omar', '+201000000001', 'C-1', 'Giza'],
+        ]).getvalue(), content_type='text/csv')
+        response = self.client.post(reverse('core:data_import'), {'kind': 'clients', 'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertContains(response, 'is repeated earlier in the file')
+        self.assertTrue(Client.objects.filter(national_id='C-1', name='Hala').exists())
+
+
+class ListExportTests(TestCase):
+    """Streaming CSV/XLSX downloads of the filtered list views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pass')
+        owner = create_owner('OWN-1', name='=HYPERLINK("x")')
+        for index in range(3):
+            create_property(
+                f'EXP-{index}', owner, title=f'Flat {index}', address='Nile St',
+                city='Cairo' if index else 'Giza', status='rented' if index else 'available',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv_follows_list_filters(self):
+        response = self.client.get(reverse('properties:list'), {'city': 'Cairo', 'export': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="properties_', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertTrue(lines[0].startswith('\ufeffCode,Title'))
+        self.assertEqual(len(lines), 3)
+        # Choice labels instead of stored values, formulas neutralised
+        self.assertIn(',Rented,', lines[1])
+        self.assertIn('"\'=HYPERLINK(""x"")"', lines[1])
+
+        log = AuditLog.objects.get(action='export')
+        self.assertEqual(log.changes, {'format': 'csv', 'filters': {'city': 'Cairo'}})
+
+    def test_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('owners:list'), {'export': 'xlsx'})
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        sheet = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0][0], 'Name')
+        self.assertEqual(rows[1][0], '\'=HYPERLINK("x")')
+        # Annotated portfolio metrics are exported too
+        self.assertEqual(rows[1][rows[0].index('Properties')], 3)
+
+    def test_every_list_exports(self):
+        for name in ('contracts:list', 'clients:list', 'maintenance:list', 'financial:journal_entry_list',
+                     'financial:invoice_list', 'financial:payment_list', 'sales:contract_list',
+                     'sales:payment_list', 'sales:buyer_list'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name), {'export': 'csv'})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(b''.join(response.streaming_content).startswith('\ufeff'.encode('utf-8')))
+
+
+class PdfDocumentTests(TestCase):
+    """Content-addressed PDF documents with Arabic shaping"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('printer', password='pass')
+        owner = create_owner('OWN-D', name='سامح حسن')
+        cls.property = create_property(
+            'DOC-1', owner, title='شقة المعادي', address='Street 9', market_value=Decimal('900000'),
+        )
+        tenant = create_client('CLI-D', name='أحمد علي')
+        cls.contract = Contract.objects.create(
+            contract_number='RC-1', property=cls.property, client=tenant, start_date=date(2026, 9, 1),
+            end_date=date(2027, 8, 31), rent_amount=Decimal('12500.00'), terms_and_conditions='يدفع الإيجار مقدما',
+        )
+        cls.invoice = Invoice.objects.create(
+            invoice_number='INV-D1', invoice_type='rent', invoice_date=date(2026, 9, 1), due_date=date(2026, 9, 10),
+            property=cls.property, contract=cls.contract, subtotal=Decimal('12500.00'),
+            total_amount=Decimal('12500.00'),
+        )
+        InvoiceItem.objects.create(invoice=cls.invoice, description='إيجار سبتمبر', unit_price=Decimal('12500.00'),
+                                   total=Decimal('12500.00'))
+        buyer = Buyer.objects.create(name='Buyer', phone='+201200000000', national_id='B-D', address='Road',
+                                     city='Cairo')
+        sale = SalesContract.objects.create(
+            contract_number='SC-D', property=cls.property, buyer=buyer, seller=owner, sale_price=Decimal('900000'),
+            down_payment=Decimal('180000'), contract_date=date(2026, 9, 1), expected_handover_date=date(2027, 9, 1),
+        )
+        cls.sales_payment = SalesPayment.objects.create(
+            sales_contract=sale, payment_type='down_payment', amount=Decimal('180000'), payment_date=date(2026, 9, 1),
+            payment_method='cash', reference_number='REF-1', receipt_number='RCPT-D1', received_by=cls.user,
+        )
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(PDF_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache_dir = cache_dir
+        self.client.force_login(self.user)
+
+    def test_arabic_shaping_and_order(self):
+        # Initial, lam-alef ligature (final), isolated
+        self.assertEqual(arabic.shape('سلام'), 'ﺳﻼﻡ')
+        # Right-to-left line: runs reversed, numbers kept left to right, brackets mirrored
+        self.assertEqual(arabic.visual('عقد 12 (شقة)', rtl=True), '(ةقش) 12 دقع')
+        self.assertEqual(arabic.visual('Invoice for علي'), 'Invoice for يلع')
+        self.assertEqual(arabic.display('Invoice 7'), 'Invoice 7')
+        # Arabic-Indic digits stay left to right
+        self.assertEqual(arabic.display('١٢٣ شارع', True), 'ﻉﺭﺎﺷ ١٢٣')
+        self.assertEqual(arabic.visual('هوية ۱۲۳۴'), '۱۲۳۴ ةيوه')
+
+    def test_documents_are_cached_by_content(self):
+        url = reverse('financial:invoice_pdf', args=[self.invoice.pk])
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        etag = response['ETag']
+        self.assertEqual(len(list(Path(self.cache_dir).glob('*/*.pdf'))), 1)
+
+        with mock.patch.object(PdfService, 'render', wraps=PdfService.render) as render:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(url)['ETag'], etag)
+            render.assert_not_called()
+
+            Invoice.objects.filter(pk=self.invoice.pk).update(paid_amount=Decimal('500.00'))
+            self.assertNotEqual(self.client.get(url)['ETag'], etag)
+            render.assert_called_once()
+
+    def test_every_document_renders(self):
+        for name, pk in [('financial:invoice_pdf', self.invoice.pk), ('contracts:pdf', self.contract.pk),
+                         ('sales:payment_receipt', self.sales_payment.pk)]:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=[pk]), {'download': '1'})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('attachment', response['Content-Disposition'])
+
+        with translation.override('ar'):
+            payload = ContractDocumentService.contract(self.contract)
+        self.assertTrue(payload['rtl'])
+        self.assertTrue(PdfService.render(payload).startswith(b'%PDF'))
+
+    def test_arabic_needs_an_arabic_font(self):
+        self.assertTrue(all(os.path.exists(path) for path in pdf._font_files().values()))
+        with translation.override('ar'):
+            payload = ContractDocumentService.contract(self.contract)
+        with mock.patch.object(pdf, '_fonts_registered', None), \
+                override_settings(PDF_FONTS={'regular': ['/missing/font.ttf'], 'bold': []}):
+            with self.assertLogs('apps.core.pdf', 'ERROR'), self.assertRaises(ImproperlyConfigured):
+                PdfService.render(payload)
+
+    def test_month_batch_renders_in_workers(self):
+        Invoice.objects.create(invoice_number='INV-D2', invoice_type='rent', invoice_date=date(2026, 9, 2),
+                               due_date=date(2026, 9, 12), total_amount=Decimal('100.00'))
+        Invoice.objects.create(invoice_number='INV-D3', invoice_type='rent', invoice_date=date(2026, 10, 1),
+                               due_date=date(2026, 10, 10))
+        payloads = [FinancialDocumentService.invoice(invoice)
+                    for invoice in FinancialDocumentService.invoices_for_month(2026, 9)]
+        self.assertEqual(len(payloads), 2)
+
+        results = PdfService.render_many(payloads, workers=2)
+        self.assertEqual([created for _path, created in results], [True, True])
+        self.assertTrue(all(path.read_bytes().startswith(b'%PDF') for path, _created in results))
+        self.assertEqual([created for _path, created in PdfService.render_many(payloads, workers=2)], [False, False])
+
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output, ignore_errors=True)
+        call_command('render_documents', month='2026-09', workers=1, output=output, stdout=StringIO())
+        self.assertEqual(sorted(os.listdir(output)), ['INV-D1.pdf', 'INV-D2.pdf'])
@@ -15,13 +15,19 @@ urlpatterns = [
     # Dashboard
     path('', views.dashboard, name='dashboard'),
     
+    # Bulk import
+    path('import/', views.data_import, name='data_import'),
+    
     # Notification URLs
     path('notifications/', views.notification_list, name='notification_list'),
     path('notifications/<int:pk>/read/', views.notification_mark_as_read, name='notification_mark_as_read'),
     path('notifications/mark-all-read/', views.notification_mark_all_as_read, name='notification_mark_all_as_read'),
+    path('notifications/bulk/<str:action>/', views.notification_bulk_action, name='notification_bulk_action'),
     path('notifications/<int:pk>/delete/', views.notification_delete, name='notification_delete'),
     
     # AJAX endpoints
+    path('api/dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
     path('api/notifications/count/', views.notification_unread_count, name='notification_unread_count'),
+    path('api/notifications/stream/', views.notification_stream, name='notification_stream'),
     path('api/notifications/recent/', views.notification_recent, name='notification_recent'),
 ]
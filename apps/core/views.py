@@ -1,15 +1,25 @@
 """
 Views for Core app - Notifications & Dashboard
 """
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+from .forms import DataImportForm
+from .imports import IMPORTERS, ImportFileError
 from .models import Notification
 from .services import NotificationService
+from .dashboard import DashboardStats, DashboardStatsService
+from .snapshots import DashboardSnapshotService
 
 
 @login_required
@@ -17,115 +27,21 @@ def dashboard(request):
     """
     Modern Professional Dashboard with Real Data
     """
-    from apps.properties.models import Property
-    from apps.contracts.models import Contract, ContractPayment
+    from apps.contracts.models import Contract
     from apps.maintenance.models import MaintenanceRequest
-    from apps.sales.models import SalesContract, PropertyReservation, SalesPayment
-    from apps.clients.models import Client
-    from apps.owners.models import Owner
     from apps.financial.models import Payment, Invoice
-    from django.db.models import Count, Sum, Q, Avg
-    from decimal import Decimal
     import json
     
-    # Date ranges
     today = timezone.now().date()
-    first_day_month = today.replace(day=1)
-    last_30_days = today - timedelta(days=30)
-    last_7_days = today - timedelta(days=7)
-    
-    # ============ PROPERTIES STATISTICS ============
-    properties_qs = Property.objects.all()
-    total_properties = properties_qs.count()
-    available_properties = properties_qs.filter(status='available').count()
-    rented_properties = properties_qs.filter(status='rented').count()
-    under_maintenance = properties_qs.filter(status='maintenance').count()
-    sold_properties = properties_qs.filter(is_for_sale=True).count()
-    
-    # Properties by type
-    property_types_data = properties_qs.values('property_type__name').annotate(
-        count=Count('id')
-    ).order_by('-count')[:6]
-    
-    # Properties by city
-    properties_by_city = properties_qs.values('city').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
-    
-    # ============ CONTRACTS STATISTICS ============
-    contracts_qs = Contract.objects.all()
-    total_contracts = contracts_qs.count()
-    active_contracts = contracts_qs.filter(status='active').count()
-    expired_contracts = contracts_qs.filter(status='expired').count()
-    expiring_soon = contracts_qs.filter(
-        status='active',
-        end_date__lte=today + timedelta(days=30),
-        end_date__gte=today
-    ).count()
-    
-    # Contracts created this month
-    new_contracts_month = contracts_qs.filter(
-        created_at__gte=first_day_month
-    ).count()
-    
-    # ============ FINANCIAL STATISTICS ============
-    # Payments this month (all payments with invoices)
-    payments_month = Payment.objects.filter(
-        payment_date__gte=first_day_month,
-        invoice__isnull=False
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    
-    # Total revenue (all time)
-    total_revenue = Payment.objects.filter(
-        invoice__isnull=False
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    
-    # Invoices pending payment
-    pending_invoices = Invoice.objects.filter(
-        status='issued'
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-    
-    # Sales revenue (using contract payments)
-    sales_revenue = SalesPayment.objects.filter(
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    
-    # ============ MAINTENANCE STATISTICS ============
-    maintenance_qs = MaintenanceRequest.objects.all()
-    total_maintenance = maintenance_qs.count()
-    pending_maintenance = maintenance_qs.filter(status='pending').count()
-    in_progress_maintenance = maintenance_qs.filter(status='in_progress').count()
-    completed_maintenance = maintenance_qs.filter(status='completed').count()
-    urgent_maintenance = maintenance_qs.filter(priority='urgent', status__in=['pending', 'in_progress']).count()
-    
-    # Maintenance costs this month
-    maintenance_costs = maintenance_qs.filter(
-        request_date__gte=first_day_month,
-        estimated_cost__isnull=False
-    ).aggregate(total=Sum('estimated_cost'))['total'] or Decimal('0')
-    
-    # ============ CLIENTS & OWNERS ============
-    total_clients = Client.objects.filter(is_active=True).count()
-    total_owners = Owner.objects.filter(is_active=True).count()
-    new_clients_month = Client.objects.filter(created_at__gte=first_day_month).count()
-    
-    # ============ SALES STATISTICS ============
-    sales_qs = SalesContract.objects.all()
-    total_sales = sales_qs.count()
-    active_sales = sales_qs.filter(status='active').count()
-    completed_sales = sales_qs.filter(status='completed').count()
-    
-    reservations_qs = PropertyReservation.objects.all()
-    pending_reservations = reservations_qs.filter(status='pending').count()
-    approved_reservations = reservations_qs.filter(status='approved').count()
+    stats, refreshed_at = _dashboard_stats(request)
     
     # ============ RECENT ACTIVITIES ============
-    recent_contracts = contracts_qs.select_related('property', 'client').order_by('-created_at')[:6]
-    recent_maintenance = maintenance_qs.select_related('property').order_by('-request_date')[:6]
+    recent_contracts = Contract.objects.select_related('property', 'client').order_by('-created_at')[:6]
+    recent_maintenance = MaintenanceRequest.objects.select_related('property').order_by('-request_date')[:6]
     recent_payments = Payment.objects.select_related('invoice').order_by('-payment_date')[:6]
     
     # ============ ALERTS & WARNINGS ============
-    contracts_expiring_7days = contracts_qs.filter(
+    contracts_expiring_7days = Contract.objects.filter(
         status='active',
         end_date__lte=today + timedelta(days=7),
         end_date__gte=today
@@ -137,97 +53,13 @@ def dashboard(request):
         invoice_date__lt=today - timedelta(days=30)
     )[:5]
     
-    # ============ CHART DATA ============
-    # Properties by Type (Pie Chart)
-    chart_property_types_labels = [item['property_type__name'] or 'Other' for item in property_types_data]
-    chart_property_types_data = [item['count'] for item in property_types_data]
-    
-    # Properties by City (Bar Chart)
-    chart_cities_labels = [item['city'] or 'Unknown' for item in properties_by_city]
-    chart_cities_data = [item['count'] for item in properties_by_city]
-    
-    # Contracts Status (Doughnut Chart)
-    chart_contracts_labels = ['Active', 'Expired', 'Terminated']
-    chart_contracts_data = [
-        active_contracts,
-        expired_contracts,
-        contracts_qs.filter(status='terminated').count()
-    ]
-    
-    # Monthly Revenue Trend (Line Chart - Last 6 months)
-    revenue_trend_labels = []
-    revenue_trend_data = []
-    for i in range(5, -1, -1):
-        month_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        month_revenue = Payment.objects.filter(
-            payment_date__gte=month_start,
-            payment_date__lte=month_end,
-            invoice__isnull=False
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        revenue_trend_labels.append(month_start.strftime('%b %Y'))
-        revenue_trend_data.append(float(month_revenue))
-    
-    # ============ PERFORMANCE METRICS ============
-    occupancy_rate = (rented_properties / total_properties * 100) if total_properties > 0 else 0
-    
-    # Calculate average contract duration (in months) from start_date and end_date
-    from django.db.models import F, ExpressionWrapper, fields
-    active_contracts_with_duration = contracts_qs.filter(
-        status='active',
-        start_date__isnull=False,
-        end_date__isnull=False
-    )
-    
-    if active_contracts_with_duration.exists():
-        # Calculate duration for each contract and average
-        durations = []
-        for contract in active_contracts_with_duration:
-            duration_days = (contract.end_date - contract.start_date).days
-            duration_months = duration_days / 30.0  # Approximate months
-            durations.append(duration_months)
-        avg_contract_duration = sum(durations) / len(durations) if durations else 0
-    else:
-        avg_contract_duration = 0
-    
     context = {
         # Main Statistics
-        'total_properties': total_properties,
-        'available_properties': available_properties,
-        'rented_properties': rented_properties,
-        'under_maintenance': under_maintenance,
-        'sold_properties': sold_properties,
-        'occupancy_rate': round(occupancy_rate, 1),
-        
-        'total_contracts': total_contracts,
-        'active_contracts': active_contracts,
-        'expired_contracts': expired_contracts,
-        'expiring_soon': expiring_soon,
-        'new_contracts_month': new_contracts_month,
-        'avg_contract_duration': round(avg_contract_duration or 0, 1),
-        
-        'total_maintenance': total_maintenance,
-        'pending_maintenance': pending_maintenance,
-        'in_progress_maintenance': in_progress_maintenance,
-        'completed_maintenance': completed_maintenance,
-        'urgent_maintenance': urgent_maintenance,
-        'maintenance_costs': maintenance_costs,
-        
-        'total_clients': total_clients,
-        'total_owners': total_owners,
-        'new_clients_month': new_clients_month,
-        
-        'total_sales': total_sales,
-        'active_sales': active_sales,
-        'completed_sales': completed_sales,
-        'pending_reservations': pending_reservations,
-        'approved_reservations': approved_reservations,
-        
-        # Financial
-        'total_revenue': total_revenue,
-        'payments_month': payments_month,
-        'pending_payments': pending_invoices,
-        'sales_revenue': sales_revenue,
+        **stats.as_dict(),
+        'stats': stats,
+        'today': today,
+        'refreshed_at': refreshed_at,
+        'is_live': refreshed_at is None,
         
         # Recent Activities
         'recent_contracts': recent_contracts,
@@ -239,22 +71,44 @@ def dashboard(request):
         'overdue_invoices': overdue_invoices,
         
         # Notifications
-        'unread_notifications': Notification.objects.filter(user=request.user, is_read=False).count(),
+        'unread_notifications': NotificationService.get_unread_count(request.user),
         
         # Chart Data (JSON)
-        'chart_property_types_labels': json.dumps(chart_property_types_labels),
-        'chart_property_types_data': json.dumps(chart_property_types_data),
-        'chart_cities_labels': json.dumps(chart_cities_labels),
-        'chart_cities_data': json.dumps(chart_cities_data),
-        'chart_contracts_labels': json.dumps(chart_contracts_labels),
-        'chart_contracts_data': json.dumps(chart_contracts_data),
-        'revenue_trend_labels': json.dumps(revenue_trend_labels),
-        'revenue_trend_data': json.dumps(revenue_trend_data),
+        'chart_property_types_labels': json.dumps(stats.property_types_labels),
+        'chart_property_types_data': json.dumps(stats.property_types_data),
+        'chart_cities_labels': json.dumps(stats.cities_labels),
+        'chart_cities_data': json.dumps(stats.cities_data),
+        'chart_contracts_labels': json.dumps(stats.contracts_labels),
+        'chart_contracts_data': json.dumps(stats.contracts_data),
+        'revenue_trend_labels': json.dumps(stats.revenue_trend_labels),
+        'revenue_trend_data': json.dumps(stats.revenue_trend_data),
     }
     
     return render(request, 'dashboard.html', context)
 
 
+@login_required
+def dashboard_stats(request):
+    """
+    Dashboard statistics (AJAX/JSON endpoint)
+    """
+    stats, refreshed_at = _dashboard_stats(request)
+    data = stats.as_dict()
+    data['refreshed_at'] = refreshed_at
+    return JsonResponse(data)
+
+
+def _dashboard_stats(request):
+    """
+    Snapshot-backed dashboard stats; ?live=1 computes fresh numbers.
+    Returns (stats, refreshed_at) where refreshed_at is None for live data.
+    """
+    if request.GET.get('live') == '1':
+        return DashboardStatsService.compute(), None
+    values, refreshed_at = DashboardSnapshotService.read('dashboard')
+    return DashboardStats.from_dict(values), refreshed_at
+
+
 @login_required
 def notification_list(request):
     """
@@ -264,17 +118,12 @@ def notification_list(request):
     filter_type = request.GET.get('type', 'all')
     filter_status = request.GET.get('status', 'all')
     
-    # Base queryset
-    notifications = Notification.objects.filter(user=request.user)
-    
-    # Apply filters
-    if filter_type != 'all':
-        notifications = notifications.filter(notification_type=filter_type)
-    
-    if filter_status == 'unread':
-        notifications = notifications.filter(is_read=False)
-    elif filter_status == 'read':
-        notifications = notifications.filter(is_read=True)
+    # Apply filters (archived notifications only show when asked for)
+    notifications = NotificationService.filter_notifications(
+        request.user, notification_type=filter_type, status=filter_status
+    )
+    if filter_status != 'archived':
+        notifications = notifications.filter(is_archived=False)
     
     # Order by date
     notifications = notifications.order_by('-created_at')
@@ -284,8 +133,12 @@ def notification_list(request):
     page_obj = paginator.get_page(request.GET.get('page'))
     
     # Get statistics
-    total_count = Notification.objects.filter(user=request.user).count()
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    stats = Notification.objects.filter(user=request.user, is_archived=False).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+    )
+    total_count = stats['total']
+    unread_count = stats['unread']
     read_count = total_count - unread_count
     
     context = {
@@ -337,6 +190,42 @@ def notification_mark_all_as_read(request):
     return redirect('core:notification_list')
 
 
+BULK_ACTIONS = {
+    'mark-read': NotificationService.mark_all_as_read,
+    'archive': NotificationService.archive_notifications,
+    'delete': NotificationService.delete_notifications,
+}
+
+
+@login_required
+def notification_bulk_action(request, action):
+    """
+    Mark read, archive or delete many notifications at once.
+    POST ids (optional, repeated) and/or type/status filters.
+    """
+    if request.method != 'POST' or action not in BULK_ACTIONS:
+        return redirect('core:notification_list')
+    
+    ids = request.POST.getlist('ids') or None
+    if ids is not None:
+        ids = [int(pk) for pk in ids if pk.isdigit()]
+    count = BULK_ACTIONS[action](
+        request.user,
+        ids=ids,
+        notification_type=request.POST.get('type'),
+        status=request.POST.get('status'),
+    )
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'success': True,
+            'count': count,
+            'unread_count': NotificationService.get_unread_count(request.user)
+        })
+    
+    return redirect('core:notification_list')
+
+
 @login_required
 def notification_delete(request, pk):
     """
@@ -345,7 +234,7 @@ def notification_delete(request, pk):
     notification = get_object_or_404(Notification, pk=pk, user=request.user)
     
     if request.method == 'POST':
-        notification.delete()
+        NotificationService.delete_notifications(request.user, ids=[notification.pk])
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
@@ -369,6 +258,62 @@ def notification_unread_count(request):
     })
 
 
+# Server-sent events: how long one stream stays open, how often the
+# cached version is checked, and when idle streams send a keep-alive
+STREAM_SECONDS = 55
+STREAM_POLL_SECONDS = 2
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+def _count_event(count):
+    return f"event: count\ndata: {json.dumps({'count': count})}\n\n"
+
+
+async def notification_stream(request):
+    """
+    Push the unread count as server-sent events (served under ASGI).
+    Only the cached version is checked while idle; the count is re-read
+    when it changes. Under WSGI a single event is sent and the browser
+    reconnects after the retry delay instead of holding a worker.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    
+    get_count = sync_to_async(NotificationService.get_unread_count)
+    get_version = sync_to_async(NotificationService.get_unread_version)
+    
+    if not isinstance(request, ASGIRequest):
+        count = await get_count(user)
+        response = HttpResponse(
+            f"retry: 30000\n{_count_event(count)}", content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+    
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_SECONDS
+        last_version = None
+        last_sent = loop.time()
+        yield "retry: 3000\n\n"
+        while loop.time() < deadline:
+            version = await get_version(user.pk)
+            if version != last_version:
+                last_version = version
+                last_sent = loop.time()
+                yield _count_event(await get_count(user))
+            elif loop.time() - last_sent >= STREAM_HEARTBEAT_SECONDS:
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def notification_recent(request):
     """
@@ -394,3 +339,43 @@ def notification_recent(request):
     }
     
     return JsonResponse(data)
+
+
+@login_required
+def data_import(request):
+    """
+    Bulk import owners, clients or properties from Excel/CSV; GET with
+    ?template=<kind> downloads an empty CSV with the accepted headers
+    """
+    template_kind = request.GET.get('template')
+    if template_kind in IMPORTERS:
+        importer = IMPORTERS[template_kind]()
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{template_kind}_import.csv"'
+        response.write('\ufeff' + ','.join(importer.allowed_fields()) + '\r\n')
+        return response
+
+    result = None
+    if request.method == 'POST':
+        form = DataImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            importer = IMPORTERS[form.cleaned_data['kind']](dry_run=form.cleaned_data['dry_run'])
+            try:
+                result = importer.run(upload, upload.name)
+            except ImportFileError as exc:
+                form.add_error('file', str(exc))
+            else:
+                if result.dry_run:
+                    messages.info(request, f'{result.created} rows are valid, {result.failed} rejected.')
+                else:
+                    messages.success(request, f'{result.created} rows imported, {result.failed} rejected.')
+    else:
+        form = DataImportForm(initial={'kind': request.GET.get('kind', 'properties')})
+
+    return render(request, 'core/data_import.html', {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:200] if result else [],
+        'kinds': list(IMPORTERS),
+    })
@@ -4,7 +4,7 @@ Admin configuration for Financial app
 from django.contrib import admin
 from .models import (
     Account, FinancialPeriod, JournalEntry, JournalEntryLine,
-    Invoice, InvoiceItem, Payment, Budget
+    Invoice, InvoiceItem, Payment, Budget, AccountBalance, PropertyPnL
 )
 
 
@@ -45,6 +45,30 @@ class AccountAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(AccountBalance)
+class AccountBalanceAdmin(admin.ModelAdmin):
+    list_display = ['account', 'period', 'debit_total', 'credit_total', 'updated_at']
+    list_filter = ['period', 'account__account_type']
+    search_fields = ['account__code', 'account__name']
+    list_select_related = ['account']
+    readonly_fields = ['account', 'period', 'debit_total', 'credit_total', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(PropertyPnL)
+class PropertyPnLAdmin(admin.ModelAdmin):
+    list_display = ['property', 'period', 'source', 'kind', 'category', 'amount', 'updated_at']
+    list_filter = ['period', 'source', 'kind']
+    search_fields = ['property__code', 'property__title', 'category']
+    list_select_related = ['property']
+    readonly_fields = ['property', 'period', 'source', 'kind', 'category', 'amount', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(FinancialPeriod)
 class FinancialPeriodAdmin(admin.ModelAdmin):
     list_display = ['name', 'start_date', 'end_date', 'is_closed']
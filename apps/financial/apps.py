@@ -5,3 +5,7 @@ class FinancialConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.financial'
     verbose_name = 'Financial Management'
+    
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.financial.signals
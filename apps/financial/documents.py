@@ -0,0 +1,89 @@
+"""
+PDF payloads of invoices and payment vouchers (rendered by apps.core.pdf)
+"""
+from django.utils.translation import gettext as _
+
+from apps.core.pdf import PdfService
+from .models import Invoice, Payment
+
+
+def _counterparty(invoice):
+    """Tenant of the invoiced contract, if any"""
+    if invoice and invoice.contract_id and invoice.contract.client_id:
+        return invoice.contract.client.name
+    return None
+
+
+class FinancialDocumentService:
+    """Invoice and voucher documents"""
+
+    @staticmethod
+    def invoices_for_month(year, month):
+        return Invoice.objects.filter(invoice_date__year=year, invoice_date__month=month).select_related(
+            'property', 'contract__client'
+        ).prefetch_related('items').order_by('invoice_number')
+
+    @staticmethod
+    def payments_for_month(year, month):
+        return Payment.objects.filter(payment_date__year=year, payment_date__month=month).select_related(
+            'invoice__property', 'invoice__contract__client'
+        ).order_by('payment_number')
+
+    @staticmethod
+    def invoice(invoice):
+        """Payload of an invoice with its items"""
+        money = PdfService.money
+        items = PdfService.table(
+            [_('Description'), _('Quantity'), _('Unit Price'), _('Tax Rate %'), _('Discount Rate %'), _('Total')],
+            [
+                [item.description, f'{item.quantity:g}', money(item.unit_price), f'{item.tax_rate:g}',
+                 f'{item.discount_rate:g}', money(item.total)]
+                for item in invoice.items.all()
+            ],
+            widths=[0.34, 0.1, 0.16, 0.1, 0.12, 0.18],
+            numeric=[1, 2, 3, 4, 5],
+        )
+        return PdfService.document(
+            'invoice', invoice.get_invoice_type_display(), invoice.invoice_number,
+            fields=[
+                (_('Invoice Date'), PdfService.date(invoice.invoice_date)),
+                (_('Due Date'), PdfService.date(invoice.due_date)),
+                (_('Status'), invoice.get_status_display()),
+                (_('Client'), _counterparty(invoice)),
+                (_('Contract'), invoice.contract.contract_number if invoice.contract_id else None),
+                (_('Property'), str(invoice.property) if invoice.property_id else None),
+            ],
+            table=items,
+            totals=[
+                (_('Subtotal'), money(invoice.subtotal)),
+                (_('Discount Amount'), money(invoice.discount_amount)),
+                (_('Tax Amount'), money(invoice.tax_amount)),
+                (_('Total Amount'), money(invoice.total_amount)),
+                (_('Paid Amount'), money(invoice.paid_amount)),
+                (_('Balance Due'), money(invoice.get_balance())),
+            ],
+            sections=[
+                (_('Notes'), invoice.notes),
+                (_('Terms and Conditions'), invoice.terms_and_conditions),
+            ],
+        )
+
+    @staticmethod
+    def voucher(payment):
+        """Payload of a receipt or payment voucher"""
+        receipt = payment.payment_type == 'receipt'
+        invoice = payment.invoice
+        return PdfService.document(
+            'voucher', _('Receipt Voucher') if receipt else _('Payment Voucher'), payment.payment_number,
+            fields=[
+                (_('Date'), PdfService.date(payment.payment_date)),
+                (_('Received From') if receipt else _('Paid To'), _counterparty(invoice)),
+                (_('Payment Method'), payment.get_payment_method_display()),
+                (_('Reference Number'), payment.reference_number),
+                (_('Invoice Number'), invoice.invoice_number if invoice else None),
+                (_('Property'), str(invoice.property) if invoice and invoice.property_id else None),
+            ],
+            totals=[(_('Amount'), PdfService.money(payment.amount))],
+            sections=[(_('Notes'), payment.notes)],
+            signatures=[_('Prepared By'), _('Approved By'), _('Received By')],
+        )
@@ -7,6 +7,21 @@ from .models import (
     Account, JournalEntry, JournalEntryLine, Invoice, InvoiceItem,
     Payment, Budget, FinancialPeriod
 )
+from .tree import AccountTreeService
+
+
+class AccountChoiceField(forms.ModelChoiceField):
+    """Account select labelled with the full path from the cached tree"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tree = None
+    
+    def label_from_instance(self, obj):
+        if self._tree is None:
+            self._tree = AccountTreeService.load()
+        node = self._tree.get(obj.pk)
+        return node.label if node is not None else str(obj)
 
 
 class AccountForm(forms.ModelForm):
@@ -19,6 +34,7 @@ class AccountForm(forms.ModelForm):
             'description', 'opening_balance', 'opening_balance_type',
             'is_active'
         ]
+        field_classes = {'parent': AccountChoiceField}
         widgets = {
             'code': forms.TextInput(attrs={'class': 'form-control'}),
             'name': forms.TextInput(attrs={'class': 'form-control'}),
@@ -94,6 +110,7 @@ class JournalEntryLineForm(forms.ModelForm):
     class Meta:
         model = JournalEntryLine
         fields = ['account', 'debit_amount', 'credit_amount', 'description']
+        field_classes = {'account': AccountChoiceField}
         widgets = {
             'account': forms.Select(attrs={'class': 'form-select'}),
             'debit_amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
@@ -219,6 +236,7 @@ class BudgetForm(forms.ModelForm):
     class Meta:
         model = Budget
         fields = ['name', 'period', 'account', 'budgeted_amount', 'property', 'notes']
+        field_classes = {'account': AccountChoiceField}
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'period': forms.Select(attrs={'class': 'form-select'}),
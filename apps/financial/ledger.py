@@ -0,0 +1,147 @@
+"""
+Ledger balance cache for the Financial app
+Keeps AccountBalance (monthly debit/credit totals per account) in step
+with posted journal entry lines.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from .models import AccountBalance, JournalEntryLine
+
+
+def month_bucket(value):
+    """First day of the month of a date"""
+    return value.replace(day=1)
+
+
+class LedgerService:
+    """
+    Maintain and query cached account balances
+    """
+
+    @staticmethod
+    def raw_totals(account_ids=None, periods=None):
+        """
+        Debit/credit totals of posted lines grouped by (account_id, period),
+        computed from the journal lines themselves
+        """
+        lines = JournalEntryLine.objects.filter(journal_entry__is_posted=True)
+        if account_ids is not None:
+            lines = lines.filter(account_id__in=account_ids)
+        if periods is not None:
+            start = min(periods)
+            end = max(periods) + relativedelta(months=1)
+            lines = lines.filter(
+                journal_entry__entry_date__gte=start,
+                journal_entry__entry_date__lt=end,
+            )
+        rows = lines.annotate(
+            period=TruncMonth('journal_entry__entry_date')
+        ).values('account_id', 'period').annotate(
+            debit=Sum('debit_amount'),
+            credit=Sum('credit_amount'),
+        ).order_by()
+        return {
+            (row['account_id'], row['period']): (row['debit'] or Decimal('0.00'), row['credit'] or Decimal('0.00'))
+            for row in rows
+        }
+
+    @staticmethod
+    def refresh_buckets(pairs):
+        """
+        Recompute the given (account_id, period) buckets from raw lines.
+        Idempotent, so it is safe to call for any change touching them.
+        """
+        by_period = defaultdict(set)
+        for account_id, period in pairs:
+            by_period[month_bucket(period)].add(account_id)
+
+        with transaction.atomic():
+            for period, account_ids in by_period.items():
+                totals = LedgerService.raw_totals(account_ids=account_ids, periods=[period])
+                AccountBalance.objects.filter(period=period, account_id__in=account_ids).delete()
+                AccountBalance.objects.bulk_create([
+                    AccountBalance(account_id=account_id, period=period, debit_total=debit, credit_total=credit)
+                    for (account_id, _), (debit, credit) in totals.items()
+                ])
+
+    @staticmethod
+    def refresh_entry(entry, periods=None):
+        """
+        Recompute the buckets touched by a journal entry
+        """
+        account_ids = set(entry.lines.values_list('account_id', flat=True))
+        periods = periods or [entry.entry_date]
+        LedgerService.refresh_buckets(
+            (account_id, period) for account_id in account_ids for period in periods
+        )
+
+    @staticmethod
+    def totals(account_ids=None, start=None, end=None):
+        """
+        Cached (debit, credit) totals per account id in one query.
+        start/end are dates; buckets are whole months.
+        """
+        balances = AccountBalance.objects.all()
+        if account_ids is not None:
+            balances = balances.filter(account_id__in=account_ids)
+        if start is not None:
+            balances = balances.filter(period__gte=month_bucket(start))
+        if end is not None:
+            balances = balances.filter(period__lte=month_bucket(end))
+        rows = balances.values('account_id').annotate(
+            debit=Sum('debit_total'),
+            credit=Sum('credit_total'),
+        ).order_by()
+        return {row['account_id']: (row['debit'], row['credit']) for row in rows}
+
+    @staticmethod
+    def balances(accounts):
+        """
+        Signed balance for each account of an iterable, in one query
+        """
+        accounts = list(accounts)
+        totals = LedgerService.totals(account_ids=[account.pk for account in accounts])
+        return {
+            account.pk: account.balance_from_totals(*totals.get(account.pk, (0, 0)))
+            for account in accounts
+        }
+
+    @staticmethod
+    def drift():
+        """
+        Compare cached buckets with raw lines.
+        Returns a list of (account_id, period, cached, actual) tuples.
+        """
+        zero = (Decimal('0.00'), Decimal('0.00'))
+        actual = LedgerService.raw_totals()
+        cached = {
+            (row.account_id, row.period): (row.debit_total, row.credit_total)
+            for row in AccountBalance.objects.all()
+        }
+        drifted = []
+        for account_id, period in sorted(set(actual) | set(cached)):
+            expected = actual.get((account_id, period), zero)
+            stored = cached.get((account_id, period), zero)
+            if stored != expected:
+                drifted.append((account_id, period, stored, expected))
+        return drifted
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """
+        Recreate every bucket from raw lines. Returns the number of buckets.
+        """
+        totals = LedgerService.raw_totals()
+        AccountBalance.objects.all().delete()
+        AccountBalance.objects.bulk_create([
+            AccountBalance(account_id=account_id, period=period, debit_total=debit, credit_total=credit)
+            for (account_id, period), (debit, credit) in totals.items()
+        ], batch_size=1000)
+        return len(totals)
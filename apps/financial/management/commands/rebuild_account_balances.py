@@ -0,0 +1,43 @@
+"""
+Management command to rebuild or verify the account balance cache
+Usage: python manage.py rebuild_account_balances [--verify]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.financial.ledger import LedgerService
+from apps.financial.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Recompute AccountBalance from posted journal lines and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report drift, do not rewrite the cache',
+        )
+
+    def handle(self, *args, **options):
+        drifted = LedgerService.drift()
+
+        if drifted:
+            codes = dict(Account.objects.values_list('pk', 'code'))
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} drifted balance bucket(s):'))
+            for account_id, period, stored, expected in drifted:
+                self.stdout.write(
+                    f'  {codes.get(account_id, account_id)} {period:%Y-%m}: '
+                    f'cached Dr {stored[0]} / Cr {stored[1]}, '
+                    f'actual Dr {expected[0]} / Cr {expected[1]}'
+                )
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Account balances match journal lines'))
+
+        if options['verify']:
+            if drifted:
+                # Non-zero exit status for monitoring
+                raise SystemExit(1)
+            return
+
+        count = LedgerService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {count} balance bucket(s)'))
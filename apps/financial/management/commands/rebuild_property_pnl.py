@@ -0,0 +1,15 @@
+"""
+Management command to rebuild the property P&L rollup
+Usage: python manage.py rebuild_property_pnl
+"""
+from django.core.management.base import BaseCommand
+
+from apps.financial.pnl import PropertyPnLService
+
+
+class Command(BaseCommand):
+    help = 'Recompute PropertyPnL from property revenues, expenses and posted journal lines'
+
+    def handle(self, *args, **options):
+        count = PropertyPnLService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {count} property P&L row(s)'))
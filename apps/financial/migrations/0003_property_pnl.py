@@ -0,0 +1,77 @@
+# Generated by Django 5.0 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def build_property_pnl(apps, schema_editor):
+    """Populate the rollup from existing revenues, expenses and posted journal lines"""
+    from collections import defaultdict
+    from django.db.models import Sum
+    from django.db.models.functions import TruncMonth
+
+    PropertyPnL = apps.get_model('financial', 'PropertyPnL')
+    JournalEntryLine = apps.get_model('financial', 'JournalEntryLine')
+    amounts = defaultdict(lambda: Decimal('0.00'))
+    for kind, model_name, date_field, type_field in [
+        ('revenue', 'PropertyRevenue', 'revenue_date', 'revenue_type'),
+        ('expense', 'PropertyExpense', 'expense_date', 'expense_type'),
+    ]:
+        rows = apps.get_model('properties', model_name).objects.annotate(
+            period=TruncMonth(date_field)
+        ).values('property_id', 'period', type_field).annotate(total=Sum('amount')).order_by()
+        for row in rows:
+            amounts[(row['property_id'], row['period'], 'records', kind, row[type_field])] += row['total'] or 0
+
+    rows = JournalEntryLine.objects.filter(
+        journal_entry__is_posted=True,
+        journal_entry__property__isnull=False,
+        account__account_type__in=['revenue', 'expense'],
+    ).annotate(
+        period=TruncMonth('journal_entry__entry_date')
+    ).values(
+        'journal_entry__property_id', 'period', 'account__account_type', 'account__code'
+    ).annotate(debit=Sum('debit_amount'), credit=Sum('credit_amount')).order_by()
+    for row in rows:
+        debit, credit = row['debit'] or 0, row['credit'] or 0
+        kind = row['account__account_type']
+        amount = credit - debit if kind == 'revenue' else debit - credit
+        amounts[(row['journal_entry__property_id'], row['period'], 'ledger', kind, row['account__code'])] += amount
+
+    PropertyPnL.objects.bulk_create([
+        PropertyPnL(property_id=property_id, period=period, source=source, kind=kind, category=category, amount=amount)
+        for (property_id, period, source, kind, category), amount in amounts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0002_accountbalance'),
+        ('properties', '0005_property_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyPnL',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the month the totals belong to', verbose_name='Period')),
+                ('source', models.CharField(choices=[('records', 'Property Records'), ('ledger', 'Journal Entries')], max_length=20, verbose_name='Source')),
+                ('kind', models.CharField(choices=[('revenue', 'Revenue'), ('expense', 'Expense')], max_length=20, verbose_name='Kind')),
+                ('category', models.CharField(help_text='Revenue/expense type, or account code for journal entries', max_length=50, verbose_name='Category')),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Amount')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pnl_rollups', to='properties.property', verbose_name='Property')),
+            ],
+            options={
+                'verbose_name': 'Property P&L Rollup',
+                'verbose_name_plural': 'Property P&L Rollups',
+                'ordering': ['property', 'period'],
+                'indexes': [models.Index(fields=['period'], name='financial_p_period_e1c96e_idx')],
+                'unique_together': {('property', 'period', 'source', 'kind', 'category')},
+            },
+        ),
+        migrations.RunPython(build_property_pnl, migrations.RunPython.noop),
+    ]
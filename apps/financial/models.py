@@ -85,17 +85,17 @@ class Account(models.Model):
     
     def get_balance(self):
         """Calculate current account balance"""
-        from django.db.models import Sum, Q
+        from django.db.models import Sum
         
-        # Get all journal entry lines for this account
-        lines = JournalEntryLine.objects.filter(
-            account=self,
-            journal_entry__is_posted=True
+        # Read the cached monthly totals instead of scanning journal lines
+        totals = self.balances.aggregate(
+            debits=Sum('debit_total'),
+            credits=Sum('credit_total')
         )
-        
-        debits = lines.aggregate(total=Sum('debit_amount'))['total'] or 0
-        credits = lines.aggregate(total=Sum('credit_amount'))['total'] or 0
-        
+        return self.balance_from_totals(totals['debits'] or 0, totals['credits'] or 0)
+    
+    def balance_from_totals(self, debits, credits):
+        """Signed balance from debit/credit totals according to account type"""
         if self.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
             return Decimal(debits) - Decimal(credits)
         else:  # LIABILITY, EQUITY, REVENUE
@@ -103,8 +103,11 @@ class Account(models.Model):
     
     def get_full_path(self):
         """Get full account path (e.g., Assets > Current Assets > Cash)"""
-        if self.parent:
-            return f"{self.parent.get_full_path()} > {self.name}"
+        from .tree import AccountTreeService
+        
+        node = AccountTreeService.load().get(self.pk)
+        if node is not None:
+            return node.path
         return self.name
 
 
@@ -219,10 +222,14 @@ class JournalEntry(models.Model):
     def post(self):
         """Post the journal entry"""
         if self.is_balanced() and not self.is_posted:
+            from django.db import transaction
             from django.utils import timezone
-            self.is_posted = True
-            self.posted_at = timezone.now()
-            self.save()
+            # Account balances are refreshed by the post_save signal,
+            # inside the same transaction as the posting itself
+            with transaction.atomic():
+                self.is_posted = True
+                self.posted_at = timezone.now()
+                self.save()
             return True
         return False
 
@@ -266,6 +273,98 @@ class JournalEntryLine(models.Model):
         return f"{self.journal_entry.entry_number} - {self.account.name}"
 
 
+class AccountBalance(models.Model):
+    """
+    Cached monthly debit/credit totals of posted journal lines per account
+    """
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='balances',
+        verbose_name=_('Account')
+    )
+    period = models.DateField(
+        _('Period'),
+        help_text=_('First day of the month the totals belong to')
+    )
+    debit_total = models.DecimalField(
+        _('Debit Total'),
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    credit_total = models.DecimalField(
+        _('Credit Total'),
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Account Balance')
+        verbose_name_plural = _('Account Balances')
+        ordering = ['account', 'period']
+        unique_together = ['account', 'period']
+        indexes = [
+            models.Index(fields=['period']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account.code} - {self.period:%Y-%m}"
+
+
+class PropertyPnL(models.Model):
+    """
+    Monthly revenue/expense rollup per property, source and category
+    """
+    SOURCE_CHOICES = [
+        ('records', _('Property Records')),
+        ('ledger', _('Journal Entries')),
+    ]
+    KIND_CHOICES = [
+        ('revenue', _('Revenue')),
+        ('expense', _('Expense')),
+    ]
+
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='pnl_rollups',
+        verbose_name=_('Property')
+    )
+    period = models.DateField(
+        _('Period'),
+        help_text=_('First day of the month the totals belong to')
+    )
+    source = models.CharField(_('Source'), max_length=20, choices=SOURCE_CHOICES)
+    kind = models.CharField(_('Kind'), max_length=20, choices=KIND_CHOICES)
+    category = models.CharField(
+        _('Category'),
+        max_length=50,
+        help_text=_('Revenue/expense type, or account code for journal entries')
+    )
+    amount = models.DecimalField(
+        _('Amount'),
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Property P&L Rollup')
+        verbose_name_plural = _('Property P&L Rollups')
+        ordering = ['property', 'period']
+        unique_together = ['property', 'period', 'source', 'kind', 'category']
+        indexes = [
+            models.Index(fields=['period']),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} {self.period:%Y-%m} {self.kind}/{self.category}"
+
+
 class Invoice(models.Model):
     """
     Invoice - الفواتير
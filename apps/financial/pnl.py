@@ -0,0 +1,194 @@
+"""
+Property P&L rollup
+PropertyPnL holds monthly revenue/expense totals per property, kept in
+step with PropertyRevenue, PropertyExpense and posted journal lines of
+entries tagged with a property. Portfolio reports read only this table.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils.dateparse import parse_date
+from django.utils.translation import gettext_lazy as _
+
+from apps.properties.financials import PropertyFinancialService
+from .ledger import month_bucket
+from .models import AccountType, JournalEntryLine, PropertyPnL
+
+ZERO = Decimal('0.00')
+
+
+class PropertyPnLService:
+    """
+    Maintain and slice the property P&L rollup
+    """
+
+    # ?group_by= option -> (value fields, label field)
+    GROUPINGS = {
+        'property': (['property_id', 'property__code', 'property__title'], 'property__code'),
+        'owner': (['property__owner_id', 'property__owner__name'], 'property__owner__name'),
+        'city': (['property__city'], 'property__city'),
+        'property_type': (['property__property_type_id', 'property__property_type__name'], 'property__property_type__name'),
+        'period': (['period'], 'period'),
+        'category': (['kind', 'category'], 'category'),
+    }
+    GROUPING_CHOICES = [
+        ('property', _('Property')),
+        ('owner', _('Owner')),
+        ('city', _('City')),
+        ('property_type', _('Property Type')),
+        ('period', _('Month')),
+        ('category', _('Category')),
+    ]
+    DEFAULT_GROUPING = 'property'
+
+    @staticmethod
+    def raw_amounts(property_ids=None, start=None, end=None):
+        """
+        {(property_id, period, source, kind, category): amount} from the
+        source rows, in three grouped queries. end is exclusive.
+        """
+        amounts = defaultdict(lambda: ZERO)
+        for kind in ('revenue', 'expense'):
+            for property_id, year, month, category, amount in PropertyFinancialService.grouped_rows(
+                kind, property_ids, start, end
+            ):
+                amounts[(property_id, date(year, month, 1), 'records', kind, category)] += amount or ZERO
+
+        lines = JournalEntryLine.objects.filter(
+            journal_entry__is_posted=True,
+            journal_entry__property__isnull=False,
+            account__account_type__in=[AccountType.REVENUE, AccountType.EXPENSE],
+        )
+        if property_ids is not None:
+            lines = lines.filter(journal_entry__property_id__in=property_ids)
+        if start is not None:
+            lines = lines.filter(journal_entry__entry_date__gte=start)
+        if end is not None:
+            lines = lines.filter(journal_entry__entry_date__lt=end)
+        rows = lines.annotate(
+            period=TruncMonth('journal_entry__entry_date')
+        ).values(
+            'journal_entry__property_id', 'period', 'account__account_type', 'account__code'
+        ).annotate(
+            debit=Sum('debit_amount'),
+            credit=Sum('credit_amount'),
+        ).order_by()
+        for row in rows:
+            debit, credit = row['debit'] or ZERO, row['credit'] or ZERO
+            if row['account__account_type'] == AccountType.REVENUE:
+                kind, amount = 'revenue', credit - debit
+            else:
+                kind, amount = 'expense', debit - credit
+            key = (row['journal_entry__property_id'], row['period'], 'ledger', kind, row['account__code'])
+            amounts[key] += amount
+        return amounts
+
+    @staticmethod
+    def _rows(amounts):
+        return [
+            PropertyPnL(
+                property_id=property_id, period=period, source=source,
+                kind=kind, category=category, amount=amount,
+            )
+            for (property_id, period, source, kind, category), amount in amounts.items()
+        ]
+
+    @staticmethod
+    def refresh_buckets(pairs):
+        """
+        Recompute the given (property_id, date) buckets. Idempotent.
+        """
+        by_period = defaultdict(set)
+        for property_id, day in pairs:
+            if property_id and day:
+                by_period[month_bucket(day)].add(property_id)
+
+        with transaction.atomic():
+            for period, property_ids in by_period.items():
+                amounts = PropertyPnLService.raw_amounts(
+                    property_ids, start=period, end=period + relativedelta(months=1)
+                )
+                PropertyPnL.objects.filter(period=period, property_id__in=property_ids).delete()
+                PropertyPnL.objects.bulk_create(PropertyPnLService._rows(amounts))
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """
+        Recreate the whole rollup. Returns the number of rows.
+        """
+        PropertyPnL.objects.all().delete()
+        rows = PropertyPnLService._rows(PropertyPnLService.raw_amounts())
+        PropertyPnL.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def parse_filters(params):
+        """
+        Slice options from request parameters
+        """
+        def get_id(name):
+            value = params.get(name) or ''
+            return int(value) if value.isdigit() else None
+
+        def get_date(name):
+            try:
+                return parse_date(params.get(name) or '')
+            except ValueError:
+                return None
+
+        group_by = params.get('group_by')
+        source = params.get('source')
+        return {
+            'group_by': group_by if group_by in PropertyPnLService.GROUPINGS else PropertyPnLService.DEFAULT_GROUPING,
+            'owner': get_id('owner'),
+            'property_type': get_id('property_type'),
+            'city': (params.get('city') or '').strip() or None,
+            'start': get_date('from_date'),
+            'end': get_date('to_date'),
+            'source': source if source in dict(PropertyPnL.SOURCE_CHOICES) else None,
+        }
+
+    @staticmethod
+    def slice(group_by=DEFAULT_GROUPING, owner=None, property_type=None, city=None,
+              start=None, end=None, source=None):
+        """
+        Revenue, expense and net per group in one query, plus grand totals.
+        start/end are dates; buckets are whole months.
+        """
+        rollups = PropertyPnL.objects.all()
+        if owner:
+            rollups = rollups.filter(property__owner_id=owner)
+        if property_type:
+            rollups = rollups.filter(property__property_type_id=property_type)
+        if city:
+            rollups = rollups.filter(property__city__iexact=city)
+        if start:
+            rollups = rollups.filter(period__gte=month_bucket(start))
+        if end:
+            rollups = rollups.filter(period__lte=month_bucket(end))
+        if source:
+            rollups = rollups.filter(source=source)
+
+        fields, label = PropertyPnLService.GROUPINGS[group_by]
+        zero = Value(ZERO, output_field=DecimalField(max_digits=15, decimal_places=2))
+        rows = list(rollups.values(*fields).annotate(
+            revenue=Coalesce(Sum('amount', filter=Q(kind='revenue')), zero),
+            expense=Coalesce(Sum('amount', filter=Q(kind='expense')), zero),
+        ).order_by(*fields))
+
+        totals = {'revenue': ZERO, 'expense': ZERO}
+        for row in rows:
+            row['label'] = row[label]
+            row['net'] = row['revenue'] - row['expense']
+            totals['revenue'] += row['revenue']
+            totals['expense'] += row['expense']
+        totals['net'] = totals['revenue'] - totals['expense']
+        if group_by != 'period':
+            rows.sort(key=lambda row: row['net'], reverse=True)
+        return {'group_by': group_by, 'rows': rows, 'totals': totals}
@@ -0,0 +1,208 @@
+"""
+Financial statements for the Financial app
+Each statement is built from one grouped query of debit/credit totals
+per account, then grouped by AccountType and rolled up the cached
+account tree in memory.
+"""
+import calendar
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import AccountType, JournalEntryLine
+from .ledger import LedgerService
+from .tree import AccountTreeService
+
+ZERO = Decimal('0.00')
+
+
+class StatementLine:
+    """
+    One account on a statement, with its own and rolled-up totals
+    """
+
+    def __init__(self, account, depth=0):
+        self.account = account
+        self.depth = depth
+        self.own_debit = ZERO
+        self.own_credit = ZERO
+        self.debit = ZERO
+        self.credit = ZERO
+        self.children = []
+
+    def __getattr__(self, name):
+        # code, name, path, account_type, get_account_type_display, ...
+        return getattr(self.account, name)
+
+    @property
+    def balance(self):
+        """Rolled-up balance, signed by the account's normal side"""
+        return self.account.balance_from_totals(self.debit, self.credit)
+
+    @property
+    def own_balance(self):
+        return self.account.balance_from_totals(self.own_debit, self.own_credit)
+
+    @property
+    def net_debit(self):
+        """Own debit minus credit (trial balance orientation)"""
+        return self.own_debit - self.own_credit
+
+    @property
+    def indent(self):
+        """Left padding in rem for nested rows"""
+        return 1.5 + self.depth * 1.5
+
+
+def _is_month_aligned(start, end):
+    if start is not None and start.day != 1:
+        return False
+    if end is not None and end.day != calendar.monthrange(end.year, end.month)[1]:
+        return False
+    return True
+
+
+class FinancialStatementService:
+    """
+    Trial balance, profit & loss and balance sheet
+    """
+
+    @staticmethod
+    def account_totals(start=None, end=None, property_id=None):
+        """
+        {account_id: (debit, credit)} of posted lines in one query.
+        Whole-month ranges read the AccountBalance cache, anything
+        else groups the journal lines directly.
+        """
+        if property_id is None and _is_month_aligned(start, end):
+            return LedgerService.totals(start=start, end=end)
+
+        lines = JournalEntryLine.objects.filter(journal_entry__is_posted=True)
+        if start is not None:
+            lines = lines.filter(journal_entry__entry_date__gte=start)
+        if end is not None:
+            lines = lines.filter(journal_entry__entry_date__lte=end)
+        if property_id is not None:
+            lines = lines.filter(journal_entry__property_id=property_id)
+        rows = lines.values('account').annotate(
+            debit=Sum('debit_amount'),
+            credit=Sum('credit_amount'),
+        ).order_by()
+        return {row['account']: (row['debit'] or ZERO, row['credit'] or ZERO) for row in rows}
+
+    @staticmethod
+    def build_lines(account_types, totals, accounts=None):
+        """
+        Statement lines per account type, in tree order (parents before
+        children, siblings by code). Parent totals include their children
+        of the same type.
+        """
+        if accounts is None:
+            accounts = AccountTreeService.load().filter(account_types)
+
+        lines = {account.pk: StatementLine(account) for account in accounts}
+        roots = defaultdict(list)
+        for line in lines.values():
+            debit, credit = totals.get(line.account.pk, (ZERO, ZERO))
+            line.own_debit = line.debit = Decimal(debit)
+            line.own_credit = line.credit = Decimal(credit)
+            parent = lines.get(line.account.parent_id)
+            if parent is not None and parent.account.account_type == line.account.account_type:
+                parent.children.append(line)
+            else:
+                roots[line.account.account_type].append(line)
+
+        def roll_up(line, depth):
+            line.depth = depth
+            for child in line.children:
+                roll_up(child, depth + 1)
+                line.debit += child.debit
+                line.credit += child.credit
+
+        def flatten(line, output):
+            output.append(line)
+            for child in sorted(line.children, key=lambda item: item.account.code):
+                flatten(child, output)
+
+        grouped = {}
+        for account_type in account_types:
+            ordered = []
+            for root in sorted(roots[account_type], key=lambda item: item.account.code):
+                roll_up(root, 0)
+                flatten(root, ordered)
+            grouped[account_type] = ordered
+        return grouped
+
+    @staticmethod
+    def _section(lines):
+        """Non-zero lines and the section total (own balances, no double counting)"""
+        visible = [line for line in lines if line.debit or line.credit]
+        total = sum((line.own_balance for line in lines), ZERO)
+        return visible, total
+
+    @staticmethod
+    def trial_balance(as_of=None, account_type=None, property_id=None):
+        """
+        Own debit/credit position of every active account
+        """
+        account_types = [account_type] if account_type else list(AccountType.values)
+        totals = FinancialStatementService.account_totals(end=as_of, property_id=property_id)
+        accounts = AccountTreeService.load().filter(account_types, is_active=True)
+        grouped = FinancialStatementService.build_lines(account_types, totals, accounts)
+
+        lines = sorted(
+            (line for section in grouped.values() for line in section if line.net_debit != 0),
+            key=lambda line: line.account.code,
+        )
+        total_debit = sum((line.net_debit for line in lines if line.net_debit > 0), ZERO)
+        total_credit = sum((-line.net_debit for line in lines if line.net_debit < 0), ZERO)
+        return {
+            'lines': lines,
+            'total_debit': total_debit,
+            'total_credit': total_credit,
+            'difference': total_debit - total_credit,
+        }
+
+    @staticmethod
+    def profit_loss(start, end, property_id=None):
+        """
+        Revenue and expenses over a date range
+        """
+        account_types = [AccountType.REVENUE, AccountType.EXPENSE]
+        totals = FinancialStatementService.account_totals(start, end, property_id)
+        grouped = FinancialStatementService.build_lines(account_types, totals)
+
+        revenue_lines, total_revenue = FinancialStatementService._section(grouped[AccountType.REVENUE])
+        expense_lines, total_expenses = FinancialStatementService._section(grouped[AccountType.EXPENSE])
+        return {
+            'revenue_lines': revenue_lines,
+            'expense_lines': expense_lines,
+            'total_revenue': total_revenue,
+            'total_expenses': total_expenses,
+            'net_income': total_revenue - total_expenses,
+        }
+
+    @staticmethod
+    def balance_sheet(as_of=None, property_id=None):
+        """
+        Assets, liabilities and equity as of a date (all posted entries by default)
+        """
+        account_types = [AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]
+        totals = FinancialStatementService.account_totals(end=as_of, property_id=property_id)
+        grouped = FinancialStatementService.build_lines(account_types, totals)
+
+        asset_lines, total_assets = FinancialStatementService._section(grouped[AccountType.ASSET])
+        liability_lines, total_liabilities = FinancialStatementService._section(grouped[AccountType.LIABILITY])
+        equity_lines, total_equity = FinancialStatementService._section(grouped[AccountType.EQUITY])
+        total_liabilities_equity = total_liabilities + total_equity
+        return {
+            'asset_lines': asset_lines,
+            'liability_lines': liability_lines,
+            'equity_lines': equity_lines,
+            'total_assets': total_assets,
+            'total_liabilities': total_liabilities,
+            'total_equity': total_equity,
+            'total_liabilities_equity': total_liabilities_equity,
+            'is_balanced': total_assets == total_liabilities_equity,
+        }
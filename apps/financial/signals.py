@@ -0,0 +1,167 @@
+"""
+Signals for Financial module - Ledger balance cache, P&L rollup and account tree
+Keep AccountBalance and PropertyPnL in step with posted journal entries,
+their lines and property revenue/expense records, and drop the cached
+chart of accounts when an account changes
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.properties.models import PropertyExpense, PropertyRevenue
+from .ledger import LedgerService
+from .models import Account, JournalEntry, JournalEntryLine
+from .pnl import PropertyPnLService
+from .tree import AccountTreeService
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account_tree(sender, instance, **kwargs):
+    """
+    Rebuild the cached chart of accounts on next use
+    """
+    AccountTreeService.invalidate()
+
+
+@receiver(pre_save, sender=JournalEntry)
+def remember_journal_entry_state(sender, instance, raw=False, **kwargs):
+    """
+    Remember posting state and date before save to detect moves
+    """
+    instance._ledger_previous = None
+    if instance.pk and not raw:
+        instance._ledger_previous = JournalEntry.objects.filter(
+            pk=instance.pk
+        ).values('is_posted', 'entry_date', 'property_id').first()
+
+
+@receiver(post_save, sender=JournalEntry)
+def refresh_balances_for_journal_entry(sender, instance, created, raw=False, **kwargs):
+    """
+    Refresh balances when an entry is posted, unposted or re-dated
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_ledger_previous', None) or {'is_posted': False, 'entry_date': None}
+    was_posted = previous['is_posted']
+    if not (was_posted or instance.is_posted):
+        return
+    if was_posted == instance.is_posted and previous['entry_date'] == instance.entry_date:
+        return
+    periods = {instance.entry_date}
+    if previous['entry_date']:
+        periods.add(previous['entry_date'])
+    LedgerService.refresh_entry(instance, periods=periods)
+
+
+@receiver(pre_save, sender=JournalEntryLine)
+def remember_journal_line_bucket(sender, instance, raw=False, **kwargs):
+    """
+    Remember the previous account and entry so moving a line refreshes both buckets
+    """
+    instance._ledger_previous_line = None
+    if instance.pk and not raw:
+        instance._ledger_previous_line = JournalEntryLine.objects.filter(
+            pk=instance.pk
+        ).values_list('account_id', 'journal_entry_id').first()
+
+
+def _posted_line_buckets(instance):
+    """
+    (account_id, entry values) of a line and of its state before the save,
+    keeping only those whose entry is posted
+    """
+    pairs = {(instance.account_id, instance.journal_entry_id)}
+    previous = getattr(instance, '_ledger_previous_line', None)
+    if previous:
+        pairs.add(previous)
+    entries = {
+        row['pk']: row for row in JournalEntry.objects.filter(
+            pk__in={entry_id for _account_id, entry_id in pairs}, is_posted=True
+        ).values('pk', 'entry_date', 'property_id')
+    }
+    return [(account_id, entries[entry_id]) for account_id, entry_id in pairs if entry_id in entries]
+
+
+@receiver(post_save, sender=JournalEntryLine)
+@receiver(post_delete, sender=JournalEntryLine)
+def refresh_balances_for_journal_line(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the account buckets of a line belonging to a posted entry
+    """
+    if raw:
+        return
+    buckets = _posted_line_buckets(instance)
+    if buckets:
+        LedgerService.refresh_buckets(
+            (account_id, entry['entry_date']) for account_id, entry in buckets if account_id
+        )
+
+
+@receiver(post_save, sender=JournalEntry)
+def refresh_pnl_for_journal_entry(sender, instance, created, raw=False, **kwargs):
+    """
+    Refresh the property P&L when a tagged entry is posted, unposted,
+    re-dated or moved to another property
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_ledger_previous', None) or {
+        'is_posted': False, 'entry_date': None, 'property_id': None,
+    }
+    if not (previous['is_posted'] or instance.is_posted):
+        return
+    if (previous['is_posted'], previous['entry_date'], previous['property_id']) == (
+        instance.is_posted, instance.entry_date, instance.property_id
+    ):
+        return
+    PropertyPnLService.refresh_buckets([
+        (instance.property_id, instance.entry_date),
+        (previous['property_id'], previous['entry_date']),
+    ])
+
+
+@receiver(post_save, sender=JournalEntryLine)
+@receiver(post_delete, sender=JournalEntryLine)
+def refresh_pnl_for_journal_line(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the property P&L buckets of a line of a posted, tagged entry,
+    and of the entry it was moved from
+    """
+    if raw:
+        return
+    PropertyPnLService.refresh_buckets(
+        (entry['property_id'], entry['entry_date']) for _account_id, entry in _posted_line_buckets(instance)
+    )
+
+
+@receiver(pre_save, sender=PropertyRevenue)
+@receiver(pre_save, sender=PropertyExpense)
+def remember_property_record_bucket(sender, instance, raw=False, **kwargs):
+    """
+    Remember the previous property and date so a move refreshes both buckets
+    """
+    instance._pnl_previous = None
+    if instance.pk and not raw:
+        date_field = 'revenue_date' if sender is PropertyRevenue else 'expense_date'
+        instance._pnl_previous = sender.objects.filter(pk=instance.pk).values_list(
+            'property_id', date_field
+        ).first()
+
+
+@receiver(post_save, sender=PropertyRevenue)
+@receiver(post_save, sender=PropertyExpense)
+@receiver(post_delete, sender=PropertyRevenue)
+@receiver(post_delete, sender=PropertyExpense)
+def refresh_pnl_for_property_record(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the property P&L bucket of a revenue or expense record
+    """
+    if raw:
+        return
+    day = instance.revenue_date if sender is PropertyRevenue else instance.expense_date
+    pairs = [(instance.property_id, day)]
+    previous = getattr(instance, '_pnl_previous', None)
+    if previous:
+        pairs.append(previous)
+    PropertyPnLService.refresh_buckets(pairs)
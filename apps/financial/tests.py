@@ -0,0 +1,266 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.testing import create_owner, create_property
+from apps.financial.ledger import LedgerService
+from apps.financial.models import Account, AccountBalance, JournalEntry, JournalEntryLine, PropertyPnL
+from apps.financial.pnl import PropertyPnLService
+from apps.financial.reports import FinancialStatementService
+from apps.financial.tree import AccountTreeService
+from apps.properties.models import PropertyExpense, PropertyRevenue
+
+
+class LedgerBalanceCacheTests(TestCase):
+    """Cached monthly balances never drift from the posted journal lines"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cash = Account.objects.create(code='1010', name='Cash', account_type='asset')
+        cls.bank = Account.objects.create(code='1020', name='Bank', account_type='asset')
+        cls.rent = Account.objects.create(code='4010', name='Rent', account_type='revenue')
+
+    def entry(self, number, day, amount='30.00', post=True):
+        entry = JournalEntry.objects.create(entry_number=number, entry_date=day, description='Rent')
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.cash, debit_amount=Decimal(amount))
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.rent, credit_amount=Decimal(amount))
+        if post:
+            self.assertTrue(entry.post())
+        return entry
+
+    def periods(self):
+        return set(AccountBalance.objects.values_list('period', flat=True))
+
+    def test_post_unpost_and_redate(self):
+        draft = self.entry('L-1', date(2026, 5, 10), post=False)
+        self.assertFalse(AccountBalance.objects.exists())
+        self.assertTrue(draft.post())
+        self.assertEqual(self.cash.get_balance(), Decimal('30.00'))
+        self.assertEqual(LedgerService.drift(), [])
+
+        draft.entry_date = date(2026, 6, 2)
+        draft.save()
+        self.assertEqual(self.periods(), {date(2026, 6, 1)})
+        self.assertEqual(LedgerService.drift(), [])
+
+        draft.is_posted = False
+        draft.save()
+        self.assertFalse(AccountBalance.objects.exists())
+        self.assertEqual(LedgerService.drift(), [])
+
+    def test_line_edits_and_deletes(self):
+        entry = self.entry('L-2', date(2026, 5, 10))
+        self.entry('L-3', date(2026, 5, 20), amount='5.00')
+        line = entry.lines.get(account=self.cash)
+        line.debit_amount = Decimal('45.00')
+        line.save()
+        self.assertEqual(LedgerService.drift(), [])
+
+        line.account = self.bank
+        line.save()
+        self.assertEqual(self.cash.get_balance(), Decimal('5.00'))
+        self.assertEqual(self.bank.get_balance(), Decimal('45.00'))
+        self.assertEqual(LedgerService.drift(), [])
+
+        line.delete()
+        self.assertEqual(LedgerService.drift(), [])
+        entry.delete()
+        self.assertEqual(self.rent.get_balance(), Decimal('5.00'))
+        self.assertEqual(LedgerService.drift(), [])
+
+    def test_line_moved_between_entries(self):
+        posted = self.entry('L-4', date(2026, 5, 10))
+        draft = self.entry('L-5', date(2026, 6, 10), post=False)
+        later = self.entry('L-6', date(2026, 7, 10))
+
+        line = posted.lines.get(account=self.cash)
+        line.journal_entry = draft
+        line.save()
+        self.assertEqual(LedgerService.drift(), [])
+        self.assertEqual(self.cash.get_balance(), Decimal('30.00'))
+
+        line.journal_entry = later
+        line.save()
+        self.assertEqual(LedgerService.drift(), [])
+        self.assertEqual(self.cash.get_balance(), Decimal('60.00'))
+
+
+class FinancialStatementTests(TestCase):
+    """Statements agree with the journal lines for whole-month and mid-month ranges"""
+
+    @classmethod
+    def setUpTestData(cls):
+        accounts = {}
+        for code, name, account_type, parent in [
+            ('1000', 'Assets', 'asset', None), ('1010', 'Cash', 'asset', '1000'), ('1020', 'Bank', 'asset', '1000'),
+            ('2010', 'Loan', 'liability', None), ('3010', 'Capital', 'equity', None),
+            ('4000', 'Revenue', 'revenue', None), ('4010', 'Rent', 'revenue', '4000'),
+            ('5010', 'Repairs', 'expense', None),
+        ]:
+            accounts[code] = Account.objects.create(
+                code=code, name=name, account_type=account_type, parent=accounts.get(parent),
+            )
+        for number, (day, debit, credit, amount, posted) in enumerate([
+            (date(2026, 1, 5), '1010', '4010', '1000', True),
+            (date(2026, 1, 20), '5010', '1020', '300', True),
+            (date(2026, 2, 10), '1020', '3010', '5000', True),
+            (date(2026, 2, 25), '1010', '2010', '2000', True),
+            (date(2026, 3, 3), '1010', '4000', '700', True),
+            (date(2026, 2, 12), '5010', '1010', '999', False),
+        ]):
+            entry = JournalEntry.objects.create(entry_number=f'FS-{number}', entry_date=day, description='Entry')
+            JournalEntryLine.objects.create(journal_entry=entry, account=accounts[debit], debit_amount=Decimal(amount))
+            JournalEntryLine.objects.create(journal_entry=entry, account=accounts[credit], credit_amount=Decimal(amount))
+            if posted:
+                entry.post()
+
+    @staticmethod
+    def raw_balances(start=None, end=None):
+        """Signed balance per account type, summed line by line"""
+        balances = defaultdict(Decimal)
+        for line in JournalEntryLine.objects.filter(journal_entry__is_posted=True).select_related(
+            'account', 'journal_entry'
+        ):
+            day = line.journal_entry.entry_date
+            if (start is None or day >= start) and (end is None or day <= end):
+                balances[line.account.account_type] += line.account.balance_from_totals(
+                    line.debit_amount, line.credit_amount
+                )
+        return balances
+
+    def test_profit_loss(self):
+        for start, end in [(date(2026, 1, 1), date(2026, 2, 28)), (date(2026, 1, 10), date(2026, 3, 5))]:
+            with self.subTest(start=start, end=end):
+                report = FinancialStatementService.profit_loss(start, end)
+                raw = self.raw_balances(start, end)
+                self.assertEqual(report['total_revenue'], raw['revenue'])
+                self.assertEqual(report['total_expenses'], raw['expense'])
+                self.assertEqual(report['net_income'], raw['revenue'] - raw['expense'])
+
+    def test_balance_sheet_and_trial_balance(self):
+        for as_of in [date(2026, 2, 28), date(2026, 2, 15), None]:
+            with self.subTest(as_of=as_of):
+                sheet = FinancialStatementService.balance_sheet(as_of)
+                raw = self.raw_balances(end=as_of)
+                self.assertEqual(
+                    (sheet['total_assets'], sheet['total_liabilities'], sheet['total_equity']),
+                    (raw['asset'], raw['liability'], raw['equity']),
+                )
+                # Parents roll up their children of the same type
+                assets = next(line for line in sheet['asset_lines'] if line.code == '1000')
+                self.assertEqual(assets.balance, raw['asset'])
+
+                trial = FinancialStatementService.trial_balance(as_of)
+                self.assertEqual(trial['difference'], 0)
+                self.assertEqual(
+                    sum((line.net_debit for line in trial['lines'] if line.account_type in ('asset', 'expense')),
+                        Decimal('0.00')),
+                    raw['asset'] + raw['expense'],
+                )
+
+
+class AccountTreeCacheTests(TestCase):
+    """The chart of accounts is cached until an account changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.assets = Account.objects.create(code='1000', name='Assets', account_type='asset')
+        cls.cash = Account.objects.create(code='1010', name='Cash', account_type='asset', parent=cls.assets)
+
+    def test_saving_an_account_invalidates_the_tree(self):
+        self.assertEqual(AccountTreeService.load().get(self.cash.pk).path, 'Assets > Cash')
+        with self.assertNumQueries(0):
+            AccountTreeService.load()
+
+        self.assets.name = 'Current Assets'
+        self.assets.save()
+        with self.assertNumQueries(1):
+            tree = AccountTreeService.load()
+        self.assertEqual(tree.get(self.cash.pk).path, 'Current Assets > Cash')
+        self.assertEqual(self.cash.get_full_path(), 'Current Assets > Cash')
+
+        bank = Account.objects.create(code='1020', name='Bank', account_type='asset', parent=self.assets)
+        self.assertEqual([node.code for node in AccountTreeService.load().descendants(self.assets.pk)],
+                         ['1010', '1020'])
+        bank.delete()
+        self.assertIsNone(AccountTreeService.load().get(bank.pk))
+
+
+class PropertyPnLRollupTests(TestCase):
+    """The rollup follows revenues, expenses and posted property journal entries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_owner('OWN-P')
+        cls.first = create_property('P-1', cls.owner, city='Cairo')
+        cls.second = create_property('P-2', cls.owner, city='Giza')
+        cls.cash = Account.objects.create(code='1010', name='Cash', account_type='asset')
+        cls.service = Account.objects.create(code='4020', name='Service', account_type='revenue')
+
+    def stored(self):
+        return sorted(
+            PropertyPnL.objects.values_list('property_id', 'period', 'source', 'kind', 'category', 'amount')
+        )
+
+    def rebuilt(self):
+        PropertyPnLService.rebuild()
+        return self.stored()
+
+    def test_incremental_rollup_matches_rebuild(self):
+        revenue = PropertyRevenue.objects.create(property=self.first, revenue_date=date(2026, 1, 5), amount=Decimal('1000'))
+        PropertyExpense.objects.create(property=self.first, expense_date=date(2026, 1, 9), amount=Decimal('300'))
+        PropertyRevenue.objects.create(property=self.second, revenue_date=date(2026, 2, 1), amount=Decimal('700'))
+        entry = JournalEntry.objects.create(
+            entry_number='PNL-1', entry_date=date(2026, 1, 20), description='Service', property=self.second,
+        )
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.cash, debit_amount=Decimal('50'))
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.service, credit_amount=Decimal('50'))
+        self.assertTrue(entry.post())
+
+        # Moves between properties and months refresh both buckets
+        revenue.property = self.second
+        revenue.revenue_date = date(2026, 3, 1)
+        revenue.save()
+
+        incremental = self.stored()
+        self.assertEqual(incremental, self.rebuilt())
+        self.assertIn(
+            (self.second.pk, date(2026, 1, 1), 'ledger', 'revenue', '4020', Decimal('50.00')), incremental
+        )
+
+    def test_line_moved_to_another_entry(self):
+        first = JournalEntry.objects.create(
+            entry_number='PNL-2', entry_date=date(2026, 1, 20), description='Service', property=self.first,
+        )
+        JournalEntryLine.objects.create(journal_entry=first, account=self.cash, debit_amount=Decimal('80'))
+        line = JournalEntryLine.objects.create(journal_entry=first, account=self.service, credit_amount=Decimal('80'))
+        self.assertTrue(first.post())
+        second = JournalEntry.objects.create(
+            entry_number='PNL-3', entry_date=date(2026, 2, 3), description='Service', property=self.second,
+            is_posted=True,
+        )
+
+        line.journal_entry = second
+        line.save()
+        incremental = self.stored()
+        self.assertEqual(incremental, self.rebuilt())
+        self.assertEqual([row[:2] for row in incremental], [(self.second.pk, date(2026, 2, 1))])
+
+    def test_slice_by_city_in_one_query(self):
+        PropertyRevenue.objects.create(property=self.first, revenue_date=date(2026, 1, 5), amount=Decimal('1000'))
+        PropertyExpense.objects.create(property=self.first, expense_date=date(2026, 1, 9), amount=Decimal('300'))
+        PropertyExpense.objects.create(property=self.second, expense_date=date(2026, 5, 9), amount=Decimal('200'))
+        with self.assertNumQueries(1):
+            report = PropertyPnLService.slice(group_by='city', end=date(2026, 4, 30))
+        self.assertEqual([(row['label'], row['net']) for row in report['rows']], [('Cairo', Decimal('700.00'))])
+        self.assertEqual(report['totals']['net'], Decimal('700.00'))
+
+        self.client.force_login(User.objects.create_user('analyst', password='pass', is_staff=True))
+        response = self.client.get('/en/api/v1/financial/property-pnl/', {'group_by': 'property', 'owner': self.owner.pk})
+        self.assertEqual([row['net'] for row in response.json()['results']], [700.0, -200.0])
+        response = self.client.get(reverse('financial:report_property_pnl'), {'group_by': 'period'})
+        self.assertEqual(response.status_code, 200)
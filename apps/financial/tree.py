@@ -0,0 +1,214 @@
+"""
+Chart of accounts tree for the Financial app
+The whole chart is loaded in one query, arranged into a tree with full
+paths and depths, and cached until an Account row changes (briefly, when
+the cache is not shared between processes). Balances are applied per
+request from the AccountBalance cache and rolled up in memory.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .ledger import LedgerService
+from .models import Account, AccountType
+
+ZERO = Decimal('0.00')
+
+ACCOUNT_TYPE_LABELS = dict(AccountType.choices)
+
+
+class AccountNode:
+    """
+    One account of the chart, with its place in the tree
+    """
+
+    # Same sign convention as the model
+    balance_from_totals = Account.balance_from_totals
+
+    def __init__(self, row):
+        self.pk = self.id = row['id']
+        self.code = row['code']
+        self.name = row['name']
+        self.name_ar = row['name_ar']
+        self.account_type = row['account_type']
+        self.parent_id = row['parent_id']
+        self.is_active = row['is_active']
+        self.is_system = row['is_system']
+        self.path = row['path']
+        self.depth = row['depth']
+        self.parent = None
+        self.children = []
+        self.own_debit = ZERO
+        self.own_credit = ZERO
+        self.debit = ZERO
+        self.credit = ZERO
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+    def get_account_type_display(self):
+        return ACCOUNT_TYPE_LABELS.get(self.account_type, self.account_type)
+
+    def get_full_path(self):
+        return self.path
+
+    @property
+    def label(self):
+        """Choice label, e.g. 1110 - Assets > Current Assets > Cash"""
+        return f"{self.code} - {self.path}"
+
+    @property
+    def balance(self):
+        """Balance including all descendants"""
+        return self.balance_from_totals(self.debit, self.credit)
+
+    @property
+    def own_balance(self):
+        return self.balance_from_totals(self.own_debit, self.own_credit)
+
+
+class AccountTree:
+    """
+    In-memory chart of accounts, iterated in tree order
+    (parents before children, siblings by code)
+    """
+
+    def __init__(self, rows):
+        self.nodes = {}
+        self.ordered = []
+        for row in rows:
+            node = AccountNode(row)
+            self.nodes[node.pk] = node
+            self.ordered.append(node)
+        self.roots = []
+        for node in self.ordered:
+            if node.depth:
+                node.parent = self.nodes[node.parent_id]
+                node.parent.children.append(node)
+            else:
+                self.roots.append(node)
+
+    def __iter__(self):
+        return iter(self.ordered)
+
+    def __len__(self):
+        return len(self.ordered)
+
+    def get(self, pk):
+        return self.nodes.get(pk)
+
+    def filter(self, account_types=None, is_active=None):
+        """Nodes matching the given type(s) and status, in tree order"""
+        return [
+            node for node in self.ordered
+            if (account_types is None or node.account_type in account_types)
+            and (is_active is None or node.is_active == is_active)
+        ]
+
+    def descendants(self, pk):
+        """All nodes below an account, in tree order"""
+        node = self.nodes.get(pk)
+        if node is None:
+            return []
+        found = []
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            found.append(child)
+            stack.extend(reversed(child.children))
+        return found
+
+    def apply_totals(self, totals):
+        """
+        Set own and rolled-up debit/credit from {account_id: (debit, credit)}
+        """
+        for node in self.ordered:
+            debit, credit = totals.get(node.pk, (ZERO, ZERO))
+            node.own_debit = node.debit = Decimal(debit or 0)
+            node.own_credit = node.credit = Decimal(credit or 0)
+        # Children come after their parent, so walking backwards rolls up bottom-first
+        for node in reversed(self.ordered):
+            if node.parent is not None:
+                node.parent.debit += node.debit
+                node.parent.credit += node.credit
+        return self
+
+
+class AccountTreeService:
+    """
+    Load and cache the chart of accounts
+    """
+
+    CACHE_KEY = 'financial:account_tree'
+    CACHE_TIMEOUT = 60 * 60 * 24
+    # A process-local cache never sees account edits made by other workers
+    LOCAL_CACHE_TIMEOUT = 60
+
+    @staticmethod
+    def rows():
+        """
+        Account rows in tree order with path and depth, cached until an
+        Account changes (for a minute at most when the cache is per process)
+        """
+        rows = cache.get(AccountTreeService.CACHE_KEY)
+        if rows is None:
+            rows = AccountTreeService.build_rows()
+            timeout = (
+                AccountTreeService.CACHE_TIMEOUT if settings.CACHE_SHARED
+                else AccountTreeService.LOCAL_CACHE_TIMEOUT
+            )
+            cache.set(AccountTreeService.CACHE_KEY, rows, timeout)
+        return rows
+
+    @staticmethod
+    def build_rows():
+        """
+        Read the whole chart in one query and lay it out depth first
+        """
+        accounts = list(Account.objects.order_by('code').values(
+            'id', 'code', 'name', 'name_ar', 'account_type',
+            'parent_id', 'is_active', 'is_system',
+        ))
+        by_id = {account['id']: account for account in accounts}
+        children = {}
+        roots = []
+        for account in accounts:
+            if account['parent_id'] in by_id:
+                children.setdefault(account['parent_id'], []).append(account)
+            else:
+                roots.append(account)
+
+        rows = []
+        seen = set()
+
+        def visit(account, path, depth):
+            if account['id'] in seen:
+                return
+            seen.add(account['id'])
+            full_path = f"{path} > {account['name']}" if path else account['name']
+            rows.append(dict(account, path=full_path, depth=depth))
+            for child in children.get(account['id'], []):
+                visit(child, full_path, depth + 1)
+
+        for account in roots:
+            visit(account, '', 0)
+        # Accounts caught in a parent cycle have no root; list them at the top level
+        for account in accounts:
+            visit(account, '', 0)
+        return rows
+
+    @staticmethod
+    def load(with_balances=False):
+        """
+        AccountTree of the whole chart. with_balances applies all cached
+        posted totals (one query).
+        """
+        tree = AccountTree(AccountTreeService.rows())
+        if with_balances:
+            tree.apply_totals(LedgerService.totals())
+        return tree
+
+    @staticmethod
+    def invalidate():
+        cache.delete(AccountTreeService.CACHE_KEY)
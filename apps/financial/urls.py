@@ -25,15 +25,18 @@ urlpatterns = [
     path('invoices/', views.invoice_list, name='invoice_list'),
     path('invoices/create/', views.invoice_create, name='invoice_create'),
     path('invoices/<int:pk>/', views.invoice_detail, name='invoice_detail'),
+    path('invoices/<int:pk>/pdf/', views.invoice_pdf, name='invoice_pdf'),
     
     # Payments (Receipts/Payment Vouchers)
     path('payments/', views.payment_list, name='payment_list'),
     path('payments/create/', views.payment_create, name='payment_create'),
     path('payments/<int:pk>/', views.payment_detail, name='payment_detail'),
     path('payments/<int:pk>/print/', views.payment_print, name='payment_print'),
+    path('payments/<int:pk>/pdf/', views.payment_pdf, name='payment_pdf'),
     
     # Reports
     path('reports/trial-balance/', views.report_trial_balance, name='report_trial_balance'),
     path('reports/profit-loss/', views.report_profit_loss, name='report_profit_loss'),
     path('reports/balance-sheet/', views.report_balance_sheet, name='report_balance_sheet'),
+    path('reports/property-pnl/', views.report_property_pnl, name='report_property_pnl'),
 ]
@@ -5,19 +5,27 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Sum, Count, Q
-from django.http import JsonResponse, HttpResponse
+from django.db.models import Sum
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 from decimal import Decimal
 
+from apps.core.exports import ExportService
+from apps.core.pdf import PdfService
+from apps.owners.models import Owner
+from apps.properties.models import Property, PropertyType
+from .documents import FinancialDocumentService
 from .models import (
     Account, AccountType, JournalEntry, JournalEntryLine,
-    Invoice, InvoiceItem, Payment, Budget, FinancialPeriod
+    Invoice, InvoiceItem, Payment, Budget, FinancialPeriod, AccountBalance
 )
+from .pnl import PropertyPnLService
+from .reports import FinancialStatementService
+from .tree import AccountTreeService
 from .forms import (
     AccountForm, JournalEntryForm, InvoiceForm, PaymentForm,
-    BudgetForm, FinancialPeriodForm, FinancialReportForm
+    BudgetForm, FinancialPeriodForm
 )
 
 
@@ -43,11 +51,11 @@ def financial_dashboard(request):
     net_income = Decimal(total_revenue) - Decimal(total_expenses)
     
     # Cash accounts balance
-    cash_accounts = Account.objects.filter(
-        account_type=AccountType.ASSET,
-        name__icontains='cash'
-    )
-    cash_balance = sum([acc.get_balance() for acc in cash_accounts])
+    cash_totals = AccountBalance.objects.filter(
+        account__account_type=AccountType.ASSET,
+        account__name__icontains='cash'
+    ).aggregate(debits=Sum('debit_total'), credits=Sum('credit_total'))
+    cash_balance = (cash_totals['debits'] or 0) - (cash_totals['credits'] or 0)
     
     # Invoices stats
     outstanding_invoices = Invoice.objects.filter(
@@ -88,52 +96,39 @@ def financial_dashboard(request):
 @login_required
 def account_list(request):
     """List all accounts in tree structure with filters"""
-    # Start with all accounts
-    queryset = Account.objects.all()
+    # Whole chart from the cached tree, balances rolled up in one query
+    tree = AccountTreeService.load(with_balances=True)
     
     # Apply filters
     account_type_filter = request.GET.get('account_type')
-    search = request.GET.get('search')
+    search = (request.GET.get('search') or '').strip().lower()
     is_active = request.GET.get('is_active')
     
-    if account_type_filter:
-        queryset = queryset.filter(account_type=account_type_filter)
-    
+    accounts = tree.filter(
+        [account_type_filter] if account_type_filter else None,
+        {'1': True, '0': False}.get(is_active),
+    )
     if search:
-        queryset = queryset.filter(
-            Q(code__icontains=search) | Q(name__icontains=search)
-        )
+        accounts = [
+            account for account in accounts
+            if search in account.code.lower() or search in account.name.lower()
+        ]
     
-    if is_active == '1':
-        queryset = queryset.filter(is_active=True)
-    elif is_active == '0':
-        queryset = queryset.filter(is_active=False)
-    
-    # Get all accounts grouped by type
+    # Group by type, keeping tree order
     accounts_by_type = {}
     for acc_type in ['asset', 'liability', 'equity', 'revenue', 'expense']:
-        accounts = queryset.filter(
-            account_type=acc_type,
-            parent=None
-        ).prefetch_related('children').order_by('code')
-        if accounts.exists():
-            accounts_by_type[acc_type] = accounts
-    
-    # Count by type (from filtered queryset)
-    asset_count = queryset.filter(account_type='asset').count()
-    liability_count = queryset.filter(account_type='liability').count()
-    equity_count = queryset.filter(account_type='equity').count()
-    revenue_count = queryset.filter(account_type='revenue').count()
-    expense_count = queryset.filter(account_type='expense').count()
+        typed = [account for account in accounts if account.account_type == acc_type]
+        if typed:
+            accounts_by_type[acc_type] = typed
     
     context = {
         'accounts_by_type': accounts_by_type,
-        'total_accounts': queryset.count(),
-        'asset_count': asset_count,
-        'liability_count': liability_count,
-        'equity_count': equity_count,
-        'revenue_count': revenue_count,
-        'expense_count': expense_count,
+        'total_accounts': len(accounts),
+        'asset_count': len(accounts_by_type.get('asset', [])),
+        'liability_count': len(accounts_by_type.get('liability', [])),
+        'equity_count': len(accounts_by_type.get('equity', [])),
+        'revenue_count': len(accounts_by_type.get('revenue', [])),
+        'expense_count': len(accounts_by_type.get('expense', [])),
     }
     return render(request, 'financial/account_list.html', context)
 
@@ -176,6 +171,26 @@ def account_detail(request, pk):
     return render(request, 'financial/account_detail.html', context)
 
 
+JOURNAL_ENTRY_EXPORT_COLUMNS = [
+    ('Entry Number', 'entry_number'), ('Date', 'entry_date'), ('Type', 'entry_type'),
+    ('Description', 'description'), ('Reference', 'reference'), ('Property', 'property__code'),
+    ('Contract', 'contract__contract_number'), ('Posted', 'is_posted'), ('Posted At', 'posted_at'),
+]
+
+INVOICE_EXPORT_COLUMNS = [
+    ('Invoice Number', 'invoice_number'), ('Type', 'invoice_type'), ('Invoice Date', 'invoice_date'),
+    ('Due Date', 'due_date'), ('Property', 'property__code'), ('Contract', 'contract__contract_number'),
+    ('Subtotal', 'subtotal'), ('Tax', 'tax_amount'), ('Discount', 'discount_amount'),
+    ('Total', 'total_amount'), ('Paid', 'paid_amount'), ('Status', 'status'),
+]
+
+PAYMENT_EXPORT_COLUMNS = [
+    ('Payment Number', 'payment_number'), ('Type', 'payment_type'), ('Date', 'payment_date'),
+    ('Method', 'payment_method'), ('Amount', 'amount'), ('Invoice', 'invoice__invoice_number'),
+    ('Reference', 'reference_number'),
+]
+
+
 # Journal Entry Views
 @login_required
 def journal_entry_list(request):
@@ -189,6 +204,9 @@ def journal_entry_list(request):
     elif status == 'unposted':
         entries = entries.filter(is_posted=False)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, entries, JOURNAL_ENTRY_EXPORT_COLUMNS, 'journal_entries')
+    
     paginator = Paginator(entries, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
     
@@ -214,7 +232,11 @@ def journal_entry_create(request):
     else:
         form = JournalEntryForm()
     
-    context = {'form': form, 'action': 'Create'}
+    context = {
+        'form': form,
+        'action': 'Create',
+        'accounts': AccountTreeService.load().filter(is_active=True),
+    }
     return render(request, 'financial/journal_entry_form.html', context)
 
 
@@ -261,6 +283,9 @@ def invoice_list(request):
     if invoice_type:
         invoices = invoices.filter(invoice_type=invoice_type)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, invoices, INVOICE_EXPORT_COLUMNS, 'invoices')
+    
     paginator = Paginator(invoices, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
     
@@ -317,6 +342,9 @@ def payment_list(request):
     if payment_type:
         payments = payments.filter(payment_type=payment_type)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, payments, PAYMENT_EXPORT_COLUMNS, 'payments')
+    
     paginator = Paginator(payments, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
     
@@ -358,6 +386,16 @@ def payment_create(request):
     return render(request, 'financial/payment_form.html', context)
 
 
+@login_required
+def invoice_pdf(request, pk):
+    """Invoice as PDF"""
+    invoice = get_object_or_404(
+        Invoice.objects.select_related('property', 'contract__client').prefetch_related('items'), pk=pk
+    )
+    payload = FinancialDocumentService.invoice(invoice)
+    return PdfService.response(request, payload, f'{invoice.invoice_number}.pdf')
+
+
 @login_required
 def payment_detail(request, pk):
     """Payment detail"""
@@ -376,41 +414,52 @@ def payment_print(request, pk):
     return render(request, 'financial/payment_print.html', context)
 
 
+@login_required
+def payment_pdf(request, pk):
+    """Payment voucher as PDF"""
+    payment = get_object_or_404(
+        Payment.objects.select_related('invoice__property', 'invoice__contract__client'), pk=pk
+    )
+    payload = FinancialDocumentService.voucher(payment)
+    return PdfService.response(request, payload, f'{payment.payment_number}.pdf')
+
+
 # Financial Reports
+def _report_filters(request):
+    """Date/property filters shared by the statement views"""
+    def get_date(name):
+        try:
+            return parse_date(request.GET.get(name) or '')
+        except ValueError:
+            return None
+    
+    property_id = request.GET.get('property')
+    return get_date, int(property_id) if property_id and property_id.isdigit() else None
+
+
 @login_required
 def report_trial_balance(request):
     """Trial Balance Report"""
-    form = FinancialReportForm(request.GET or None)
-    
-    accounts = Account.objects.filter(is_active=True).order_by('code')
-    report_data = []
-    total_debit = Decimal('0.00')
-    total_credit = Decimal('0.00')
-    
-    for account in accounts:
-        balance = account.get_balance()
-        if balance != 0:
-            if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-                debit = balance if balance > 0 else 0
-                credit = abs(balance) if balance < 0 else 0
-            else:
-                credit = balance if balance > 0 else 0
-                debit = abs(balance) if balance < 0 else 0
-            
-            report_data.append({
-                'account': account,
-                'debit': debit,
-                'credit': credit,
-            })
-            total_debit += Decimal(str(debit))
-            total_credit += Decimal(str(credit))
+    get_date, property_id = _report_filters(request)
+    as_of_date = get_date('as_of_date')
+    account_type = request.GET.get('account_type')
+    if account_type not in AccountType.values:
+        account_type = None
+    
+    report = FinancialStatementService.trial_balance(
+        as_of=as_of_date,
+        account_type=account_type,
+        property_id=property_id
+    )
     
     context = {
-        'form': form,
-        'report_data': report_data,
-        'total_debit': total_debit,
-        'total_credit': total_credit,
-        'is_balanced': total_debit == total_credit,
+        'accounts': report['lines'],
+        'total_debit': report['total_debit'],
+        'total_credit': report['total_credit'],
+        'difference': report['difference'],
+        'is_balanced': report['difference'] == 0,
+        'as_of_date': as_of_date or timezone.now().date(),
+        'today': timezone.now(),
     }
     return render(request, 'financial/report_trial_balance.html', context)
 
@@ -418,59 +467,21 @@ def report_trial_balance(request):
 @login_required
 def report_profit_loss(request):
     """Profit & Loss Statement"""
-    form = FinancialReportForm(request.GET or None)
+    get_date, property_id = _report_filters(request)
+    end_date = get_date('to_date') or timezone.now().date()
+    start_date = get_date('from_date') or end_date.replace(day=1)
     
-    # Get date range
-    if form.is_valid():
-        start_date = form.cleaned_data['start_date']
-        end_date = form.cleaned_data['end_date']
-    else:
-        end_date = timezone.now().date()
-        start_date = end_date.replace(day=1)
-    
-    # Revenue
-    revenue_accounts = Account.objects.filter(account_type=AccountType.REVENUE)
-    total_revenue = Decimal('0.00')
-    revenue_data = []
-    
-    for account in revenue_accounts:
-        lines = JournalEntryLine.objects.filter(
-            account=account,
-            journal_entry__is_posted=True,
-            journal_entry__entry_date__range=[start_date, end_date]
-        )
-        amount = lines.aggregate(total=Sum('credit_amount'))['total'] or 0
-        if amount > 0:
-            revenue_data.append({'account': account, 'amount': amount})
-            total_revenue += Decimal(str(amount))
-    
-    # Expenses
-    expense_accounts = Account.objects.filter(account_type=AccountType.EXPENSE)
-    total_expenses = Decimal('0.00')
-    expense_data = []
-    
-    for account in expense_accounts:
-        lines = JournalEntryLine.objects.filter(
-            account=account,
-            journal_entry__is_posted=True,
-            journal_entry__entry_date__range=[start_date, end_date]
-        )
-        amount = lines.aggregate(total=Sum('debit_amount'))['total'] or 0
-        if amount > 0:
-            expense_data.append({'account': account, 'amount': amount})
-            total_expenses += Decimal(str(amount))
-    
-    net_income = total_revenue - total_expenses
+    report = FinancialStatementService.profit_loss(start_date, end_date, property_id)
     
     context = {
-        'form': form,
-        'start_date': start_date,
-        'end_date': end_date,
-        'revenue_data': revenue_data,
-        'expense_data': expense_data,
-        'total_revenue': total_revenue,
-        'total_expenses': total_expenses,
-        'net_income': net_income,
+        'from_date': start_date,
+        'to_date': end_date,
+        'revenue_accounts': report['revenue_lines'],
+        'expense_accounts': report['expense_lines'],
+        'total_revenue': report['total_revenue'],
+        'total_expenses': report['total_expenses'],
+        'net_income': report['net_income'],
+        'today': timezone.now(),
     }
     return render(request, 'financial/report_profit_loss.html', context)
 
@@ -478,52 +489,42 @@ def report_profit_loss(request):
 @login_required
 def report_balance_sheet(request):
     """Balance Sheet"""
-    report_date = timezone.now().date()
-    
-    # Assets
-    asset_accounts = Account.objects.filter(account_type=AccountType.ASSET)
-    total_assets = Decimal('0.00')
-    asset_data = []
-    
-    for account in asset_accounts:
-        balance = account.get_balance()
-        if balance != 0:
-            asset_data.append({'account': account, 'amount': balance})
-            total_assets += balance
-    
-    # Liabilities
-    liability_accounts = Account.objects.filter(account_type=AccountType.LIABILITY)
-    total_liabilities = Decimal('0.00')
-    liability_data = []
-    
-    for account in liability_accounts:
-        balance = account.get_balance()
-        if balance != 0:
-            liability_data.append({'account': account, 'amount': balance})
-            total_liabilities += balance
-    
-    # Equity
-    equity_accounts = Account.objects.filter(account_type=AccountType.EQUITY)
-    total_equity = Decimal('0.00')
-    equity_data = []
-    
-    for account in equity_accounts:
-        balance = account.get_balance()
-        if balance != 0:
-            equity_data.append({'account': account, 'amount': balance})
-            total_equity += balance
-    
-    total_liabilities_equity = total_liabilities + total_equity
+    get_date, property_id = _report_filters(request)
+    as_of_date = get_date('as_of_date')
+    
+    report = FinancialStatementService.balance_sheet(as_of=as_of_date, property_id=property_id)
     
     context = {
-        'report_date': report_date,
-        'asset_data': asset_data,
-        'liability_data': liability_data,
-        'equity_data': equity_data,
-        'total_assets': total_assets,
-        'total_liabilities': total_liabilities,
-        'total_equity': total_equity,
-        'total_liabilities_equity': total_liabilities_equity,
-        'is_balanced': total_assets == total_liabilities_equity,
+        'as_of_date': as_of_date or timezone.now().date(),
+        'asset_accounts': report['asset_lines'],
+        'liability_accounts': report['liability_lines'],
+        'equity_accounts': report['equity_lines'],
+        'total_assets': report['total_assets'],
+        'total_liabilities': report['total_liabilities'],
+        'total_equity': report['total_equity'],
+        'total_liabilities_equity': report['total_liabilities_equity'],
+        'is_balanced': report['is_balanced'],
+        'today': timezone.now(),
     }
     return render(request, 'financial/report_balance_sheet.html', context)
+
+
+@login_required
+def report_property_pnl(request):
+    """Portfolio P&L by property, owner, city, type, month or category"""
+    filters = PropertyPnLService.parse_filters(request.GET)
+    report = PropertyPnLService.slice(**filters)
+
+    context = {
+        'filters': filters,
+        'rows': report['rows'],
+        'totals': report['totals'],
+        'group_by': report['group_by'],
+        'groupings': PropertyPnLService.GROUPING_CHOICES,
+        'group_label': dict(PropertyPnLService.GROUPING_CHOICES)[report['group_by']],
+        'owners': Owner.objects.order_by('name').only('id', 'name'),
+        'property_types': PropertyType.objects.filter(is_active=True),
+        'cities': Property.objects.order_by('city').values_list('city', flat=True).distinct(),
+        'today': timezone.now(),
+    }
+    return render(request, 'financial/report_property_pnl.html', context)
@@ -8,6 +8,8 @@ from django.db.models import Case, Count, IntegerField, Q, Sum, When
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
+from apps.core.exports import ExportService
+
 from .forms import (
     MaintenanceAttachmentForm,
     MaintenanceRequestForm,
@@ -17,6 +19,15 @@ from .forms import (
 from .models import MaintenanceAttachment, MaintenanceRequest, MaintenanceSchedule, MaintenanceCategory
 
 
+MAINTENANCE_EXPORT_COLUMNS = [
+    ('Request Number', 'request_number'), ('Property Code', 'property__code'), ('Property', 'property__title'),
+    ('Category', 'category__name'), ('Title', 'title'), ('Priority', 'priority'), ('Status', 'status'),
+    ('Assigned To', 'assigned_to__username'), ('Request Date', 'request_date'),
+    ('Scheduled Date', 'scheduled_date'), ('Completed Date', 'completed_date'),
+    ('Estimated Cost', 'estimated_cost'), ('Actual Cost', 'actual_cost'),
+]
+
+
 @login_required
 def maintenance_list(request):
     """Advanced list of maintenance requests with filtering and insights."""
@@ -96,6 +107,9 @@ def maintenance_list(request):
     else:
         queryset = queryset.order_by(*sort_mapping.get(sort_option, ('-request_date',)))
 
+    if request.GET.get('export'):
+        return ExportService.response(request, queryset, MAINTENANCE_EXPORT_COLUMNS, 'maintenance_requests')
+
     paginator = Paginator(queryset, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
 
@@ -51,17 +51,22 @@ class Owner(models.Model):
 
     def get_properties_count(self):
         """Get total number of properties owned."""
+        if hasattr(self, 'properties_count'):
+            return self.properties_count
         return self.properties.count()
 
     def get_active_properties_count(self):
         """Get number of active properties."""
+        if hasattr(self, 'active_properties_count'):
+            return self.active_properties_count
         return self.properties.filter(is_active=True).count()
 
     def get_total_contracts_value(self):
-        """Get total value of all contracts for this owner's properties."""
+        """Get total monthly rent of active contracts on this owner's properties."""
+        if hasattr(self, 'active_rent'):
+            return self.active_rent
         from apps.contracts.models import Contract
-        total = 0
-        for property in self.properties.all():
-            contracts = Contract.objects.filter(property=property, status='active')
-            total += sum(c.rent_amount for c in contracts)
-        return total
+        total = Contract.objects.filter(
+            property__owner=self, status='active'
+        ).aggregate(total=models.Sum('rent_amount'))['total']
+        return total or 0
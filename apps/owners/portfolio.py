@@ -0,0 +1,70 @@
+"""
+Owner portfolio metrics - property counts, active rent, market value and
+revenue for any number of owners in a single statement
+"""
+from decimal import Decimal
+
+from django.db.models import (
+    Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+
+from apps.contracts.models import Contract
+from apps.properties.models import Property, PropertyRevenue
+
+MONEY = DecimalField(max_digits=15, decimal_places=2)
+
+
+def _per_owner(queryset, owner_lookup, aggregate, output_field):
+    """
+    Correlated subquery aggregating queryset per outer owner; each source
+    is aggregated on its own so properties x contracts never fan out
+    """
+    grouped = queryset.filter(**{owner_lookup: OuterRef('pk')}).order_by().values(owner_lookup)
+    zero = Value(Decimal('0.00'), output_field=output_field) if output_field is MONEY else Value(0)
+    return Coalesce(
+        Subquery(grouped.annotate(total=aggregate).values('total'), output_field=output_field),
+        zero,
+        output_field=output_field,
+    )
+
+
+class OwnerPortfolioService:
+    """Annotate owners with the figures their list, detail and API show"""
+
+    FIELDS = [
+        'properties_count', 'active_properties_count', 'available_properties_count',
+        'active_rent', 'market_value', 'revenue',
+    ]
+
+    @staticmethod
+    def annotate(queryset):
+        """
+        Add FIELDS to an Owner queryset; one SELECT whatever the page size
+        """
+        properties = Property.objects.all()
+        return queryset.annotate(
+            properties_count=_per_owner(properties, 'owner', Count('pk'), IntegerField()),
+            active_properties_count=_per_owner(
+                properties, 'owner', Count('pk', filter=Q(is_active=True)), IntegerField()
+            ),
+            available_properties_count=_per_owner(
+                properties, 'owner', Count('pk', filter=Q(status='available')), IntegerField()
+            ),
+            market_value=_per_owner(properties, 'owner', Sum('market_value'), MONEY),
+            active_rent=_per_owner(
+                Contract.objects.filter(status='active'), 'property__owner', Sum('rent_amount'), MONEY
+            ),
+            revenue=_per_owner(PropertyRevenue.objects.all(), 'property__owner', Sum('amount'), MONEY),
+        )
+
+    @staticmethod
+    def totals(owner_queryset=None):
+        """Portfolio-wide properties count and market value for summary cards"""
+        properties = Property.objects.all()
+        if owner_queryset is not None:
+            properties = properties.filter(owner__in=owner_queryset.values('pk'))
+        return properties.aggregate(
+            properties_count=Count('pk'),
+            market_value=Coalesce(Sum('market_value'), Value(Decimal('0.00')), output_field=MONEY),
+        )
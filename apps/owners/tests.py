@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.contracts.models import Contract
+from apps.core.testing import create_client, create_owner, create_property
+from apps.owners.models import Owner
+from apps.owners.portfolio import OwnerPortfolioService
+from apps.properties.models import PropertyRevenue
+
+
+class OwnerPortfolioTests(TestCase):
+    """Owner figures come from one annotated query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        client_obj = create_client('CLI-P')
+        cls.owners = []
+        for index in range(3):
+            owner = create_owner(f'OWN-P{index}', name=f'Owner {index}')
+            cls.owners.append(owner)
+            for number in range(index + 1):
+                prop = create_property(
+                    f'P-{index}-{number}', owner, market_value=Decimal('100000.00'), is_active=number == 0,
+                )
+                for month in (1, 2):
+                    Contract.objects.create(
+                        contract_number=f'PC-{index}-{number}-{month}', property=prop, client=client_obj,
+                        start_date=date(2026, month, 1), end_date=date(2027, month, 1),
+                        rent_amount=Decimal('1000.00'), status='active' if month == 1 else 'draft',
+                    )
+                    PropertyRevenue.objects.create(
+                        property=prop, revenue_date=date(2026, month, 1), amount=Decimal('500.00')
+                    )
+
+    def test_annotations_do_not_fan_out(self):
+        with self.assertNumQueries(1):
+            owners = {owner.name: owner for owner in OwnerPortfolioService.annotate(Owner.objects.all())}
+        owner = owners['Owner 2']
+        self.assertEqual((owner.properties_count, owner.active_properties_count), (3, 1))
+        self.assertEqual(owner.market_value, Decimal('300000.00'))
+        self.assertEqual(owner.active_rent, Decimal('3000.00'))
+        self.assertEqual(owner.revenue, Decimal('3000.00'))
+        self.assertEqual(owner.get_total_contracts_value(), Decimal('3000.00'))
+        empty = create_owner('OWN-PE', name='Empty')
+        empty = OwnerPortfolioService.annotate(Owner.objects.filter(pk=empty.pk)).get()
+        self.assertEqual((empty.properties_count, empty.active_rent), (0, Decimal('0.00')))
+        self.assertEqual(OwnerPortfolioService.totals()['market_value'], Decimal('600000.00'))
+
+    def test_owner_list_and_api(self):
+        self.client.force_login(User.objects.create_user('owners', password='pass', is_staff=True))
+        response = self.client.get(reverse('owners:list'))
+        self.assertEqual(response.context['portfolio_value'], Decimal('600000.00'))
+        self.assertContains(response, '$300000')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/en/api/v1/owners/', {'ordering': '-active_rent'})
+        first = response.json()['results'][0]
+        self.assertEqual((first['name'], first['active_rent']), ('Owner 2', '3000.00'))
+        self.assertEqual(len([query for query in queries if 'owners_owner' in query['sql']]), 2)
+        response = self.client.post('/en/api/v1/owners/', {
+            'name': 'New', 'phone': '+201000000009', 'national_id': 'OWN-PN',
+        })
+        self.assertEqual((response.status_code, response.json()['properties_count']), (201, 0))
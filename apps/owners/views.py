@@ -7,14 +7,25 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 
+from apps.core.exports import ExportService
+
 from .models import Owner
 from .forms import OwnerForm, OwnerSearchForm
+from .portfolio import OwnerPortfolioService
+
+
+OWNER_EXPORT_COLUMNS = [
+    ('Name', 'name'), ('National ID', 'national_id'), ('Phone', 'phone'), ('Email', 'email'),
+    ('City', 'city'), ('Country', 'country'), ('Active', 'is_active'),
+    ('Properties', 'properties_count'), ('Available Properties', 'available_properties_count'),
+    ('Market Value', 'market_value'), ('Active Rent', 'active_rent'), ('Revenue', 'revenue'),
+]
 
 
 @login_required
 def owner_list(request):
     """List all owners with search and filter"""
-    queryset = Owner.objects.annotate(properties_count=Count('properties'))
+    queryset = OwnerPortfolioService.annotate(Owner.objects.all())
     
     search_form = OwnerSearchForm(request.GET)
     if search_form.is_valid():
@@ -47,19 +58,26 @@ def owner_list(request):
         'newest': '-created_at',
         'oldest': 'created_at',
         'properties': '-properties_count',
+        'portfolio': '-market_value',
+        'rent': '-active_rent',
     }
     queryset = queryset.order_by(sort_mapping.get(sort_option, 'name'))
     
+    if request.GET.get('export'):
+        return ExportService.response(request, queryset, OWNER_EXPORT_COLUMNS, 'owners')
+    
     paginator = Paginator(queryset, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
     
     # Calculate statistics
-    from apps.properties.models import Property
-    total_owners = Owner.objects.count()
-    active_owners = Owner.objects.filter(is_active=True).count()
-    total_properties = Property.objects.count()
-    portfolio_value = Property.objects.aggregate(total=Count('id'))['total'] or 0
-    portfolio_value_sum = Property.objects.aggregate(total=Count('market_value'))['total'] or 0
+    owner_counts = Owner.objects.aggregate(
+        total=Count('pk'), active=Count('pk', filter=Q(is_active=True))
+    )
+    total_owners = owner_counts['total']
+    active_owners = owner_counts['active']
+    portfolio_totals = OwnerPortfolioService.totals()
+    total_properties = portfolio_totals['properties_count']
+    portfolio_value = portfolio_totals['market_value']
     
     context = {
         'owners': page_obj,
@@ -116,15 +134,15 @@ def owner_update(request, pk):
 @login_required
 def owner_detail(request, pk):
     """Owner detail view with properties"""
-    owner = get_object_or_404(Owner, pk=pk)
+    owner = get_object_or_404(OwnerPortfolioService.annotate(Owner.objects.all()), pk=pk)
     properties = owner.properties.select_related('property_type').all()
     
     context = {
         'owner': owner,
         'properties': properties,
-        'properties_count': properties.count(),
-        'active_properties': properties.filter(is_active=True).count(),
-        'available_properties': properties.filter(status='available').count(),
+        'properties_count': owner.properties_count,
+        'active_properties': owner.active_properties_count,
+        'available_properties': owner.available_properties_count,
     }
     return render(request, 'owners/detail.html', context)
 
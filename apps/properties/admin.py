@@ -33,8 +33,8 @@ class PropertyDocumentInline(admin.TabularInline):
 class PropertyImageInline(admin.TabularInline):
     model = PropertyImage
     extra = 1
-    fields = ['image', 'title', 'caption', 'is_primary', 'order']
-    readonly_fields = ['uploaded_at']
+    fields = ['image', 'title', 'caption', 'is_primary', 'order', 'width', 'height']
+    readonly_fields = ['uploaded_at', 'width', 'height']
 
 
 class PropertyValuationInline(admin.TabularInline):
@@ -65,7 +65,7 @@ class PropertyAdmin(admin.ModelAdmin):
         'code', 'title', 'address', 'city', 
         'owner__name', 'description'
     ]
-    readonly_fields = ['code', 'created_at', 'updated_at']
+    readonly_fields = ['code', 'occupancy_rate', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Basic Information', {
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class PropertiesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.properties'
+    verbose_name = 'Properties'
+    
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.properties.signals
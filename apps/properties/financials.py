@@ -0,0 +1,206 @@
+"""
+Property revenue/expense time series
+Revenues and expenses are read once each, grouped by (property, year,
+month, type); every total, breakdown and ROI figure is derived from that
+in memory.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import PropertyExpense, PropertyRevenue
+
+ZERO = Decimal('0.00')
+
+# kind -> (model, date field, type field)
+SOURCES = {
+    'revenue': (PropertyRevenue, 'revenue_date', 'revenue_type'),
+    'expense': (PropertyExpense, 'expense_date', 'expense_type'),
+}
+
+
+class FinancialSeries:
+    """
+    Monthly revenue and expense totals of one property, split by type
+    """
+
+    def __init__(self):
+        # kind -> {(year, month, type): amount}
+        self.buckets = {kind: defaultdict(lambda: ZERO) for kind in SOURCES}
+
+    def add(self, kind, year, month, type_, amount):
+        self.buckets[kind][(year, month, type_)] += amount or ZERO
+
+    def total(self, kind, year=None, month=None):
+        return sum(
+            (
+                amount for (y, m, _), amount in self.buckets[kind].items()
+                if (year is None or y == year) and (month is None or m == month)
+            ),
+            ZERO,
+        )
+
+    def profit(self, year=None, month=None):
+        return self.total('revenue', year, month) - self.total('expense', year, month)
+
+    def by_type(self, kind, year=None):
+        """
+        [{'<kind>_type': type, 'total': amount}] largest first
+        """
+        totals = defaultdict(lambda: ZERO)
+        for (y, _, type_), amount in self.buckets[kind].items():
+            if year is None or y == year:
+                totals[type_] += amount
+        return [
+            {f'{kind}_type': type_, 'total': total}
+            for type_, total in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+    def monthly(self, year):
+        """
+        Revenue, expense and profit for each month of a year
+        """
+        rows = []
+        for month in range(1, 13):
+            revenue = self.total('revenue', year, month)
+            expense = self.total('expense', year, month)
+            rows.append({
+                'month': month,
+                'revenue': float(revenue),
+                'expense': float(expense),
+                'profit': float(revenue - expense),
+            })
+        return rows
+
+    def periods(self):
+        """
+        Every (year, month) with a revenue or expense
+        """
+        return sorted({(y, m) for kind in SOURCES for (y, m, _) in self.buckets[kind]})
+
+
+class PropertyFinancialService:
+    """
+    Financial figures of properties from grouped revenue/expense queries
+    """
+
+    @staticmethod
+    def grouped_rows(kind, property_ids=None, start=None, end=None):
+        """
+        (property_id, year, month, type, amount) rows of one kind, in one query
+        """
+        model, date_field, type_field = SOURCES[kind]
+        queryset = model.objects.all()
+        if property_ids is not None:
+            queryset = queryset.filter(property_id__in=property_ids)
+        if start is not None:
+            queryset = queryset.filter(**{f'{date_field}__gte': start})
+        if end is not None:
+            queryset = queryset.filter(**{f'{date_field}__lt': end})
+        return queryset.annotate(
+            year=ExtractYear(date_field),
+            month=ExtractMonth(date_field),
+        ).values('property_id', 'year', 'month', type_field).annotate(
+            amount=Sum('amount'),
+        ).order_by().values_list('property_id', 'year', 'month', type_field, 'amount')
+
+    @staticmethod
+    def series(property_ids=None, start=None, end=None):
+        """
+        {property_id: FinancialSeries} in two queries
+        """
+        result = defaultdict(FinancialSeries)
+        for kind in SOURCES:
+            for property_id, year, month, type_, amount in PropertyFinancialService.grouped_rows(
+                kind, property_ids, start, end
+            ):
+                result[property_id].add(kind, year, month, type_, amount)
+        return result
+
+    @staticmethod
+    def series_for(property_obj):
+        return PropertyFinancialService.series([property_obj.pk]).get(property_obj.pk, FinancialSeries())
+
+    @staticmethod
+    def roi(profit, investment):
+        """
+        Profit as a percentage of the investment, 0 without one
+        """
+        if not investment or investment <= 0:
+            return 0
+        return round(float(profit) / float(investment) * 100, 2)
+
+    @staticmethod
+    def investment(property_obj):
+        return property_obj.purchase_price or property_obj.market_value or 0
+
+    @staticmethod
+    def report(property_obj, today=None):
+        """
+        Figures for the property financial report page
+        """
+        today = today or timezone.now().date()
+        series = PropertyFinancialService.series_for(property_obj)
+        investment = PropertyFinancialService.investment(property_obj)
+        current_year, last_year = today.year, today.year - 1
+
+        total_revenue = series.total('revenue')
+        total_expenses = series.total('expense')
+        return {
+            'total_revenue': float(total_revenue),
+            'total_expenses': float(total_expenses),
+            'total_profit': float(total_revenue - total_expenses),
+            'current_year_revenue': float(series.total('revenue', current_year)),
+            'current_year_expense': float(series.total('expense', current_year)),
+            'current_year_profit': float(series.profit(current_year)),
+            'last_year_revenue': float(series.total('revenue', last_year)),
+            'last_year_expense': float(series.total('expense', last_year)),
+            'last_year_profit': float(series.profit(last_year)),
+            'current_roi': PropertyFinancialService.roi(series.profit(current_year), investment),
+            'lifetime_roi': PropertyFinancialService.roi(total_revenue - total_expenses, investment),
+            'monthly_data': series.monthly(current_year),
+            'expense_by_type': series.by_type('expense', current_year),
+            'revenue_by_type': series.by_type('revenue', current_year),
+            'current_year': current_year,
+            'last_year': last_year,
+        }
+
+    @staticmethod
+    def summary(property_obj, today=None):
+        """
+        Figures for the financial_summary API action
+        """
+        today = today or timezone.now().date()
+        series = PropertyFinancialService.series_for(property_obj)
+        total_revenues = series.total('revenue')
+        total_expenses = series.total('expense')
+        return {
+            'property_code': property_obj.code,
+            'total_revenues': float(total_revenues),
+            'total_expenses': float(total_expenses),
+            'net_income': float(total_revenues - total_expenses),
+            'current_year_revenues': float(series.total('revenue', today.year)),
+            'current_year_expenses': float(series.total('expense', today.year)),
+            'current_year_net_income': float(series.profit(today.year)),
+            'lifetime_roi': PropertyFinancialService.roi(
+                total_revenues - total_expenses, PropertyFinancialService.investment(property_obj)
+            ),
+            'rental_price_monthly': float(property_obj.rental_price_monthly or 0),
+            'market_value': float(property_obj.market_value or 0),
+            'purchase_price': float(property_obj.purchase_price or 0),
+            'occupancy_rate': float(property_obj.occupancy_rate or 0),
+            'average_roi': float(property_obj.average_roi or 0),
+            'monthly': [
+                {
+                    'year': year,
+                    'month': month,
+                    'revenue': float(series.total('revenue', year, month)),
+                    'expense': float(series.total('expense', year, month)),
+                    'profit': float(series.profit(year, month)),
+                }
+                for year, month in series.periods()
+            ],
+        }
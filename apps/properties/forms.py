@@ -2,6 +2,8 @@
 Forms for Properties app
 """
 from django import forms
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
 from django.utils import timezone
 from .models import (
     PropertyType,
@@ -55,7 +57,7 @@ class PropertyForm(forms.ModelForm):
             'total_floors', 'parking_spaces', 'year_built', 'is_furnished',
             'pets_allowed', 'energy_rating',
             'rental_price_monthly', 'purchase_price', 'market_value',
-            'occupancy_rate', 'average_roi',
+            'average_roi',
             'status', 'is_active', 'description', 'notes',
             'last_renovation_date',
             'has_elevator', 'has_garden', 'has_pool', 'has_security'
@@ -86,7 +88,6 @@ class PropertyForm(forms.ModelForm):
             'rental_price_monthly': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'purchase_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'market_value': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
-            'occupancy_rate': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'max': '100'}),
             'average_roi': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'status': forms.Select(attrs={'class': 'form-select'}),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
@@ -114,20 +115,13 @@ class PropertyForm(forms.ModelForm):
         """Generate a unique property code with yearly prefix."""
         year = timezone.now().year
         prefix = f"PROP-{year}-"
-        last_code = (
+        # Compare the numbers, not the text: '-10000' sorts before '-9999'
+        last_number = (
             Property.objects
-            .filter(code__startswith=prefix)
-            .order_by('-code')
-            .values_list('code', flat=True)
-            .first()
-        )
-        if last_code:
-            try:
-                last_number = int(last_code.rsplit('-', 1)[-1])
-            except (ValueError, AttributeError):
-                last_number = 0
-        else:
-            last_number = 0
+            .filter(code__regex=rf'^{prefix}[0-9]+$')
+            .annotate(number=Cast(Substr('code', len(prefix) + 1), IntegerField()))
+            .aggregate(last=Max('number'))['last']
+        ) or 0
 
         next_number = last_number + 1
         new_code = f"{prefix}{next_number:04d}"
@@ -0,0 +1,75 @@
+"""
+Geohash encoding and bounding-box cover
+A geohash names a cell of a fixed global grid; longer hashes are smaller
+cells nested inside shorter ones, so a B-tree index on the hash answers
+"everything in this cell" as a range scan.
+"""
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Sorts after every BASE32 character: [prefix, prefix + END) is one cell
+END = '~'
+
+
+def encode(latitude, longitude, precision=9):
+    """
+    Geohash of a point
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            bounds[0] = middle
+        else:
+            bits = bits * 2
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """
+    (height, width) of one cell in degrees
+    """
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def _steps(start, stop, step):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+
+def cover(south, west, north, east, max_cells=32, max_precision=9):
+    """
+    Smallest set of geohash prefixes covering a bounding box, using the
+    finest precision that needs at most max_cells cells. Empty when even
+    single-character cells are too many, i.e. the box is most of the world.
+    """
+    best = []
+    for precision in range(1, max_precision + 1):
+        height, width = cell_size(precision)
+        if ((north - south) / height + 2) * ((east - west) / width + 2) > max_cells * 4:
+            break
+        cells = {
+            encode(latitude, longitude, precision)
+            for latitude in _steps(south, north, height)
+            for longitude in _steps(west, east, width)
+        }
+        if len(cells) > max_cells:
+            break
+        best = sorted(cells)
+    return best
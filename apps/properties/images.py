@@ -0,0 +1,164 @@
+"""
+Property image renditions - fixed thumbnail/medium/large sizes in JPEG and
+WebP, decoded once per upload and stripped of EXIF metadata
+"""
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import OuterRef, Subquery
+from PIL import Image, ImageOps
+
+ORIENTATION_TAG = 0x0112
+
+
+class PropertyImageService:
+    """Generate, locate and remove derived files of a PropertyImage"""
+
+    # name: (width, height, crop); thumbnails are cropped to fill grid cards
+    RENDITIONS = {
+        'thumbnail': (320, 240, True),
+        'medium': (800, 800, False),
+        'large': (1600, 1600, False),
+    }
+    FORMATS = {
+        'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+        'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    }
+    UPLOAD_DIR = 'properties/renditions'
+
+    @staticmethod
+    def path_for(image_obj, name, fmt):
+        """Storage path of one rendition, grouped per image"""
+        stem = posixpath.splitext(posixpath.basename(image_obj.image.name))[0]
+        extension = PropertyImageService.FORMATS[fmt][1]
+        return f'{PropertyImageService.UPLOAD_DIR}/{image_obj.pk}/{stem}_{name}.{extension}'
+
+    @staticmethod
+    def _open(field):
+        """
+        Decode the original upright and flattened to RGB; JPEGs are decoded
+        at a reduced scale when the largest rendition allows it
+        """
+        field.open('rb')
+        try:
+            with Image.open(field) as original:
+                width, height = original.size
+                # Orientations 5-8 are stored rotated by 90 degrees
+                if original.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+                    width, height = height, width
+                largest = max(size[0] for size in PropertyImageService.RENDITIONS.values())
+                original.draft('RGB', (largest, largest))
+                upright = ImageOps.exif_transpose(original)
+                if upright.mode in ('RGBA', 'LA', 'P'):
+                    upright = upright.convert('RGBA')
+                    background = Image.new('RGB', upright.size, 'white')
+                    background.paste(upright, mask=upright.getchannel('A'))
+                    upright = background
+                elif upright.mode != 'RGB':
+                    upright = upright.convert('RGB')
+                upright.load()
+        finally:
+            field.close()
+        return upright, width, height
+
+    @staticmethod
+    def _resize(picture, width, height, crop):
+        if crop:
+            return ImageOps.fit(picture, (width, height), Image.LANCZOS)
+        resized = picture.copy()
+        resized.thumbnail((width, height), Image.LANCZOS)
+        return resized
+
+    @staticmethod
+    def generate(image_obj):
+        """
+        (Re)build every rendition of image_obj and save the dimensions.
+        Returns False when the upload cannot be decoded; templates then fall
+        back to the original file.
+        """
+        if not image_obj.image:
+            return False
+        try:
+            picture, width, height = PropertyImageService._open(image_obj.image)
+        except (OSError, Image.DecompressionBombError):
+            return False
+
+        PropertyImageService.delete_files(image_obj)
+        storage = image_obj.image.storage
+        renditions = {}
+        for name, (max_width, max_height, crop) in PropertyImageService.RENDITIONS.items():
+            resized = PropertyImageService._resize(picture, max_width, max_height, crop)
+            rendition = {'width': resized.width, 'height': resized.height}
+            for fmt, (pil_format, _extension, options) in PropertyImageService.FORMATS.items():
+                # No exif= argument: Pillow writes no metadata unless asked
+                buffer = BytesIO()
+                resized.save(buffer, pil_format, **options)
+                path = PropertyImageService.path_for(image_obj, name, fmt)
+                rendition[fmt] = storage.save(path, ContentFile(buffer.getvalue()))
+            renditions[name] = rendition
+
+        image_obj.width = width
+        image_obj.height = height
+        image_obj.renditions = renditions
+        type(image_obj).objects.filter(pk=image_obj.pk).update(
+            width=width, height=height, renditions=renditions
+        )
+        return True
+
+    @staticmethod
+    def delete_files(image_obj):
+        """Remove the stored renditions of image_obj, if any"""
+        storage = image_obj.image.storage
+        for rendition in (image_obj.renditions or {}).values():
+            for fmt in PropertyImageService.FORMATS:
+                path = rendition.get(fmt)
+                if path and storage.exists(path):
+                    storage.delete(path)
+
+    @staticmethod
+    def url(image_obj, name='medium', fmt='jpeg'):
+        """URL of a rendition, or of the original while none exists"""
+        path = (image_obj.renditions or {}).get(name, {}).get(fmt)
+        if path:
+            return image_obj.image.storage.url(path)
+        return image_obj.image.url if image_obj.image else ''
+
+    @staticmethod
+    def srcset(image_obj, fmt='jpeg'):
+        """srcset attribute value across the uncropped sizes"""
+        renditions = image_obj.renditions or {}
+        storage = image_obj.image.storage
+        return ', '.join(
+            f"{storage.url(renditions[name][fmt])} {renditions[name]['width']}w"
+            for name, (_width, _height, crop) in PropertyImageService.RENDITIONS.items()
+            if not crop and name in renditions
+        )
+
+    @staticmethod
+    def backfill(queryset, force=False, chunk_size=100):
+        """
+        Generate renditions for images of queryset that have none (or all
+        of them with force). Returns (processed, failed).
+        """
+        if not force:
+            queryset = queryset.filter(renditions={})
+        processed = failed = 0
+        for image_obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+            if PropertyImageService.generate(image_obj):
+                processed += 1
+            else:
+                failed += 1
+        return processed, failed
+
+    @staticmethod
+    def sync_primary_images(property_queryset):
+        """
+        Recompute Property.primary_image from is_primary flags in one
+        UPDATE; returns the number of properties written
+        """
+        image_model = property_queryset.model._meta.get_field('primary_image').related_model
+        primary = image_model.objects.filter(
+            property=OuterRef('pk'), is_primary=True
+        ).order_by('-uploaded_at', '-pk').values('pk')[:1]
+        return property_queryset.update(primary_image=Subquery(primary))
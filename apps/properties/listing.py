@@ -0,0 +1,152 @@
+"""
+Property list filtering, keyset pagination and summary cards
+"""
+import hashlib
+import json
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from apps.core.pagination import KeysetPaginator
+from apps.core.search import SearchService
+
+
+class PropertyListingService:
+    """
+    Query side of the property list
+    """
+
+    # ?sort= option -> ordering; the id tiebreaker is added by the paginator
+    SORTS = {
+        'newest': '-created_at',
+        'oldest': 'created_at',
+        'code': 'code',
+        'title': 'title',
+        'rent_high': '-rental_price_monthly',
+        'rent_low': 'rental_price_monthly',
+        'area_high': '-area_sqm',
+        'area_low': 'area_sqm',
+    }
+    DEFAULT_SORT = '-created_at'
+    # Searches without an explicit ?sort= are ordered by rank
+    RELEVANCE = 'relevance'
+    # Nullable sort columns and the value NULLs sort as
+    NULL_VALUES = {
+        'rental_price_monthly': Decimal('0'),
+    }
+
+    SUMMARY_CACHE_TIMEOUT = 60 * 10
+    SUMMARY_VERSION_KEY = 'properties:summary_version'
+
+    @staticmethod
+    def filter_queryset(queryset, filters):
+        """
+        Apply PropertySearchForm cleaned_data to a queryset
+        """
+        if filters.get('property_type'):
+            queryset = queryset.filter(property_type=filters['property_type'])
+
+        if filters.get('status'):
+            queryset = queryset.filter(status=filters['status'])
+
+        if filters.get('city'):
+            queryset = queryset.filter(city__icontains=filters['city'])
+
+        if filters.get('min_rent') is not None:
+            queryset = queryset.filter(rental_price_monthly__gte=filters['min_rent'])
+
+        if filters.get('max_rent') is not None:
+            queryset = queryset.filter(rental_price_monthly__lte=filters['max_rent'])
+
+        if filters.get('bedrooms') is not None:
+            queryset = queryset.filter(bedrooms__gte=filters['bedrooms'])
+
+        if filters.get('is_furnished') is not None:
+            queryset = queryset.filter(is_furnished=filters['is_furnished'])
+
+        search = filters.get('search')
+        if search:
+            # Last, so ranking only considers rows that pass the other filters
+            queryset = SearchService.search(queryset, search)
+
+        return queryset
+
+    @staticmethod
+    def ordering(sort_option):
+        return PropertyListingService.SORTS.get(sort_option, PropertyListingService.DEFAULT_SORT)
+
+    @staticmethod
+    def sort_option(params, filters):
+        """
+        ?sort= value, or relevance when searching without one
+        """
+        if params.get('sort'):
+            return params['sort']
+        if filters.get('search'):
+            return PropertyListingService.RELEVANCE
+        return 'newest'
+
+    @staticmethod
+    def keyset_page(queryset, sort_option, per_page, cursor=None):
+        """
+        One keyset page of the queryset in the given sort order
+        """
+        ordering = PropertyListingService.ordering(sort_option)
+        paginator = KeysetPaginator(
+            queryset,
+            ordering,
+            per_page,
+            null_value=PropertyListingService.NULL_VALUES.get(ordering.lstrip('-')),
+        )
+        return paginator.page(cursor)
+
+    @staticmethod
+    def filter_signature(filters):
+        """
+        Stable hash of the applied filters
+        """
+        normalized = {
+            key: getattr(value, 'pk', value)
+            for key, value in filters.items()
+            if value not in (None, '')
+        }
+        payload = json.dumps(normalized, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @staticmethod
+    def summary_version():
+        version = cache.get(PropertyListingService.SUMMARY_VERSION_KEY)
+        if version is None:
+            cache.add(PropertyListingService.SUMMARY_VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(PropertyListingService.SUMMARY_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def invalidate_summary():
+        cache.set(PropertyListingService.SUMMARY_VERSION_KEY, time.time_ns(), timeout=None)
+
+    @staticmethod
+    def summary(queryset, filters):
+        """
+        Summary card values for the filtered queryset in one aggregate,
+        cached per filter signature until a Property changes
+        """
+        key = 'properties:summary:{}:{}'.format(
+            PropertyListingService.summary_version(),
+            PropertyListingService.filter_signature(filters),
+        )
+        summary = cache.get(key)
+        if summary is None:
+            summary = queryset.order_by().aggregate(
+                total=Count('id'),
+                available=Count('id', filter=Q(status='available')),
+                rented=Count('id', filter=Q(status='rented')),
+                maintenance=Count('id', filter=Q(status='maintenance')),
+                active=Count('id', filter=Q(is_active=True)),
+                total_value=Sum('market_value'),
+            )
+            summary['total_value'] = summary['total_value'] or 0
+            cache.set(key, summary, PropertyListingService.SUMMARY_CACHE_TIMEOUT)
+        return summary
@@ -0,0 +1,30 @@
+"""
+Management command to build thumbnail/medium/large JPEG and WebP renditions
+for property images uploaded before the pipeline existed
+Usage: python manage.py generate_image_renditions [--property CODE] [--force]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties.images import PropertyImageService
+from apps.properties.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = 'Generate missing PropertyImage renditions (all of them with --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--property', help='Only images of the property with this code')
+        parser.add_argument('--force', action='store_true', help='Regenerate existing renditions too')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Rows fetched per query')
+
+    def handle(self, *args, **options):
+        queryset = PropertyImage.objects.all()
+        if options['property']:
+            queryset = queryset.filter(property__code=options['property'])
+        processed, failed = PropertyImageService.backfill(
+            queryset, force=options['force'], chunk_size=options['chunk_size']
+        )
+        self.stdout.write(f'✓ {processed} image(s) rendered')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} image(s) could not be decoded, originals kept'))
+        self.stdout.write(self.style.SUCCESS('Image renditions generated.'))
@@ -0,0 +1,25 @@
+"""
+Management command to recompute property occupancy rates (run nightly)
+Usage: python manage.py refresh_occupancy [--chunk-size 500]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties.occupancy import OccupancyService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Property.occupancy_rate from contracts over the trailing 12 months'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=OccupancyService.CHUNK_SIZE,
+            help='Properties per contract query and UPDATE batch',
+        )
+
+    def handle(self, *args, **options):
+        start, end = OccupancyService.window()
+        changed = OccupancyService.refresh(chunk_size=options['chunk_size'])
+        self.stdout.write(f'✓ Window {start} to {end}: {changed} occupancy rate(s) changed')
+        self.stdout.write(self.style.SUCCESS('Occupancy refreshed.'))
@@ -0,0 +1,24 @@
+"""
+Management command to rebuild the denormalized Property.primary_image
+Usage: python manage.py sync_primary_images [--property CODE]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.properties.images import PropertyImageService
+from apps.properties.models import Property
+
+
+class Command(BaseCommand):
+    help = 'Point Property.primary_image at the image flagged is_primary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--property', help='Only the property with this code')
+
+    def handle(self, *args, **options):
+        queryset = Property.objects.all()
+        if options['property']:
+            queryset = queryset.filter(code=options['property'])
+        updated = PropertyImageService.sync_primary_images(queryset)
+        with_image = queryset.filter(primary_image__isnull=False).count()
+        self.stdout.write(f'✓ {updated} propert(ies) synced, {with_image} with a primary image')
+        self.stdout.write(self.style.SUCCESS('Primary images synced.'))
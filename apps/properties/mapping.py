@@ -0,0 +1,212 @@
+"""
+Property map markers and clusters
+Markers are read with values_list for the visible bounding box only, found
+through the geohash index. Below CLUSTER_MAX_ZOOM they are grouped on a
+geohash prefix in one aggregate query. Payloads are cached per map version
+and query string, and the same key doubles as the ETag.
+"""
+import hashlib
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import Substr
+
+from . import geohash
+
+# Leaflet zoom -> geohash prefix length clusters are grouped on
+CLUSTER_PRECISION = [
+    (3, 2),
+    (5, 3),
+    (8, 4),
+    (10, 5),
+    (12, 6),
+]
+
+
+class InvalidBoundingBox(ValueError):
+    pass
+
+
+class PropertyMapService:
+    """
+    Query side of the property map
+    """
+
+    CLUSTER_MAX_ZOOM = 13
+    MAX_MARKERS = 2000
+    MARKER_FIELDS = ['id', 'code', 'title', 'status', 'rental_price_monthly', 'city', 'latitude', 'longitude']
+    CACHE_TIMEOUT = 60 * 10
+    VERSION_KEY = 'properties:map_version'
+
+    @staticmethod
+    def parse_bbox(value):
+        """
+        Leaflet's toBBoxString() order: "west,south,east,north".
+        Returns (south, west, north, east) or None when not given.
+        """
+        if not value:
+            return None
+        try:
+            west, south, east, north = (float(Decimal(part)) for part in value.split(','))
+        except (ValueError, InvalidOperation):
+            raise InvalidBoundingBox(value)
+        south, north = max(south, -90.0), min(north, 90.0)
+        if east - west >= 360:
+            west, east = -180.0, 180.0
+        west, east = max(west, -180.0), min(east, 180.0)
+        if south > north or west > east:
+            raise InvalidBoundingBox(value)
+        return south, west, north, east
+
+    @staticmethod
+    def parse_zoom(value):
+        try:
+            return max(0, min(int(value), 20))
+        except (TypeError, ValueError):
+            return PropertyMapService.CLUSTER_MAX_ZOOM
+
+    @staticmethod
+    def cluster_precision(zoom):
+        """
+        Prefix length to cluster on at a zoom level, or None for single markers
+        """
+        if zoom >= PropertyMapService.CLUSTER_MAX_ZOOM:
+            return None
+        for max_zoom, precision in CLUSTER_PRECISION:
+            if zoom <= max_zoom:
+                return precision
+        return CLUSTER_PRECISION[-1][1]
+
+    @staticmethod
+    def located(queryset):
+        return queryset.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
+
+    @staticmethod
+    def in_bbox(queryset, bbox):
+        """
+        Properties inside the box: geohash ranges narrow the scan, the
+        coordinate filter trims the cell edges
+        """
+        queryset = PropertyMapService.located(queryset)
+        if bbox is None:
+            return queryset
+        south, west, north, east = bbox
+        cells = geohash.cover(south, west, north, east)
+        if cells and len(cells[0]) > 1:
+            ranges = Q()
+            for cell in cells:
+                ranges |= Q(geohash__gte=cell, geohash__lt=cell + geohash.END)
+            queryset = queryset.filter(ranges)
+        return queryset.filter(
+            latitude__gte=south, latitude__lte=north,
+            longitude__gte=west, longitude__lte=east,
+        )
+
+    @staticmethod
+    def extent(queryset):
+        """
+        Bounds and count of every located property in one query
+        """
+        return PropertyMapService.located(queryset).aggregate(
+            count=Count('id'),
+            south=Min('latitude'),
+            west=Min('longitude'),
+            north=Max('latitude'),
+            east=Max('longitude'),
+        )
+
+    @staticmethod
+    def _float(value):
+        return float(value) if value is not None else None
+
+    @staticmethod
+    def markers(queryset, bbox):
+        """
+        Compact rows in MARKER_FIELDS order, capped at MAX_MARKERS
+        """
+        rows = PropertyMapService.in_bbox(queryset, bbox).order_by('id').values_list(
+            *PropertyMapService.MARKER_FIELDS
+        )[:PropertyMapService.MAX_MARKERS + 1]
+        markers = [
+            [pk, code, title, status, PropertyMapService._float(rent), city, float(latitude), float(longitude)]
+            for pk, code, title, status, rent, city, latitude, longitude in rows
+        ]
+        truncated = len(markers) > PropertyMapService.MAX_MARKERS
+        return markers[:PropertyMapService.MAX_MARKERS], truncated
+
+    @staticmethod
+    def clusters(queryset, bbox, precision):
+        """
+        [latitude, longitude, count, cell] per geohash prefix, grouped in the database
+        """
+        rows = PropertyMapService.in_bbox(queryset, bbox).annotate(
+            cell=Substr('geohash', 1, precision)
+        ).values('cell').annotate(
+            count=Count('id'),
+            latitude=Avg('latitude'),
+            longitude=Avg('longitude'),
+        ).order_by('cell')
+        return [
+            [round(float(row['latitude']), 6), round(float(row['longitude']), 6), row['count'], row['cell']]
+            for row in rows
+        ]
+
+    @staticmethod
+    def payload(queryset, bbox, zoom):
+        precision = PropertyMapService.cluster_precision(zoom)
+        if precision is not None:
+            return {
+                'zoom': zoom,
+                'clustered': True,
+                'fields': ['latitude', 'longitude', 'count', 'cell'],
+                'clusters': PropertyMapService.clusters(queryset, bbox, precision),
+            }
+        markers, truncated = PropertyMapService.markers(queryset, bbox)
+        return {
+            'zoom': zoom,
+            'clustered': False,
+            'fields': PropertyMapService.MARKER_FIELDS,
+            'markers': markers,
+            'truncated': truncated,
+        }
+
+    @staticmethod
+    def version():
+        version = cache.get(PropertyMapService.VERSION_KEY)
+        if version is None:
+            cache.add(PropertyMapService.VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(PropertyMapService.VERSION_KEY)
+        return version
+
+    @staticmethod
+    def invalidate():
+        cache.set(PropertyMapService.VERSION_KEY, time.time_ns(), timeout=None)
+
+    @staticmethod
+    def etag(queryset, params):
+        """
+        Changes whenever any Property changes, the request parameters differ
+        or the queryset does: endpoints that filter differently on the same
+        parameters never share an entry
+        """
+        query = '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+        digest = hashlib.sha1(f'{queryset.query}\n{query}'.encode()).hexdigest()
+        return f'{PropertyMapService.version()}-{digest}'
+
+    @staticmethod
+    def cached_payload(queryset, params):
+        """
+        (etag, payload) for request parameters, computed once per map version.
+        Raises InvalidBoundingBox for a malformed bbox.
+        """
+        bbox = PropertyMapService.parse_bbox(params.get('bbox'))
+        zoom = PropertyMapService.parse_zoom(params.get('zoom'))
+        etag = PropertyMapService.etag(queryset, params)
+        key = f'properties:map:{etag}'
+        payload = cache.get(key)
+        if payload is None:
+            payload = PropertyMapService.payload(queryset, bbox, zoom)
+            cache.set(key, payload, PropertyMapService.CACHE_TIMEOUT)
+        return etag, payload
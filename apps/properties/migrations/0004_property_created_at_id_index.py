@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owners', '0002_remove_owner_tax_number_owner_mobile_owner_tax_id'),
+        ('properties', '0003_property_is_for_sale_property_sale_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'id'], name='properties__created_25bd25_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+from apps.properties import geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    located = Property.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
+    batch = []
+    for prop in located.only('id', 'latitude', 'longitude').iterator(chunk_size=500):
+        prop.geohash = geohash.encode(prop.latitude, prop.longitude)
+        batch.append(prop)
+        if len(batch) >= 500:
+            Property.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Property.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owners', '0002_remove_owner_tax_number_owner_mobile_owner_tax_id'),
+        ('properties', '0004_property_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['geohash'], name='properties__geohash_260a12_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
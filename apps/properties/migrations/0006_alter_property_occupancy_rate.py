@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_geohash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='occupancy_rate',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Share of the last 12 months covered by contracts (0-100)', max_digits=5, null=True, verbose_name='Occupancy Rate'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 12:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_primary_image(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+    primary = PropertyImage.objects.filter(
+        property=OuterRef('pk'), is_primary=True
+    ).order_by('-uploaded_at', '-pk').values('pk')[:1]
+    Property.objects.update(primary_image=Subquery(primary))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_property_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='properties.propertyimage', verbose_name='Primary Image'),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
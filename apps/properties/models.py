@@ -7,6 +7,9 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from apps.owners.models import Owner
 
+from . import geohash
+from .images import PropertyImageService
+
 
 class PropertyType(models.Model):
     """
@@ -76,6 +79,8 @@ class Property(models.Model):
         null=True,
         blank=True
     )
+    # Maintained from latitude/longitude on save; see geohash.py
+    geohash = models.CharField(_('Geohash'), max_length=12, blank=True, editable=False)
     virtual_tour_url = models.URLField(_('Virtual Tour URL'), blank=True)
     video_url = models.URLField(_('Video URL'), blank=True)
     
@@ -135,7 +140,7 @@ class Property(models.Model):
         decimal_places=2,
         null=True,
         blank=True,
-        help_text=_('Occupancy percentage (0-100)')
+        help_text=_('Share of the last 12 months covered by contracts (0-100)')
     )
     average_roi = models.DecimalField(
         _('Average ROI'),
@@ -166,6 +171,17 @@ class Property(models.Model):
         help_text=_('Property sale price')
     )
     
+    # Denormalized from PropertyImage.is_primary so lists need no image query
+    primary_image = models.ForeignKey(
+        'PropertyImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('Primary Image')
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
@@ -179,11 +195,25 @@ class Property(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['city']),
             models.Index(fields=['is_active']),
+            # Keyset pagination on the default sort
+            models.Index(fields=['created_at', 'id']),
+            # Map bounding-box lookups
+            models.Index(fields=['geohash']),
         ]
 
     def __str__(self):
         return f"{self.code} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
     def get_active_contract(self):
         """Get active contract for this property."""
         return self.contracts.filter(status='active').first()
@@ -281,6 +311,15 @@ class PropertyImage(models.Model):
     is_primary = models.BooleanField(_('Primary Image'), default=False)
     order = models.IntegerField(_('Order'), default=0)
     uploaded_at = models.DateTimeField(_('Uploaded At'), auto_now_add=True)
+    width = models.PositiveIntegerField(_('Width'), null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(_('Height'), null=True, blank=True, editable=False)
+    renditions = models.JSONField(
+        _('Renditions'),
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Derived sizes: {name: {width, height, jpeg, webp}}')
+    )
 
     class Meta:
         verbose_name = _('Property Image')
@@ -291,13 +330,44 @@ class PropertyImage(models.Model):
         return f"{self.property.code} - Image {self.order}"
 
     def save(self, *args, **kwargs):
-        """Ensure only one primary image per property."""
+        """Ensure only one primary image per property; render new uploads."""
         if self.is_primary:
             PropertyImage.objects.filter(
                 property=self.property,
                 is_primary=True
             ).update(is_primary=False)
+        uploaded = bool(self.image) and not self.image._committed
         super().save(*args, **kwargs)
+        if uploaded:
+            PropertyImageService.generate(self)
+        self.sync_primary_image()
+
+    def sync_primary_image(self):
+        """Point Property.primary_image at this image, or away from it."""
+        stale = Property.objects.filter(primary_image=self)
+        if self.is_primary:
+            stale = stale.exclude(pk=self.property_id)
+            Property.objects.filter(pk=self.property_id).update(primary_image=self)
+        stale.update(primary_image=None)
+
+    # Methods rather than properties: the "property" field shadows the builtin
+    def thumbnail_url(self):
+        return PropertyImageService.url(self, 'thumbnail')
+
+    def thumbnail_webp_url(self):
+        return PropertyImageService.url(self, 'thumbnail', 'webp')
+
+    def medium_url(self):
+        return PropertyImageService.url(self, 'medium')
+
+    def large_url(self):
+        return PropertyImageService.url(self, 'large')
+
+    def srcset(self):
+        return PropertyImageService.srcset(self)
+
+    def webp_srcset(self):
+        return PropertyImageService.srcset(self, 'webp')
 
 
 class PropertyValuation(models.Model):
@@ -0,0 +1,217 @@
+"""
+Occupancy and vacancy timelines
+Contract date ranges are read in one ordered query, merged into occupied
+intervals per property and compared against a window to derive vacancy
+gaps and the persisted Property.occupancy_rate.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.contracts.models import Contract
+from .models import Property
+
+ONE_DAY = timedelta(days=1)
+
+
+def merge_intervals(intervals):
+    """
+    Merge (start, end) date ranges, inclusive of both ends, sorted by start.
+    Adjacent or overlapping ranges become one.
+    """
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class OccupancyTimeline:
+    """
+    Occupied and vacant intervals of one property within a window
+    """
+
+    def __init__(self, property_id, window_start, window_end, intervals):
+        self.property_id = property_id
+        self.window_start = window_start
+        self.window_end = window_end
+        self.occupied = [
+            (max(start, window_start), min(end, window_end))
+            for start, end in merge_intervals(intervals)
+            if start <= window_end and end >= window_start
+        ]
+
+    @property
+    def total_days(self):
+        return (self.window_end - self.window_start).days + 1
+
+    @property
+    def occupied_days(self):
+        return sum((end - start).days + 1 for start, end in self.occupied)
+
+    @property
+    def vacant_days(self):
+        return self.total_days - self.occupied_days
+
+    @property
+    def vacancies(self):
+        """
+        Gaps between occupied intervals, including the window edges
+        """
+        gaps = []
+        cursor = self.window_start
+        for start, end in self.occupied:
+            if start > cursor:
+                gaps.append((cursor, start - ONE_DAY))
+            cursor = end + ONE_DAY
+        if cursor <= self.window_end:
+            gaps.append((cursor, self.window_end))
+        return gaps
+
+    @property
+    def rate(self):
+        """
+        Occupied share of the window in percent, two decimals
+        """
+        if self.total_days <= 0:
+            return Decimal('0.00')
+        return (Decimal(self.occupied_days) * 100 / self.total_days).quantize(Decimal('0.01'))
+
+    def is_occupied_on(self, day):
+        return any(start <= day <= end for start, end in self.occupied)
+
+
+class OccupancyService:
+    """
+    Compute, persist and aggregate property occupancy
+    """
+
+    # Contracts that held the property for their date range
+    OCCUPYING_STATUSES = ['active', 'expired', 'renewed', 'terminated']
+    WINDOW_DAYS = 365
+    CHUNK_SIZE = 500
+
+    @staticmethod
+    def window(today=None):
+        """
+        Trailing window the persisted rate is measured over
+        """
+        today = today or timezone.now().date()
+        return today - timedelta(days=OccupancyService.WINDOW_DAYS - 1), today
+
+    @staticmethod
+    def contract_intervals(property_ids=None, start=None, end=None):
+        """
+        {property_id: [(start, end), ...]} ordered by start, in one query
+        """
+        contracts = Contract.objects.filter(status__in=OccupancyService.OCCUPYING_STATUSES)
+        if property_ids is not None:
+            contracts = contracts.filter(property_id__in=property_ids)
+        if start is not None:
+            contracts = contracts.filter(end_date__gte=start)
+        if end is not None:
+            contracts = contracts.filter(start_date__lte=end)
+        rows = contracts.order_by('property_id', 'start_date').values_list(
+            'property_id', 'start_date', 'end_date'
+        )
+        return {
+            property_id: [(start_date, end_date) for _, start_date, end_date in group]
+            for property_id, group in groupby(rows, key=lambda row: row[0])
+        }
+
+    @staticmethod
+    def timelines(property_ids, start=None, end=None):
+        """
+        {property_id: OccupancyTimeline} over the trailing window by default
+        """
+        default_start, default_end = OccupancyService.window()
+        start = start or default_start
+        end = end or default_end
+        intervals = OccupancyService.contract_intervals(property_ids, start, end)
+        return {
+            property_id: OccupancyTimeline(property_id, start, end, intervals.get(property_id, []))
+            for property_id in property_ids
+        }
+
+    @staticmethod
+    def history(property_obj, today=None):
+        """
+        Timeline from the first contract (or creation) until today
+        """
+        today = today or timezone.now().date()
+        intervals = OccupancyService.contract_intervals([property_obj.pk], end=today).get(property_obj.pk, [])
+        start = intervals[0][0] if intervals else timezone.localdate(property_obj.created_at)
+        return OccupancyTimeline(property_obj.pk, min(start, today), today, intervals)
+
+    @staticmethod
+    def refresh(property_ids=None, chunk_size=None, today=None):
+        """
+        Recompute occupancy_rate over the trailing window, one contract
+        query and one UPDATE batch per chunk. Returns the number of
+        properties whose rate changed.
+        """
+        chunk_size = chunk_size or OccupancyService.CHUNK_SIZE
+        start, end = OccupancyService.window(today)
+        properties = Property.objects.order_by('pk')
+        if property_ids is not None:
+            properties = properties.filter(pk__in=property_ids)
+
+        changed = 0
+        last_pk = 0
+        while True:
+            chunk = list(properties.filter(pk__gt=last_pk).only('pk', 'occupancy_rate')[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            timelines = OccupancyService.timelines([prop.pk for prop in chunk], start, end)
+            dirty = []
+            for prop in chunk:
+                rate = timelines[prop.pk].rate
+                if prop.occupancy_rate != rate:
+                    prop.occupancy_rate = rate
+                    dirty.append(prop)
+            Property.objects.bulk_update(dirty, ['occupancy_rate'])
+            changed += len(dirty)
+            if len(chunk) < chunk_size:
+                break
+        return changed
+
+    @staticmethod
+    def vacancy_by(group_by, today=None):
+        """
+        Portfolio vacancy per city or property type in one query, from the
+        persisted rates plus whether a contract covers today
+        """
+        today = today or timezone.now().date()
+        field = {'city': 'city', 'property_type': 'property_type__name'}[group_by]
+        occupied_today = Contract.objects.filter(
+            property=OuterRef('pk'),
+            status__in=OccupancyService.OCCUPYING_STATUSES,
+            start_date__lte=today,
+            end_date__gte=today,
+        )
+        rows = Property.objects.filter(is_active=True).annotate(
+            occupied_today=Exists(occupied_today)
+        ).values(field).annotate(
+            properties=Count('id'),
+            vacant_now=Count('id', filter=Q(occupied_today=False)),
+            average_occupancy=Avg(Coalesce('occupancy_rate', Value(Decimal('0')))),
+        ).order_by(field)
+        results = []
+        for row in rows:
+            average = row['average_occupancy'] or 0
+            results.append({
+                'label': row[field],
+                'properties': row['properties'],
+                'vacant_now': row['vacant_now'],
+                'average_occupancy': round(float(average), 2),
+                'vacancy_rate': round(100 - float(average), 2),
+            })
+        return sorted(results, key=lambda row: row['vacancy_rate'], reverse=True)
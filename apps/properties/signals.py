@@ -0,0 +1,64 @@
+"""
+Signals for Properties module - list summary and map caches, occupancy,
+image renditions
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.contracts.models import Contract
+from .images import PropertyImageService
+from .listing import PropertyListingService
+from .mapping import PropertyMapService
+from .models import Property, PropertyImage
+from .occupancy import OccupancyService
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_summary(sender, instance, **kwargs):
+    """
+    Drop cached summary cards of every filter combination
+    """
+    PropertyListingService.invalidate_summary()
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_map(sender, instance, **kwargs):
+    """
+    Drop cached map payloads; their ETags change with the version
+    """
+    PropertyMapService.invalidate()
+
+
+@receiver(pre_save, sender=Contract)
+def remember_contract_property(sender, instance, raw=False, **kwargs):
+    """
+    Remember the previous property so moving a contract refreshes both
+    """
+    instance._occupancy_previous_property_id = None
+    if instance.pk and not raw:
+        instance._occupancy_previous_property_id = Contract.objects.filter(
+            pk=instance.pk
+        ).values_list('property_id', flat=True).first()
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def refresh_contract_occupancy(sender, instance, raw=False, **kwargs):
+    """
+    Recompute occupancy_rate of the properties a contract change touches
+    """
+    if raw:
+        return
+    property_ids = {instance.property_id, getattr(instance, '_occupancy_previous_property_id', None)}
+    OccupancyService.refresh([property_id for property_id in property_ids if property_id])
+
+
+
+@receiver(post_delete, sender=PropertyImage)
+def delete_image_renditions(sender, instance, **kwargs):
+    """
+    Derived files go with their image row
+    """
+    PropertyImageService.delete_files(instance)
@@ -0,0 +1,282 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from apps.contracts.models import Contract
+from apps.core.testing import create_client, create_owner, create_property
+from apps.properties import geohash
+from apps.properties.financials import PropertyFinancialService
+from apps.properties.images import PropertyImageService
+from apps.properties.mapping import PropertyMapService
+from apps.properties.models import Property, PropertyExpense, PropertyImage, PropertyRevenue, PropertyType
+from apps.properties.occupancy import OccupancyService, merge_intervals
+
+
+class PropertyMapTests(TestCase):
+    """Map data is limited to the viewport, clustered when zoomed out and revalidated by ETag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_owner('OWN-M')
+        points = [
+            ('30.044400', '31.235700'), ('30.050000', '31.240000'),  # Cairo
+            ('31.200100', '29.918700'),  # Alexandria
+            (None, None),
+        ]
+        for index, (latitude, longitude) in enumerate(points):
+            create_property(
+                f'M-{index}', owner,
+                latitude=latitude and Decimal(latitude),
+                longitude=longitude and Decimal(longitude),
+            )
+        cls.user = User.objects.create_user('mapper', password='pass', is_staff=True)
+
+    def test_geohash_follows_coordinates(self):
+        prop = Property.objects.get(code='M-0')
+        self.assertEqual(prop.geohash, geohash.encode('30.044400', '31.235700'))
+        prop.latitude = prop.longitude = None
+        prop.save(update_fields=['latitude', 'longitude'])
+        prop.refresh_from_db()
+        self.assertEqual(prop.geohash, '')
+
+    def test_bbox_returns_only_visible_markers(self):
+        payload = PropertyMapService.payload(Property.objects.all(), (29.9, 31.1, 30.2, 31.5), 15)
+        self.assertFalse(payload['clustered'])
+        codes = sorted(row[payload['fields'].index('code')] for row in payload['markers'])
+        self.assertEqual(codes, ['M-0', 'M-1'])
+
+    def test_low_zoom_is_clustered(self):
+        with self.assertNumQueries(1):
+            payload = PropertyMapService.payload(Property.objects.all(), None, 5)
+        self.assertTrue(payload['clustered'])
+        self.assertEqual(sorted(row[2] for row in payload['clusters']), [1, 2])
+
+    def test_etag_revalidation(self):
+        self.client.force_login(self.user)
+        url = reverse('properties:map_data')
+        params = {'bbox': '29,29,32,32', 'zoom': 14}
+        response = self.client.get(url, params)
+        self.assertEqual(len(response.json()['markers']), 3)
+        etag = response['ETag']
+
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Property.objects.get(code='M-2').save()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(url, {'bbox': 'x'}).status_code, 400)
+
+    def test_endpoints_do_not_share_cached_payloads(self):
+        Property.objects.filter(code='M-2').update(status='rented')
+        self.client.force_login(self.user)
+        params = {'bbox': '29,29,32,32', 'zoom': 14, 'status': 'rented'}
+        api = self.client.get('/en/api/v1/properties/map_data/', params)
+        self.assertEqual(len(api.json()['markers']), 1)
+        # The web endpoint ignores filters, so the same parameters show every marker
+        web = self.client.get(reverse('properties:map_data'), params)
+        self.assertEqual(len(web.json()['markers']), 3)
+        self.assertNotEqual(web['ETag'], api['ETag'])
+
+
+class PropertyFinancialReportTests(TestCase):
+    """Report figures come from two grouped queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.property = create_property('F-1', purchase_price=Decimal('100000.00'))
+        for day, amount in [(date(2026, 1, 5), '1000'), (date(2026, 1, 20), '500'), (date(2026, 3, 1), '1000'), (date(2025, 6, 1), '2000')]:
+            PropertyRevenue.objects.create(property=cls.property, revenue_date=day, amount=Decimal(amount))
+        PropertyRevenue.objects.create(property=cls.property, revenue_date=date(2026, 3, 2), revenue_type='parking', amount=Decimal('100'))
+        PropertyExpense.objects.create(property=cls.property, expense_date=date(2026, 1, 10), expense_type='tax', amount=Decimal('600'))
+        PropertyExpense.objects.create(property=cls.property, expense_date=date(2025, 2, 10), amount=Decimal('400'))
+
+    def test_report_figures(self):
+        with self.assertNumQueries(2):
+            report = PropertyFinancialService.report(self.property, today=date(2026, 10, 1))
+        self.assertEqual(report['total_revenue'], 4600)
+        self.assertEqual(report['total_expenses'], 1000)
+        self.assertEqual(report['current_year_revenue'], 2600)
+        self.assertEqual(report['current_year_profit'], 2000)
+        self.assertEqual(report['last_year_profit'], 1600)
+        self.assertEqual(report['current_roi'], 2.0)
+        self.assertEqual(report['lifetime_roi'], 3.6)
+        self.assertEqual(report['monthly_data'][0], {'month': 1, 'revenue': 1500.0, 'expense': 600.0, 'profit': 900.0})
+        self.assertEqual(report['revenue_by_type'], [
+            {'revenue_type': 'rent', 'total': Decimal('2500.00')},
+            {'revenue_type': 'parking', 'total': Decimal('100.00')},
+        ])
+
+    def test_api_summary(self):
+        self.client.force_login(User.objects.create_user('finance', password='pass', is_staff=True))
+        response = self.client.get(f'/en/api/v1/properties/{self.property.pk}/financial_summary/')
+        self.assertEqual(response.json()['net_income'], 3600.0)
+        self.assertEqual(len(response.json()['monthly']), 4)
+
+
+class OccupancyEngineTests(TestCase):
+    """Occupancy comes from merged contract intervals"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_owner('OWN-O')
+        cls.property_type = PropertyType.objects.create(name='Studio')
+        cls.client_obj = create_client('CLI-O')
+        cls.busy, cls.empty = [
+            create_property(code, owner, cls.property_type, city=city)
+            for code, city in [('O-1', 'Cairo'), ('O-2', 'Giza')]
+        ]
+        cls.today = timezone.now().date()
+        ranges = [
+            # Overlapping renewals count once
+            (cls.today - timedelta(days=364), cls.today - timedelta(days=200), 'expired'),
+            (cls.today - timedelta(days=250), cls.today - timedelta(days=100), 'renewed'),
+            # Drafts never occupy
+            (cls.today - timedelta(days=99), cls.today - timedelta(days=50), 'draft'),
+            (cls.today - timedelta(days=49), cls.today + timedelta(days=30), 'active'),
+        ]
+        for index, (start, end, status) in enumerate(ranges):
+            Contract.objects.create(
+                contract_number=f'OC-{index}', property=cls.busy, client=cls.client_obj,
+                start_date=start, end_date=end, rent_amount=Decimal('500.00'), status=status,
+            )
+
+    def test_merge_intervals(self):
+        self.assertEqual(
+            merge_intervals([(date(2026, 1, 1), date(2026, 1, 31)), (date(2026, 2, 1), date(2026, 2, 10)),
+                             (date(2026, 2, 5), date(2026, 2, 8)), (date(2026, 3, 1), date(2026, 3, 2))]),
+            [(date(2026, 1, 1), date(2026, 2, 10)), (date(2026, 3, 1), date(2026, 3, 2))],
+        )
+
+    def test_timeline_and_persisted_rate(self):
+        timeline = OccupancyService.timelines([self.busy.pk])[self.busy.pk]
+        self.assertEqual(timeline.vacancies, [(self.today - timedelta(days=99), self.today - timedelta(days=50))])
+        self.assertEqual(timeline.occupied_days, 315)
+        self.busy.refresh_from_db()
+        # Kept current by the contract signals
+        self.assertEqual(self.busy.occupancy_rate, Decimal('86.30'))
+
+    def test_refresh_in_chunks(self):
+        Property.objects.update(occupancy_rate=None)
+        # Read, intervals and bulk update per chunk, then the empty probe
+        with self.assertNumQueries(7):
+            changed = OccupancyService.refresh(chunk_size=1)
+        self.assertEqual(changed, 2)
+
+    def test_vacancy_by_city(self):
+        rows = {row['label']: row for row in OccupancyService.vacancy_by('city')}
+        self.assertEqual(rows['Giza']['vacant_now'], 1)
+        self.assertEqual(rows['Giza']['vacancy_rate'], 100.0)
+        self.assertEqual(rows['Cairo']['vacant_now'], 0)
+        self.client.force_login(User.objects.create_user('vacancy', password='pass', is_staff=True))
+        response = self.client.get('/en/api/v1/properties/vacancy/', {'group_by': 'property_type'})
+        self.assertEqual(response.json(), [{
+            'label': 'Studio', 'properties': 2, 'vacant_now': 1,
+            'average_occupancy': 43.15, 'vacancy_rate': 56.85,
+        }])
+
+
+class PropertyImageRenditionTests(TestCase):
+    """Uploads get fixed-size JPEG/WebP renditions without EXIF"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.property = create_property('IMG-1', title='Villa')
+
+    def upload(self, size=(3000, 2000), orientation=None):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        if orientation:
+            exif[0x0112] = orientation
+        buffer = BytesIO()
+        Image.new('RGB', size, 'navy').save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_renders_sizes_and_strips_exif(self):
+        image = PropertyImage.objects.create(property=self.property, image=self.upload(orientation=6))
+        image.refresh_from_db()
+        # Orientation 6 is a portrait photo stored sideways
+        self.assertEqual((image.width, image.height), (2000, 3000))
+        self.assertEqual(
+            {name: (rendition['width'], rendition['height']) for name, rendition in image.renditions.items()},
+            {'thumbnail': (320, 240), 'medium': (533, 800), 'large': (1067, 1600)},
+        )
+        storage = image.image.storage
+        with storage.open(image.renditions['large']['jpeg']) as rendered:
+            self.assertEqual(len(Image.open(rendered).getexif()), 0)
+        with storage.open(image.renditions['thumbnail']['webp']) as rendered:
+            self.assertEqual(Image.open(rendered).format, 'WEBP')
+        self.assertIn('_medium.jpg', image.medium_url())
+
+        paths = [rendition[fmt] for rendition in image.renditions.values() for fmt in ('jpeg', 'webp')]
+        image.delete()
+        self.assertFalse(any(storage.exists(path) for path in paths))
+
+    def test_backfill_and_fallback(self):
+        image = PropertyImage.objects.create(property=self.property, image=self.upload(size=(400, 300)))
+        PropertyImage.objects.filter(pk=image.pk).update(renditions={})
+        image.refresh_from_db()
+        self.assertEqual(image.thumbnail_url(), image.image.url)
+        broken = PropertyImage.objects.create(
+            property=self.property, image=SimpleUploadedFile('broken.jpg', b'not an image')
+        )
+        self.assertEqual(broken.renditions, {})
+        self.assertEqual(PropertyImageService.backfill(PropertyImage.objects.all()), (1, 1))
+        image.refresh_from_db()
+        # Never upscaled beyond the original
+        self.assertEqual(image.renditions['large']['width'], 400)
+
+        self.client.force_login(User.objects.create_user('gallery', password='pass', is_staff=True))
+        response = self.client.get(reverse('properties:gallery', args=[self.property.pk]))
+        self.assertContains(response, image.thumbnail_webp_url())
+
+    def test_primary_image_is_denormalized(self):
+        first = PropertyImage.objects.create(property=self.property, image=self.upload(size=(40, 30)), is_primary=True)
+        second = PropertyImage.objects.create(property=self.property, image=self.upload(size=(40, 30)), is_primary=True)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.primary_image_id, second.pk)
+        second.is_primary = False
+        second.save()
+        self.property.refresh_from_db()
+        self.assertIsNone(self.property.primary_image_id)
+        first.is_primary = True
+        first.save()
+        first.delete()
+        self.property.refresh_from_db()
+        self.assertIsNone(self.property.primary_image_id)
+
+        Property.objects.update(primary_image=None)
+        PropertyImage.objects.filter(pk=second.pk).update(is_primary=True)
+        PropertyImageService.sync_primary_images(Property.objects.all())
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.primary_image_id, second.pk)
+
+    def test_property_list_api_has_no_image_queries(self):
+        PropertyImage.objects.create(property=self.property, image=self.upload(size=(40, 30)), is_primary=True)
+        for index in range(5):
+            create_property(f'IMG-F{index}', self.property.owner, self.property.property_type)
+        self.client.force_login(User.objects.create_user('lister', password='pass', is_staff=True))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/en/api/v1/properties/')
+        # Only the page query joins images; nothing per row, no prefetch
+        image_queries = [query for query in queries if 'properties_propertyimage' in query['sql']]
+        self.assertEqual(len(image_queries), 1)
+        self.assertIn('FROM "properties_property"', image_queries[0]['sql'])
+        images = [row['primary_image'] for row in response.json()['results']]
+        self.assertEqual(sum(1 for url in images if url and '_medium.jpg' in url), 1)
@@ -11,6 +11,7 @@ urlpatterns = [
     path('', views.property_list, name='list'),
     path('dashboard/', views.property_dashboard, name='dashboard'),
     path('map/', views.property_map, name='map'),
+    path('map/data/', views.property_map_data, name='map_data'),
     path('create/', views.property_create, name='create'),
     path('<int:pk>/', views.property_detail, name='detail'),
     path('<int:pk>/edit/', views.property_update, name='update'),
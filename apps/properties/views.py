@@ -1,16 +1,20 @@
 """
 Views for Properties app
 """
+import json
 from datetime import timedelta
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Count, Sum, Avg
 from django.utils import timezone
 from urllib.parse import urlencode
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_GET
+
+from apps.core.exports import ExportService
 from .models import (
     Property,
     PropertyType,
@@ -22,6 +26,10 @@ from .models import (
     PropertyExpense,
     PropertyRevenue,
 )
+from .financials import PropertyFinancialService
+from .listing import PropertyListingService
+from .mapping import InvalidBoundingBox, PropertyMapService
+from .occupancy import OccupancyService
 from .forms import (
     PropertyForm,
     PropertyTypeForm,
@@ -35,6 +43,15 @@ from .forms import (
     PropertyRevenueForm,
 )
 
+PROPERTY_EXPORT_COLUMNS = [
+    ('Code', 'code'), ('Title', 'title'), ('Type', 'property_type__name'), ('Owner', 'owner__name'),
+    ('City', 'city'), ('District', 'district'), ('Address', 'address'), ('Status', 'status'),
+    ('Area (sqm)', 'area_sqm'), ('Bedrooms', 'bedrooms'), ('Bathrooms', 'bathrooms'),
+    ('Monthly Rent', 'rental_price_monthly'), ('Market Value', 'market_value'),
+    ('Occupancy Rate', 'occupancy_rate'), ('Active', 'is_active'), ('Created At', 'created_at'),
+]
+
+
 @login_required
 def property_list(request):
     """List all properties with advanced filtering and display options."""
@@ -42,61 +59,39 @@ def property_list(request):
 
     # Search and filter
     search_form = PropertySearchForm(request.GET)
-    if search_form.is_valid():
-        filters = search_form.cleaned_data
-        search = filters.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(code__icontains=search)
-                | Q(title__icontains=search)
-                | Q(address__icontains=search)
-                | Q(city__icontains=search)
-            )
-
-        if filters.get('property_type'):
-            queryset = queryset.filter(property_type=filters['property_type'])
-
-        if filters.get('status'):
-            queryset = queryset.filter(status=filters['status'])
-
-        if filters.get('city'):
-            queryset = queryset.filter(city__icontains=filters['city'])
-
-        if filters.get('min_rent') is not None:
-            queryset = queryset.filter(rental_price_monthly__gte=filters['min_rent'])
-
-        if filters.get('max_rent') is not None:
-            queryset = queryset.filter(rental_price_monthly__lte=filters['max_rent'])
-
-        if filters.get('bedrooms') is not None:
-            queryset = queryset.filter(bedrooms__gte=filters['bedrooms'])
-
-        if filters.get('is_furnished') is not None:
-            queryset = queryset.filter(is_furnished=filters['is_furnished'])
+    filters = search_form.cleaned_data if search_form.is_valid() else {}
+    queryset = PropertyListingService.filter_queryset(queryset, filters)
 
     # Sorting
-    sort_option = request.GET.get('sort', '-created_at')
-    sort_mapping = {
-        'newest': '-created_at',
-        'oldest': 'created_at',
-        'code': 'code',
-        'title': 'title',
-        'rent_high': '-rental_price_monthly',
-        'rent_low': 'rental_price_monthly',
-        'area_high': '-area_sqm',
-        'area_low': 'area_sqm',
-    }
-    queryset = queryset.order_by(sort_mapping.get(sort_option, '-created_at'))
+    sort_option = PropertyListingService.sort_option(request.GET, filters)
+
+    if request.GET.get('export'):
+        if sort_option != PropertyListingService.RELEVANCE:
+            queryset = queryset.order_by(PropertyListingService.ordering(sort_option), '-pk')
+        return ExportService.response(request, queryset, PROPERTY_EXPORT_COLUMNS, 'properties')
 
     # Display mode (table/grid)
     display_mode = request.GET.get('display', 'table')
     per_page = 12 if display_mode == 'grid' else 20
 
-    paginator = Paginator(queryset, per_page)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    # Keyset pages by default; ?page=N keeps the numbered pages working.
+    # Relevance order is a ranking annotation, not a column, so it is numbered too.
+    is_keyset = not request.GET.get('page') and sort_option != PropertyListingService.RELEVANCE
+    if sort_option == PropertyListingService.RELEVANCE:
+        paginator = Paginator(queryset, per_page)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    elif request.GET.get('page'):
+        queryset = queryset.order_by(PropertyListingService.ordering(sort_option), '-pk')
+        paginator = Paginator(queryset, per_page)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        page_obj = PropertyListingService.keyset_page(
+            queryset, sort_option, per_page, cursor=request.GET.get('cursor')
+        )
 
     query_params = request.GET.copy()
     query_params.pop('page', None)
+    query_params.pop('cursor', None)
     query_params_table = query_params.copy()
     query_params_table['display'] = 'table'
     query_params_grid = query_params.copy()
@@ -104,30 +99,27 @@ def property_list(request):
 
     pagination_query = query_params.copy()
 
-    # Statistics for summary cards
-    total_properties = Property.objects.count()
-    available_count = Property.objects.filter(status='available').count()
-    rented_count = Property.objects.filter(status='rented').count()
-    maintenance_count = Property.objects.filter(status='maintenance').count()
-    total_value = Property.objects.aggregate(total=Sum('market_value'))['total'] or 0
+    # Statistics for summary cards (filtered, one cached aggregate)
+    summary = PropertyListingService.summary(queryset, filters)
     
     # Property types for filter dropdown
     property_types = PropertyType.objects.filter(is_active=True)
 
     context = {
         'properties': page_obj,
+        'is_keyset': is_keyset,
         'search_form': search_form,
         'display_mode': display_mode,
         'sort_option': sort_option,
-        'total_properties': total_properties,
-        'total_count': total_properties,
-        'active_count': Property.objects.filter(is_active=True).count(),
-        'available_count': available_count,
-        'rented_count': rented_count,
-        'maintenance_count': maintenance_count,
-        'total_value': total_value,
+        'total_properties': summary['total'],
+        'total_count': summary['total'],
+        'active_count': summary['active'],
+        'available_count': summary['available'],
+        'rented_count': summary['rented'],
+        'maintenance_count': summary['maintenance'],
+        'total_value': summary['total_value'],
         'property_types': property_types,
-        'filter_applied': any(v for k, v in request.GET.items() if k not in ['page']),
+        'filter_applied': any(v for k, v in request.GET.items() if k not in ['page', 'cursor']),
         'table_querystring': query_params_table.urlencode(),
         'grid_querystring': query_params_grid.urlencode(),
         'pagination_querystring': pagination_query.urlencode(),
@@ -198,6 +190,8 @@ def property_dashboard(request):
         'status_breakdown': status_breakdown,
         'type_distribution': type_distribution,
         'average_occupancy': round(average_occupancy, 2) if average_occupancy else 0,
+        'vacancy_by_city': OccupancyService.vacancy_by('city'),
+        'vacancy_by_type': OccupancyService.vacancy_by('property_type'),
         'average_roi': round(average_roi, 2) if average_roi else 0,
         'monthly_revenue': monthly_revenue,
         'top_roi_properties': top_roi_properties,
@@ -212,39 +206,41 @@ def property_dashboard(request):
 
 @login_required
 def property_map(request):
-    """Interactive map view for properties."""
-    properties = (
-        Property.objects.select_related('property_type', 'owner')
-        .exclude(latitude__isnull=True)
-        .exclude(longitude__isnull=True)
-    )
-
-    property_markers = [
-        {
-            'id': prop.pk,
-            'code': prop.code,
-            'title': prop.title,
-            'type': prop.property_type.name,
-            'owner': prop.owner.name,
-            'status': prop.get_status_display(),
-            'rent': float(prop.rental_price_monthly or 0),
-            'city': prop.city,
-            'latitude': float(prop.latitude),
-            'longitude': float(prop.longitude),
-            'url': request.build_absolute_uri(prop.get_absolute_url()) if hasattr(prop, 'get_absolute_url') else None,
-        }
-        for prop in properties
-    ]
+    """Interactive map view for properties; markers load per viewport from property_map_data."""
+    extent = PropertyMapService.extent(Property.objects.all())
 
-    import json
-    
     context = {
-        'property_markers': json.dumps(property_markers),
-        'total_with_coordinates': properties.count(),
+        'map_extent': json.dumps({
+            key: float(extent[key]) if extent[key] is not None else None
+            for key in ('south', 'west', 'north', 'east')
+        }),
+        'total_with_coordinates': extent['count'],
         'total_properties': Property.objects.count(),
     }
     return render(request, 'properties/map.html', context)
 
+
+@login_required
+@require_GET
+def property_map_data(request):
+    """
+    Markers (or clusters below the cluster zoom) inside ?bbox=west,south,east,north
+    at ?zoom=, answered with 304 when the ETag still matches.
+    """
+    try:
+        etag, payload = PropertyMapService.cached_payload(Property.objects.all(), request.GET)
+    except InvalidBoundingBox:
+        return JsonResponse({'error': 'Invalid bbox'}, status=400)
+
+    quoted = f'"{etag}"'
+    if quoted in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload)
+    response['ETag'] = quoted
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @login_required
 def property_create(request):
     """Create new property"""
@@ -741,18 +737,17 @@ def property_status_toggle(request, pk):
 @login_required
 def property_gallery(request, pk):
     """Professional image gallery view for a property."""
-    property_obj = get_object_or_404(Property, pk=pk)
-    images = property_obj.images.all().order_by('order', '-uploaded_at')
+    property_obj = get_object_or_404(Property.objects.select_related('primary_image'), pk=pk)
+    images = list(property_obj.images.all().order_by('order', '-uploaded_at'))
     
     # Primary image first
-    primary_image = images.filter(is_primary=True).first()
-    other_images = images.exclude(is_primary=True) if primary_image else images
+    other_images = [image for image in images if image.pk != property_obj.primary_image_id]
     
     context = {
         'property': property_obj,
-        'primary_image': primary_image,
+        'primary_image': property_obj.primary_image,
         'images': other_images,
-        'total_images': images.count(),
+        'total_images': len(images),
     }
     return render(request, 'properties/gallery.html', context)
 
@@ -761,115 +756,11 @@ def property_gallery(request, pk):
 def property_financial_report(request, pk):
     """Comprehensive financial report for a property."""
     property_obj = get_object_or_404(Property, pk=pk)
-    
-    # Calculate date ranges
-    today = timezone.now().date()
-    current_year_start = today.replace(month=1, day=1)
-    last_year_start = current_year_start.replace(year=current_year_start.year - 1)
-    last_year_end = current_year_start - timedelta(days=1)
-    
-    # Current year financial data
-    current_year_revenues = PropertyRevenue.objects.filter(
-        property=property_obj,
-        revenue_date__gte=current_year_start
-    )
-    current_year_expenses = PropertyExpense.objects.filter(
-        property=property_obj,
-        expense_date__gte=current_year_start
-    )
-    
-    # Last year financial data
-    last_year_revenues = PropertyRevenue.objects.filter(
-        property=property_obj,
-        revenue_date__gte=last_year_start,
-        revenue_date__lte=last_year_end
-    )
-    last_year_expenses = PropertyExpense.objects.filter(
-        property=property_obj,
-        expense_date__gte=last_year_start,
-        expense_date__lte=last_year_end
-    )
-    
-    # All-time totals
-    total_revenue = PropertyRevenue.objects.filter(property=property_obj).aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    total_expenses = PropertyExpense.objects.filter(property=property_obj).aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    # Current year totals
-    current_year_revenue_total = current_year_revenues.aggregate(total=Sum('amount'))['total'] or 0
-    current_year_expense_total = current_year_expenses.aggregate(total=Sum('amount'))['total'] or 0
-    current_year_profit = current_year_revenue_total - current_year_expense_total
-    
-    # Last year totals
-    last_year_revenue_total = last_year_revenues.aggregate(total=Sum('amount'))['total'] or 0
-    last_year_expense_total = last_year_expenses.aggregate(total=Sum('amount'))['total'] or 0
-    last_year_profit = last_year_revenue_total - last_year_expense_total
-    
-    # ROI Calculation
-    investment = property_obj.purchase_price or property_obj.market_value or 0
-    if investment > 0:
-        current_roi = (float(current_year_profit) / float(investment)) * 100
-        lifetime_roi = ((float(total_revenue) - float(total_expenses)) / float(investment)) * 100
-    else:
-        current_roi = 0
-        lifetime_roi = 0
-    
-    # Monthly breakdown for current year
-    monthly_data = []
-    for month in range(1, 13):
-        month_revenues = current_year_revenues.filter(
-            revenue_date__month=month
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        month_expenses = current_year_expenses.filter(
-            expense_date__month=month
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        monthly_data.append({
-            'month': month,
-            'revenue': float(month_revenues),
-            'expense': float(month_expenses),
-            'profit': float(month_revenues - month_expenses),
-        })
-    
-    # Expense breakdown by type
-    expense_by_type = PropertyExpense.objects.filter(
-        property=property_obj,
-        expense_date__gte=current_year_start
-    ).values('expense_type').annotate(
-        total=Sum('amount')
-    ).order_by('-total')
-    
-    # Revenue breakdown by type
-    revenue_by_type = PropertyRevenue.objects.filter(
-        property=property_obj,
-        revenue_date__gte=current_year_start
-    ).values('revenue_type').annotate(
-        total=Sum('amount')
-    ).order_by('-total')
-    
+
+    # Every figure comes from two grouped queries (see financials.py)
     context = {
         'property': property_obj,
-        'total_revenue': float(total_revenue),
-        'total_expenses': float(total_expenses),
-        'total_profit': float(total_revenue - total_expenses),
-        'current_year_revenue': float(current_year_revenue_total),
-        'current_year_expense': float(current_year_expense_total),
-        'current_year_profit': float(current_year_profit),
-        'last_year_revenue': float(last_year_revenue_total),
-        'last_year_expense': float(last_year_expense_total),
-        'last_year_profit': float(last_year_profit),
-        'current_roi': round(current_roi, 2),
-        'lifetime_roi': round(lifetime_roi, 2),
-        'monthly_data': monthly_data,
-        'expense_by_type': expense_by_type,
-        'revenue_by_type': revenue_by_type,
-        'current_year': today.year,
-        'last_year': today.year - 1,
+        **PropertyFinancialService.report(property_obj),
     }
     return render(request, 'properties/financial_report.html', context)
 
@@ -907,52 +798,30 @@ def property_occupancy_history(request, pk):
     
     # Get all contracts for this property
     from apps.contracts.models import Contract
-    contracts = Contract.objects.filter(
-        property=property_obj
-    ).select_related('client').order_by('-start_date')
-    
-    # Calculate occupancy metrics
-    total_days = 0
-    occupied_days = 0
-    
-    for contract in contracts:
-        start = contract.start_date
-        end = contract.end_date or timezone.now().date()
-        duration = (end - start).days
-        total_days += duration
-        if contract.status in ['active', 'expired']:
-            occupied_days += duration
-    
-    if total_days > 0:
-        occupancy_rate = (occupied_days / total_days) * 100
-    else:
-        occupancy_rate = 0
-    
-    # Calculate vacancy periods
-    vacancy_periods = []
-    sorted_contracts = list(contracts.order_by('start_date'))
-    
-    for i, contract in enumerate(sorted_contracts):
-        if i < len(sorted_contracts) - 1:
-            next_contract = sorted_contracts[i + 1]
-            end_date = contract.end_date or timezone.now().date()
-            
-            if end_date < next_contract.start_date:
-                vacancy_days = (next_contract.start_date - end_date).days
-                vacancy_periods.append({
-                    'start': end_date,
-                    'end': next_contract.start_date,
-                    'days': vacancy_days,
-                })
+    contracts = list(
+        Contract.objects.filter(property=property_obj)
+        .select_related('client').order_by('-start_date')
+    )
+    
+    # Merged occupied intervals since the first contract, plus the
+    # trailing-window rate that is persisted on the property
+    timeline = OccupancyService.history(property_obj)
+    current = OccupancyService.timelines([property_obj.pk])[property_obj.pk]
+    vacancy_periods = [
+        {'start': start, 'end': end, 'days': (end - start).days + 1}
+        for start, end in timeline.vacancies
+    ]
     
     context = {
         'property': property_obj,
         'contracts': contracts,
-        'occupancy_rate': round(occupancy_rate, 2),
-        'total_contracts': contracts.count(),
-        'active_contracts': contracts.filter(status='active').count(),
+        'occupancy_rate': current.rate,
+        'lifetime_occupancy_rate': timeline.rate,
+        'occupied_periods': timeline.occupied,
+        'total_contracts': len(contracts),
+        'active_contracts': sum(1 for contract in contracts if contract.status == 'active'),
         'vacancy_periods': vacancy_periods,
-        'total_vacancy_days': sum(v['days'] for v in vacancy_periods),
+        'total_vacancy_days': timeline.vacant_days,
     }
     return render(request, 'properties/occupancy_history.html', context)
 
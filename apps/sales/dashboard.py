@@ -0,0 +1,137 @@
+"""
+Sales dashboard statistics
+"""
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum, Count, Q, Avg
+from django.utils import timezone
+
+from apps.sales.models import Buyer, PropertyReservation, SalesContract, SalesPayment
+
+
+class SalesDashboardService:
+    """
+    Computes the sales dashboard counters, one aggregate per section
+    """
+
+    TREND_MONTHS = 6
+
+    # Section name -> method returning that section's context values
+    SECTIONS = {
+        'buyers': 'buyer_stats',
+        'reservations': 'reservation_stats',
+        'contracts': 'contract_stats',
+        'payments': 'payment_stats',
+    }
+
+    @staticmethod
+    def compute(today=None):
+        """
+        Compute all sales dashboard counters as a dict
+        """
+        today = today or timezone.now().date()
+        values = {}
+        for section in SalesDashboardService.SECTIONS:
+            values.update(SalesDashboardService.compute_section(section, today))
+        return values
+
+    @staticmethod
+    def compute_section(section, today=None):
+        """
+        Compute the counters of a single section as a dict
+        """
+        today = today or timezone.now().date()
+        method = getattr(SalesDashboardService, SalesDashboardService.SECTIONS[section])
+        return method(today)
+
+    @staticmethod
+    def buyer_stats(today):
+        buyers = Buyer.objects.aggregate(
+            total=Count('id'),
+            qualified=Count('id', filter=Q(is_qualified=True, is_active=True)),
+            this_month=Count('id', filter=Q(created_at__date__gte=today.replace(day=1))),
+        )
+        return {
+            'total_buyers': buyers['total'],
+            'qualified_buyers': buyers['qualified'],
+            'new_buyers_this_month': buyers['this_month'],
+        }
+
+    @staticmethod
+    def reservation_stats(today):
+        reservations = PropertyReservation.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status__in=['pending', 'approved'], expiry_date__gte=today)),
+            expired=Count('id', filter=Q(status='pending', expiry_date__lt=today)),
+        )
+        return {
+            'total_reservations': reservations['total'],
+            'active_reservations': reservations['active'],
+            'expired_reservations': reservations['expired'],
+        }
+
+    @staticmethod
+    def contract_stats(today):
+        this_month_start = today.replace(day=1)
+        months = [
+            this_month_start - relativedelta(months=offset)
+            for offset in range(SalesDashboardService.TREND_MONTHS - 1, -1, -1)
+        ]
+        monthly = {}
+        for index, month_start in enumerate(months):
+            in_month = Q(
+                contract_date__gte=month_start,
+                contract_date__lt=month_start + relativedelta(months=1),
+            )
+            monthly[f'count_{index}'] = Count('id', filter=in_month)
+            monthly[f'total_{index}'] = Sum('sale_price', filter=in_month)
+
+        contracts_stats = SalesContract.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status__in=['signed', 'in_progress'])),
+            completed=Count('id', filter=Q(status='completed')),
+            this_month=Count('id', filter=Q(contract_date__gte=this_month_start)),
+            total_value=Sum('sale_price'),
+            avg_value=Avg('sale_price'),
+            **monthly
+        )
+
+        # Overdue installments
+        overdue_installments = SalesContract.objects.filter(
+            has_installments=True,
+            payment_plans__is_paid=False,
+            payment_plans__due_date__lt=today
+        ).distinct().count()
+
+        return {
+            'total_contracts': contracts_stats['total'] or 0,
+            'active_contracts': contracts_stats['active'] or 0,
+            'completed_contracts': contracts_stats['completed'] or 0,
+            'contracts_this_month': contracts_stats['this_month'] or 0,
+            'total_sales_value': contracts_stats['total_value'] or 0,
+            'avg_sale_value': contracts_stats['avg_value'] or 0,
+            'overdue_installments': overdue_installments,
+            'monthly_sales': [
+                {
+                    'month': month_start.strftime('%b %Y'),
+                    'count': contracts_stats[f'count_{index}'] or 0,
+                    'total': float(contracts_stats[f'total_{index}'] or 0),
+                }
+                for index, month_start in enumerate(months)
+            ],
+        }
+
+    @staticmethod
+    def payment_stats(today):
+        payments_stats = SalesPayment.objects.filter(status='completed').aggregate(
+            total=Count('id'),
+            total_amount=Sum('amount'),
+            this_month_amount=Sum('amount', filter=Q(payment_date__gte=today.replace(day=1))),
+            this_year_amount=Sum('amount', filter=Q(payment_date__gte=today.replace(month=1, day=1))),
+        )
+        return {
+            'total_payments': payments_stats['total'] or 0,
+            'total_payments_amount': payments_stats['total_amount'] or 0,
+            'payments_this_month': payments_stats['this_month_amount'] or 0,
+            'payments_this_year': payments_stats['this_year_amount'] or 0,
+        }
@@ -0,0 +1,43 @@
+"""
+PDF payload of sales payment receipts (rendered by apps.core.pdf)
+"""
+from django.utils.translation import gettext as _
+
+from apps.core.pdf import PdfService
+from apps.sales.models import SalesPayment
+
+
+class SalesDocumentService:
+    """Sales payment receipts"""
+
+    @staticmethod
+    def payments_for_month(year, month):
+        return SalesPayment.objects.filter(payment_date__year=year, payment_date__month=month).select_related(
+            'sales_contract__buyer', 'sales_contract__property', 'payment_plan', 'received_by'
+        ).order_by('receipt_number')
+
+    @staticmethod
+    def receipt(payment):
+        """Payload of the receipt of a sales payment"""
+        contract = payment.sales_contract
+        received_by = payment.received_by
+        return PdfService.document(
+            'receipt', _('Payment Receipt'), payment.receipt_number,
+            fields=[
+                (_('Date'), PdfService.date(payment.payment_date)),
+                (_('Received From'), contract.buyer.name),
+                (_('Contract'), contract.contract_number),
+                (_('Property'), str(contract.property)),
+                (_('Payment Type'), payment.get_payment_type_display()),
+                (_('Installment'), payment.payment_plan.installment_number if payment.payment_plan_id else None),
+                (_('Payment Method'), payment.get_payment_method_display()),
+                (_('Reference Number'), payment.reference_number),
+                (_('Bank'), payment.bank_name),
+                (_('Check Number'), payment.check_number),
+                (_('Status'), payment.get_status_display()),
+                (_('Received By'), (received_by.get_full_name() or received_by.username) if received_by else None),
+            ],
+            totals=[(_('Amount'), PdfService.money(payment.amount))],
+            sections=[(_('Notes'), payment.notes)],
+            signatures=[_('Received By'), _('Buyer')],
+        )
@@ -18,7 +18,7 @@ from .views import (
     # Contracts
     contract_list, contract_detail, contract_create, contract_update,
     # Payments
-    payment_create, payment_list,
+    payment_create, payment_list, payment_receipt,
 )
 
 app_name = 'sales'
@@ -61,6 +61,7 @@ urlpatterns = [
     # Payments
     path('contracts/<int:contract_pk>/payments/create/', payment_create, name='payment_create'),
     path('payments/', payment_list, name='payment_list'),
+    path('payments/<int:pk>/receipt/', payment_receipt, name='payment_receipt'),
     
     # API endpoints
     path('api/', include(router.urls)),
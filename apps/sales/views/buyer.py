@@ -5,10 +5,19 @@ from django.utils.translation import gettext as _
 from django.core.paginator import Paginator
 from django.db.models import Q
 
+from apps.core.exports import ExportService
 from apps.sales.models import Buyer
 from apps.sales.forms import BuyerForm, BuyerSearchForm
 
 
+BUYER_EXPORT_COLUMNS = [
+    ('Name', 'name'), ('Type', 'buyer_type'), ('National ID', 'national_id'), ('Phone', 'phone'),
+    ('Email', 'email'), ('City', 'city'), ('Company', 'company_name'), ('Annual Income', 'annual_income'),
+    ('Financing Approved', 'financing_approved'), ('Qualified', 'is_qualified'), ('Active', 'is_active'),
+    ('Created At', 'created_at'),
+]
+
+
 @login_required
 def buyer_list(request):
     """List all buyers with search and filter"""
@@ -43,6 +52,9 @@ def buyer_list(request):
         elif is_active == 'false':
             buyers = buyers.filter(is_active=False)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, buyers, BUYER_EXPORT_COLUMNS, 'buyers')
+    
     # Pagination
     paginator = Paginator(buyers, 20)
     page_number = request.GET.get('page')
@@ -5,10 +5,27 @@ from django.utils.translation import gettext as _
 from django.core.paginator import Paginator
 from django.db.models import Sum
 
+from apps.core.exports import ExportService
+from apps.core.pdf import PdfService
+from apps.sales.documents import SalesDocumentService
 from apps.sales.models import SalesContract, SalesPayment, SalesPaymentPlan
 from apps.sales.forms import SalesContractForm, SalesPaymentForm
 
 
+CONTRACT_EXPORT_COLUMNS = [
+    ('Contract Number', 'contract_number'), ('Property Code', 'property__code'), ('Property', 'property__title'),
+    ('Buyer', 'buyer__name'), ('Seller', 'seller__name'), ('Contract Date', 'contract_date'),
+    ('Sale Price', 'sale_price'), ('Down Payment', 'down_payment'), ('Installments', 'number_of_installments'),
+    ('Expected Handover', 'expected_handover_date'), ('Status', 'status'),
+]
+
+PAYMENT_EXPORT_COLUMNS = [
+    ('Receipt Number', 'receipt_number'), ('Contract', 'sales_contract__contract_number'),
+    ('Type', 'payment_type'), ('Date', 'payment_date'), ('Method', 'payment_method'),
+    ('Amount', 'amount'), ('Reference', 'reference_number'), ('Status', 'status'),
+]
+
+
 @login_required
 def contract_list(request):
     """List all sales contracts"""
@@ -21,6 +38,9 @@ def contract_list(request):
     if status_filter:
         contracts = contracts.filter(status=status_filter)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, contracts, CONTRACT_EXPORT_COLUMNS, 'sales_contracts')
+    
     # Pagination
     paginator = Paginator(contracts, 20)
     page_number = request.GET.get('page')
@@ -196,6 +216,9 @@ def payment_list(request):
     if status_filter:
         payments = payments.filter(status=status_filter)
     
+    if request.GET.get('export'):
+        return ExportService.response(request, payments, PAYMENT_EXPORT_COLUMNS, 'sales_payments')
+    
     # Pagination
     paginator = Paginator(payments, 30)
     page_number = request.GET.get('page')
@@ -212,3 +235,16 @@ def payment_list(request):
     }
     
     return render(request, 'sales/payment_list.html', context)
+
+
+@login_required
+def payment_receipt(request, pk):
+    """Receipt of a sales payment as PDF"""
+    payment = get_object_or_404(
+        SalesPayment.objects.select_related(
+            'sales_contract__buyer', 'sales_contract__property', 'payment_plan', 'received_by'
+        ),
+        pk=pk,
+    )
+    payload = SalesDocumentService.receipt(payment)
+    return PdfService.response(request, payload, f'{payment.receipt_number}.pdf')
@@ -3,6 +3,11 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn config.asgi:application``)
+so long-lived streams such as the notification count events
+(core:notification_stream) run on the event loop instead of holding a
+worker thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
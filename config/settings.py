@@ -4,6 +4,7 @@ Django settings for Origin App Real Estate Management System.
 
 from pathlib import Path
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -228,6 +230,81 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10 MB
 DATE_INPUT_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']
 DATETIME_INPUT_FORMATS = ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S']
 
+# Cache (unread notification counts, account tree)
+# REDIS_URL (e.g. redis://127.0.0.1:6379) selects a Redis cache shared by the
+# web workers and the cron commands. Without it every process has its own
+# memory cache that never sees the others' invalidations, so CACHE_SHARED is
+# off and figures other processes can change are only cached briefly.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+CACHE_SHARED = bool(REDIS_URL)
+if CACHE_SHARED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# SQL instrumentation (apps.core.middleware): query count and time per
+# request as Server-Timing, summaries in queries.log. Budgets are keyed by
+# URL name; QUERY_BUDGET_STRICT raises instead of logging an overrun.
+QUERY_INSTRUMENTATION = DEBUG or os.environ.get('QUERY_INSTRUMENTATION') == '1'
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT') == '1'
+QUERY_REPEAT_THRESHOLD = 5
+QUERY_LOG_SIZE = 200
+QUERY_BUDGETS = {
+    'properties:list': 12,
+    'properties:dashboard': 25,
+    'properties:financial_report': 15,
+    'owners:list': 12,
+    'clients:list': 12,
+    'financial:report_property_pnl': 12,
+    'property-list': 10,
+    'owner-list': 10,
+    'client-list': 10,
+}
+
+# PDF documents (apps.core.pdf): each document is rendered once per content
+# hash into PDF_CACHE_DIR. The first existing font file of each list is
+# used and needs Arabic glyphs: DejaVu Sans ships in static/fonts. Without
+# any, Latin-only Helvetica is used and Arabic documents fail to render.
+PDF_CACHE_DIR = MEDIA_ROOT / 'pdf_cache'
+PDF_FONTS = {
+    'regular': [BASE_DIR / 'static' / 'fonts' / 'DejaVuSans.ttf'],
+    'bold': [BASE_DIR / 'static' / 'fonts' / 'DejaVuSans-Bold.ttf'],
+}
+PDF_COMPANY_NAME = 'Origin App Real Estate'
+
+# Test runs never append to queries.log; tests that need the summaries capture the logger
+TESTING = sys.argv[1:2] == ['test']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'query_log': {'class': 'logging.NullHandler'} if TESTING else {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'queries.log',
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'apps.core.queries': {
+            'handlers': ['query_log'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # Email Configuration (for production)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST = 'localhost'